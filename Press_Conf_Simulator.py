@@ -10,15 +10,36 @@ Routes:
     /               -> Frontend (HTML interface)
     /start          -> Starts a new interview (first journalist question)
     /reply          -> Handles user (guest) response and generates next question
+    /stop           -> Ends the interview and returns the conversation analysis
     /reset          -> Clears the current session
+    /metrics        -> Prometheus-text latency histograms, error counters, cache stats
+
+/start accepts an optional "panel" (true or a list of persona keys) to let
+several journalists draft questions concurrently each turn.
+/start accepts an optional "prefetch" (default PRESS_PREFETCH_OPENINGS) to
+generate every persona's opening question in the background.
+/start and /reply accept an optional "explain_mode": "local" (in-process,
+default) or "deep" (remote SHAP/attention on Kaggle).
 
 All heavy inference runs on Kaggle — this Flask app only coordinates state.
 """
 
+import uuid
 from flask import Flask, request, jsonify, session, render_template
 from flask_cors import CORS
 from src.agents.Press_Conf_Simulator.press_conference_agent import press_conference_agent
+from src.agents.Press_Conf_Simulator.speech_index import build_speech_index, drop_speech_index
+from src.agents.Press_Conf_Simulator.opening_prefetch import (
+    PREFETCH_OPENINGS, prefetch_openings, get_prefetched_opening, remember_opening
+)
+from src.agents.Press_Conf_Simulator.incremental_analysis import (
+    ANALYSIS_MODE, submit_turn_analysis, incremental_analysis_node, drop_session_analysis
+)
 from utils.Press_Simulator.logger import log_info, log_warning
+from utils.Press_Simulator.session_protocol import forget_session
+from utils.Press_Simulator.explain_cache import explain_cache
+from utils.Press_Simulator.backend_pool import generate_pool, explain_pool, analyze_pool
+from utils.metrics import init_app, register_gauge
 
 
 # ===============================================================
@@ -27,6 +48,22 @@ from utils.Press_Simulator.logger import log_info, log_warning
 app = Flask(__name__, template_folder="templates/Press_Conf_Simulator")
 app.secret_key = "super-secret-session-key"  # Replace for prod
 CORS(app)
+init_app(app, service="press")
+
+# Cache and backend health are exported on /metrics
+for _stat in ("hits_memory", "hits_disk", "misses", "memory_entries", "hit_rate"):
+    register_gauge(
+        f"press_explain_cache_{_stat}", f"Explainability cache {_stat}.",
+        lambda stat=_stat: explain_cache.stats()[stat],
+    )
+for _field in ("healthy", "outstanding", "latency_ms"):
+    register_gauge(
+        f"press_backend_{_field}", f"Backend pool {_field} per backend.",
+        lambda field=_field: [
+            ({"pool": pool.name, "url": b["url"]}, b[field])
+            for pool in (generate_pool, explain_pool, analyze_pool) for b in pool.status()
+        ],
+    )
 
 # Initialize LangGraph pipeline once
 graph = press_conference_agent()
@@ -50,36 +87,63 @@ def start():
     topic = data.get("topic", "")
     role = data.get("role", "CEO")
     speech = data.get("speech", "")
+    explain_mode = data.get("explain_mode", "")  # "local" (default) or "deep"
+    panel = data.get("panel", [])  # True or a list of persona keys for panel mode
+    prefetch = bool(data.get("prefetch", PREFETCH_OPENINGS)) and not panel
 
     log_info("🎬 Starting new Press Conference Session")
     log_info(f"Persona={persona}, Topic={topic}, Role={role}")
 
     # Initialize agent state
     state = {
+        "session_id": uuid.uuid4().hex,
         "persona": persona,
         "topic": topic,
         "role": role,
         "speech": speech,
         "history": [],
+        "explain_mode": explain_mode,
+        "panel": panel,
     }
 
+    # Index long speeches once; later turns only retrieve relevant passages
+    build_speech_index(state["session_id"], speech)
+
+    # Opening questions of the other personas are generated concurrently,
+    # so a persona switch with the same speech is served from cache
+    graph_state = state
+    if prefetch:
+        prefetch_openings(state)
+        cached = get_prefetched_opening(state)
+        if cached:
+            graph_state = dict(state, prefetched_question=cached)
+
     # Run LangGraph pipeline (1st journalist question)
-    result = graph.invoke(state)
+    result = graph.invoke(graph_state)
     question = result.get("journalist_question", "[No question generated]")
     explanation = result.get("explanation", "")
+    asked_by = result.get("journalist_persona") or persona
+    if prefetch:
+        remember_opening(state, question)
 
     # Save conversation in session
-    state["history"].append({"role": "journalist", "content": question})
+    state["history"].append({"role": "journalist", "content": question, "persona": asked_by})
     session["state"] = state
 
     log_info(f"🗞️ First question: {question}")
-    return jsonify({"question": question, "explanation": explanation})
+    return jsonify({
+        "question": question,
+        "explanation": explanation,
+        "persona": asked_by,
+        "candidates": result.get("panel_candidates", []),
+    })
 
 
 @app.route("/reply", methods=["POST"])
 def reply():
     """Handle the guest's response and trigger the next question."""
-    user_answer = request.get_json(force=True).get("answer", "").strip()
+    data = request.get_json(force=True)
+    user_answer = data.get("answer", "").strip()
     if not user_answer:
         return jsonify({"error": "Empty response"}), 400
 
@@ -92,18 +156,30 @@ def reply():
     log_info(f"🗣️ Guest reply: {user_answer}")
     state.setdefault("history", [])
     state["history"].append({"role": "guest", "content": user_answer})
+    if "explain_mode" in data:
+        state["explain_mode"] = data["explain_mode"]
+
+    # Analyze the completed exchange in the background
+    if ANALYSIS_MODE == "incremental":
+        submit_turn_analysis(state)
 
     # Run next journalist question
     result = graph.invoke(state)
     question = result.get("journalist_question", "[No question generated]")
     explanation = result.get("explanation", "")
+    asked_by = result.get("journalist_persona") or state.get("persona", "")
 
     # Update session
-    state["history"].append({"role": "journalist", "content": question})
+    state["history"].append({"role": "journalist", "content": question, "persona": asked_by})
     session["state"] = state
 
     log_info(f"🎤 Journalist asks: {question}")
-    return jsonify({"question": question, "explanation": explanation})
+    return jsonify({
+        "question": question,
+        "explanation": explanation,
+        "persona": asked_by,
+        "candidates": result.get("panel_candidates", []),
+    })
 
 
 @app.route("/stop", methods=["POST"])
@@ -113,10 +189,17 @@ def stop():
     if not state:
         return jsonify({"error": "No active session"}), 400
 
-    from src.agents.Press_Conf_Simulator.press_conference_agent import analysis_api_node
-    result = analysis_api_node(state)
+    if ANALYSIS_MODE == "incremental" and state.get("analysis_submitted"):
+        # Aggregates per-turn results computed during the conversation (full analysis if incomplete)
+        result = incremental_analysis_node(state)
+    else:
+        from src.agents.Press_Conf_Simulator.press_conference_agent import analysis_api_node
+        result = analysis_api_node(state)
     analysis = result.get("analysis", {})
 
+    drop_speech_index(state.get("session_id", ""))
+    drop_session_analysis(state.get("session_id", ""))
+    forget_session(state.get("session_id", ""))
     session.clear()
     return jsonify({"analysis": analysis})
 
@@ -124,6 +207,10 @@ def stop():
 @app.route("/reset", methods=["POST"])
 def reset():
     """Reset the current interview session."""
+    session_id = session.get("state", {}).get("session_id", "")
+    drop_speech_index(session_id)
+    drop_session_analysis(session_id)
+    forget_session(session_id)
     session.clear()
     log_info("🔄 Session reset by user.")
     return jsonify({"message": "Session reset."})
@@ -1,13 +1,24 @@
 from flask import Flask, jsonify, request, render_template
 from src.agents.news_prediction_agent import NewsPredictionAgent
 from utils.simulation_helpers import generate_single_news_structured_llm
+from utils.metrics import init_app
 from dotenv import load_dotenv
+import os
 
 load_dotenv()
 app = Flask(__name__)
+init_app(app, service="news")  # request IDs + Prometheus /metrics
 
 agent = NewsPredictionAgent(model_path="src/models/logisticRegressor.pkl")
 
+# ONLINE_LEARNING=1: serve the latest online snapshot and learn from verified verdicts
+if os.getenv("ONLINE_LEARNING") == "1":
+    from utils.online_learning import online_learner
+
+    @app.before_request
+    def _start_online_learning():
+        online_learner.ensure_started(agent)
+
 @app.route("/")
 def home():
     return render_template("index.html")
@@ -31,7 +42,7 @@ def predict_news():
 
     pred = agent.predict_news(news_item)
     verif = agent.verify_news_with_websearch(news_item)
-    final = agent.decide_final_result(pred, verif)
+    final = agent.decide_final_result(pred, verif, news_item)
 
     # Convert Pydantic models to dicts if needed
     verif_dict = verif.model_dump() if hasattr(verif, "model_dump") else verif
@@ -0,0 +1,182 @@
+# serve_prefork.py
+"""
+Pre-fork Production Server for the Fake-News App
+------------------------------------------------
+
+Loads every model artifact ONCE in a parent process, freezes it, then
+forks N workers that share those pages copy-on-write:
+
+    parent: import app.py (SentenceTransformer + logistic regression),
+            utils.data_preprocessing (TF-IDF + scaler) when available,
+            torch.no_grad / eval, gc.freeze(), bind the listening socket
+    worker: set torch threads, serve app on the inherited socket
+
+RAM per extra worker is then only what the worker writes (request
+state, activations), not another copy of the weights. Each worker
+reports its unique vs shared memory (/proc/self/smaps_rollup) once
+it is ready, and the parent restarts workers that die.
+
+Notes:
+    - POSIX only (os.fork).
+    - Nothing runs inference in the parent: OpenMP thread pools created
+      before fork are not fork-safe.
+    - /metrics (utils/metrics.py) is per worker.
+
+Usage:
+    python serve_prefork.py --workers 4 --torch-threads 1 --port 5000
+    # or: PREFORK_WORKERS=4 WORKER_TORCH_THREADS=1 python serve_prefork.py
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def memory_breakdown(pid: str = "self") -> dict:
+    """Unique (private) vs shared resident memory in MB, from smaps_rollup."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) / 1024.0
+    except OSError:
+        return {}
+    return {
+        "rss_mb": fields.get("Rss", 0.0),
+        "pss_mb": fields.get("Pss", 0.0),
+        "unique_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+        "shared_mb": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+    }
+
+
+# ===============================================================
+# 1️⃣ Parent: load & freeze
+# ===============================================================
+def load_and_freeze():
+    """Imports the app and its model artifacts, then freezes them for sharing."""
+    gc.disable()  # no collections while the long-lived objects are created
+    from app import app
+
+    try:
+        import utils.data_preprocessing  # noqa: F401  TF-IDF vectorizer + scaler
+    except Exception as e:
+        print(f"ℹ️ data_preprocessing not preloaded: {e}")
+
+    try:
+        import torch
+        from src.embeddings.embed_model import embed_model
+        embed_model.eval()
+        torch.set_grad_enabled(False)
+    except ImportError:
+        pass
+
+    gc.collect()
+    # Move everything to the permanent generation: later collections in the
+    # workers will not touch (and so not copy) these objects' pages
+    gc.freeze()
+    return app
+
+
+# ===============================================================
+# 2️⃣ Worker
+# ===============================================================
+def run_worker(app, sock: socket.socket, index: int, torch_threads: int, threads_per_worker: int) -> None:
+    from werkzeug.serving import make_server
+
+    # Ctrl-C reaches the whole process group: only the parent handles it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    gc.enable()
+    os.environ["OMP_NUM_THREADS"] = str(torch_threads)
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    host, port = sock.getsockname()[:2]
+    server = make_server(host, port, app, threaded=threads_per_worker > 1, fd=sock.fileno())
+    mem = memory_breakdown()
+    print(f"👷 worker {index} (pid {os.getpid()}) ready: torch threads={torch_threads}, "
+          f"unique {mem.get('unique_mb', 0):.1f} MB, shared {mem.get('shared_mb', 0):.1f} MB, "
+          f"pss {mem.get('pss_mb', 0):.1f} MB", flush=True)
+    server.serve_forever()
+
+
+def spawn(app, sock, index: int, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(app, sock, index, args.torch_threads, args.threads)
+        finally:
+            os._exit(0)
+    return pid
+
+
+# ===============================================================
+# 3️⃣ Supervisor
+# ===============================================================
+def main(args) -> None:
+    started = time.perf_counter()
+    # Each worker has its own LLM gateway: split the configured budgets between them
+    os.environ.setdefault("LLM_PROCESSES", str(args.workers))
+    app = load_and_freeze()
+    parent_mem = memory_breakdown()
+    print(f"📦 Models loaded in {time.perf_counter() - started:.1f}s, "
+          f"parent RSS {parent_mem.get('rss_mb', 0):.1f} MB", flush=True)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    workers = {spawn(app, sock, i, args): i for i in range(args.workers)}
+    print(f"🚀 {args.workers} worker(s) serving http://{args.host}:{args.port}", flush=True)
+
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = workers.pop(pid, None)
+        if index is not None and not stopping:
+            print(f"⚠️ worker {index} (pid {pid}) exited with status {status}; restarting", flush=True)
+            workers[spawn(app, sock, index, args)] = index
+    sock.close()
+
+
+if __name__ == "__main__":
+    if not hasattr(os, "fork"):
+        sys.exit("serve_prefork.py needs os.fork (Linux/macOS).")
+    parser = argparse.ArgumentParser(description="Pre-fork server with copy-on-write model sharing.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PREFORK_WORKERS", "2")))
+    parser.add_argument("--torch-threads", type=int, default=int(os.getenv("WORKER_TORCH_THREADS", "1")),
+                        help="Intra-op threads per worker (workers × threads ≈ cores).")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("WORKER_HTTP_THREADS", "4")),
+                        help="HTTP handler threads per worker (I/O-bound LLM calls).")
+    main(parser.parse_args())
@@ -0,0 +1,149 @@
+# src/agents/Press_Conf_Simulator/explainability_nodes.py
+"""
+Local Explainability Node for the Press Conference Simulator
+------------------------------------------------------------
+
+Lightweight, in-process alternative to the remote Kaggle `/explain`
+endpoint. It explains which parts of the speech most likely led to the
+journalist's question using three cheap signals:
+
+- lexical:   content words shared by the speech and the question
+- semantic:  TF-IDF cosine similarity per speech sentence
+             (same output format as the Kaggle backend)
+- embedding: SentenceTransformer cosine similarity per speech sentence
+
+Everything runs in milliseconds on CPU. SHAP / attention attributions
+still require the remote backend, reached via "deep" mode.
+
+Explain modes (state["explain_mode"], default PRESS_EXPLAIN_MODE):
+    "local" -> local_explainability_node
+    "deep"  -> explainability_api_node (remote)
+"""
+
+import os
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.Press_Simulator.logger import log_info, log_warning
+
+
+DEFAULT_EXPLAIN_MODE = os.getenv("PRESS_EXPLAIN_MODE", "local")
+EXPLAIN_MODES = ("local", "deep")
+
+# Speeches and questions are mostly French; extend sklearn's English list
+_FRENCH_STOP_WORDS = {
+    "le", "la", "les", "un", "une", "des", "du", "de", "d", "l", "et", "ou", "en",
+    "à", "au", "aux", "que", "qui", "quoi", "dans", "pour", "par", "sur", "avec",
+    "sans", "ce", "ces", "cette", "est", "sont", "pas", "ne", "nous", "vous",
+    "il", "elle", "ils", "elles", "on", "se", "sa", "son", "ses", "leur", "leurs",
+    "votre", "vos", "notre", "nos", "comment", "quel", "quelle", "quels", "quelles",
+    "plus", "y", "a", "été", "être", "avez", "avons", "peut", "pouvez", "s",
+}
+_STOP_WORDS = set(ENGLISH_STOP_WORDS) | _FRENCH_STOP_WORDS
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+# ===============================================================
+# Helpers
+# ===============================================================
+def _split_sentences(text: str) -> List[str]:
+    parts = re.split(r"[.!?\n]+", text or "")
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _content_words(text: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if len(w) > 2 and w not in _STOP_WORDS]
+
+
+def _top_sentences(segments: List[str], sims: np.ndarray, k: int = 2) -> str:
+    order = np.argsort(sims)[::-1][:k]
+    tops = [f"• \"{segments[i]}\" (sim={sims[i]:.2f})" for i in order if sims[i] > 0]
+    return "\n".join(tops) if tops else "No strong matches."
+
+
+def lexical_explain(speech: str, question: str) -> str:
+    """Content words of the question that also appear in the speech."""
+    question_words = _content_words(question)
+    speech_words = set(_content_words(speech))
+    if not question_words:
+        return "No content words in the question."
+    shared = list(dict.fromkeys(w for w in question_words if w in speech_words))
+    coverage = len(shared) / len(set(question_words))
+    if not shared:
+        return "No lexical overlap with the speech."
+    return f"Shared terms ({coverage:.0%} of question): " + ", ".join(shared[:10])
+
+
+def tfidf_explain(speech: str, question: str) -> str:
+    """TF-IDF cosine between the question and each speech sentence."""
+    segments = _split_sentences(speech)
+    if not segments:
+        return "No speech segments to analyze."
+    try:
+        vec = TfidfVectorizer(stop_words=list(_STOP_WORDS))
+        X = vec.fit_transform(segments + [question])
+    except ValueError:
+        # Raised when every token is a stop word
+        return "No similarity signal detected."
+    sims = cosine_similarity(X[-1], X[:-1]).ravel()
+    return "Likely influential speech parts:\n" + _top_sentences(segments, sims)
+
+
+def embedding_explain(speech: str, question: str) -> str:
+    """SentenceTransformer cosine between the question and each speech sentence."""
+    segments = _split_sentences(speech)
+    if not segments:
+        return "No speech segments to analyze."
+    try:
+        from src.embeddings.embed_model import embed_model
+        vectors = embed_model.encode(segments + [question], show_progress_bar=False,
+                                     normalize_embeddings=True)
+    except Exception as e:
+        log_warning(f"Embedding explainability unavailable: {e}")
+        return f"Embedding similarity unavailable ({type(e).__name__})."
+    vectors = np.asarray(vectors)
+    sims = vectors[:-1] @ vectors[-1]
+    return "Semantically closest speech parts:\n" + _top_sentences(segments, sims)
+
+
+# ===============================================================
+# Node
+# ===============================================================
+def local_explainability_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Computes lexical / TF-IDF / embedding attributions in-process."""
+    question = state.get("journalist_question", "")
+    speech = state.get("speech_context") or state.get("speech", "")
+    if not question or not speech:
+        log_warning("Insufficient data for explainability.")
+        state["explanation"] = "No data for explainability."
+        return state
+
+    state["explanation"] = {
+        "lexical": lexical_explain(speech, question),
+        "semantic": tfidf_explain(speech, question),
+        "embedding": embedding_explain(speech, question),
+    }
+    log_info("✅ Local explainability computed.")
+    return state
+
+
+def route_explain_mode(state: Dict[str, Any]) -> str:
+    """LangGraph router: picks the explain node for this request."""
+    mode = state.get("explain_mode") or DEFAULT_EXPLAIN_MODE
+    return mode if mode in EXPLAIN_MODES else "local"
+
+
+# ===============================================================
+# Example usage (debug)
+# ===============================================================
+if __name__ == "__main__":
+    demo = {
+        "speech": "Our new AI model improves diagnostic accuracy. It was trained on two million scans.",
+        "journalist_question": "Which independent benchmarks confirm the diagnostic accuracy gains?",
+    }
+    for mode, text in local_explainability_node(demo)["explanation"].items():
+        print(f"[{mode}] {text}")
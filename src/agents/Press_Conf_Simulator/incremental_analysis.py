@@ -0,0 +1,198 @@
+# src/agents/Press_Conf_Simulator/incremental_analysis.py
+"""
+Incremental Conversation Analysis for the Press Conference Simulator
+--------------------------------------------------------------------
+
+Instead of posting the whole history to `KAGGLE_ANALYZE_API` when the
+user stops, each completed journalist/guest exchange is analyzed in the
+background while the conversation goes on. `/stop` then only
+aggregates the per-turn results. If some turns are still missing after
+PRESS_ANALYSIS_STOP_WAIT (slow or failing backend), it falls back to the
+full-conversation analysis (`analysis_api_node`).
+
+Per-turn results live in a server-side store keyed by session_id (a
+background thread cannot write into the Flask cookie session); the
+session state only records how many exchanges were submitted.
+
+Configuration (environment variables):
+    PRESS_ANALYSIS_MODE      -> "incremental" (default) or "full"
+    PRESS_ANALYSIS_WORKERS   -> background threads (default 4)
+    PRESS_ANALYSIS_STOP_WAIT -> seconds /stop waits for in-flight turns (default 2)
+    PRESS_ANALYSIS_SESSIONS  -> sessions whose per-turn results are kept; the
+                                least recently active are evicted (default 256),
+                                so abandoned sessions do not accumulate
+
+The aggregated result keeps the backend's analysis schema
+(summary, strengths, weaknesses, suggestions, scores).
+"""
+
+import contextvars
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List
+
+from utils.Press_Simulator.backend_pool import analyze_pool
+from utils.Press_Simulator import session_protocol
+from utils.metrics import traced
+from utils.Press_Simulator.logger import log_info, log_error, log_warning
+
+
+ANALYSIS_MODE = os.getenv("PRESS_ANALYSIS_MODE", "incremental")
+ANALYSIS_WORKERS = int(os.getenv("PRESS_ANALYSIS_WORKERS", "4"))
+ANALYSIS_STOP_WAIT = float(os.getenv("PRESS_ANALYSIS_STOP_WAIT", "2"))
+ANALYSIS_SESSIONS = int(os.getenv("PRESS_ANALYSIS_SESSIONS", "256"))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="turn-analysis")
+# LRU by last activity; both dicts always hold the same sessions
+_PENDING: "OrderedDict[str, List[Future]]" = OrderedDict()
+_RESULTS: "OrderedDict[str, Dict[int, Dict[str, Any]]]" = OrderedDict()
+_LOCK = threading.Lock()
+
+_SCORE_KEYS = ("clarity", "relevance", "persuasiveness", "consistency", "engagement")
+
+
+# ===============================================================
+# 1️⃣ Per-turn analysis (background)
+# ===============================================================
+def _analyze_turn(session_id: str, turn_index: int, payload: Dict[str, Any]) -> None:
+    try:
+        if session_protocol.use_session_protocol(session_id):
+            # payload is a state snapshot: only undelivered turns are sent
+            res = session_protocol.analyze(analyze_pool, payload, scope="turn")
+        else:
+            res = analyze_pool.post(json=payload, timeout=4000)
+        data = res.json()
+        if not isinstance(data, dict) or "error" in data:
+            log_warning(f"Turn {turn_index} analysis returned no usable result.")
+            return
+        with _LOCK:
+            if session_id not in _PENDING:
+                return  # session ended or was reset meanwhile
+            _RESULTS.setdefault(session_id, {})[turn_index] = data
+            _RESULTS.move_to_end(session_id)
+        log_info(f"🧠 Turn {turn_index} analyzed in background.")
+    except Exception as e:
+        log_error(f"❌ Error during turn {turn_index} analysis: {e}")
+
+
+def submit_turn_analysis(state: Dict[str, Any]) -> None:
+    """
+    Queues analysis of the exchange that just completed
+    (the last journalist question and the guest's answer).
+    """
+    session_id = state.get("session_id", "")
+    history = state.get("history", [])
+    if not session_id or len(history) < 2:
+        return
+    exchange = history[-2:]
+    if exchange[0].get("role") != "journalist" or exchange[1].get("role") != "guest":
+        return
+
+    turn_index = state.get("analysis_submitted", 0) + 1
+    state["analysis_submitted"] = turn_index
+    if session_protocol.use_session_protocol(session_id):
+        payload = dict(state, history=list(history))
+    else:
+        payload = {
+            "persona": state.get("persona", ""),
+            "role": state.get("role", ""),
+            "topic": state.get("topic", ""),
+            "speech": state.get("speech_context") or state.get("speech", ""),
+            "history": exchange,
+            "scope": "turn",
+        }
+    with _LOCK:
+        # Register the session before submitting so a fast result is never dropped
+        pending = [f for f in _PENDING.get(session_id, []) if not f.done()]
+        _PENDING[session_id] = pending
+        _PENDING.move_to_end(session_id)
+        _RESULTS.setdefault(session_id, {})
+        _RESULTS.move_to_end(session_id)
+        while len(_PENDING) > ANALYSIS_SESSIONS:
+            evicted, _ = _PENDING.popitem(last=False)
+            _RESULTS.pop(evicted, None)
+        pending.append(_EXECUTOR.submit(
+            contextvars.copy_context().run, _analyze_turn, session_id, turn_index, payload
+        ))
+
+
+# ===============================================================
+# 2️⃣ Aggregation (on /stop)
+# ===============================================================
+def _merge_lists(results: List[Dict[str, Any]], key: str, limit: int = 5) -> List[str]:
+    counts = Counter()
+    order: Dict[str, int] = {}
+    for result in results:
+        for item in result.get(key, []) or []:
+            text = str(item).strip()
+            if text:
+                counts[text] += 1
+                order.setdefault(text, len(order))
+    ranked = sorted(counts, key=lambda t: (-counts[t], order[t]))
+    return ranked[:limit]
+
+
+def aggregate_results(results: List[Dict[str, Any]], total_turns: int) -> Dict[str, Any]:
+    """Combines per-turn analyses into one conversation-level analysis."""
+    scores = {}
+    for key in _SCORE_KEYS:
+        values = [r["scores"][key] for r in results
+                  if isinstance(r.get("scores"), dict) and isinstance(r["scores"].get(key), (int, float))]
+        if values:
+            scores[key] = round(sum(values) / len(values), 1)
+
+    summaries = [str(r["summary"]).strip() for r in results if r.get("summary")]
+    summary = " ".join(summaries[-3:]) if summaries else "No summary available."
+
+    return {
+        "summary": summary,
+        "strengths": _merge_lists(results, "strengths"),
+        "weaknesses": _merge_lists(results, "weaknesses"),
+        "suggestions": _merge_lists(results, "suggestions"),
+        "scores": scores,
+        "turns_analyzed": f"{len(results)}/{total_turns}",
+    }
+
+
+@traced("press.analyze_aggregate")
+def incremental_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aggregates the precomputed per-turn analyses of a session.
+    Waits at most PRESS_ANALYSIS_STOP_WAIT seconds for in-flight turns,
+    then runs the full analysis if any turn is still missing.
+    """
+    session_id = state.get("session_id", "")
+    total = state.get("analysis_submitted", 0)
+
+    with _LOCK:
+        pending = list(_PENDING.get(session_id, []))
+    if pending:
+        wait(pending, timeout=ANALYSIS_STOP_WAIT)
+
+    with _LOCK:
+        per_turn = _RESULTS.get(session_id, {})
+        results = [per_turn[i] for i in sorted(per_turn)]
+
+    if len(results) < total:
+        log_warning(f"⚠️ Only {len(results)}/{total} turns analyzed: running the full analysis.")
+        from src.agents.Press_Conf_Simulator.press_conference_agent import analysis_api_node
+        state = analysis_api_node(state)
+        full = state.get("analysis")
+        if isinstance(full, dict) and "error" not in full:
+            return state
+        if not results:
+            return state  # nothing better to report than the error
+        log_warning("⚠️ Full analysis failed: keeping the partial per-turn aggregate.")
+
+    state["analysis"] = aggregate_results(results, total)
+    log_info(f"🧠 Conversation analysis aggregated from {len(results)}/{total} turns.")
+    return state
+
+
+def drop_session_analysis(session_id: str) -> None:
+    """Forgets the per-turn results of a finished session."""
+    with _LOCK:
+        _PENDING.pop(session_id, None)
+        _RESULTS.pop(session_id, None)
@@ -11,16 +11,59 @@ This node prepares the full Mistral input messages based on:
 Output:
     state["messages"] = [
         {"role": "system", "content": ...},
-        {"role": "user", "content": ...}
+        {"role": "user", "content": <stable prefix> + <turn suffix>}
     ]
+    state["prefix_hash"]  = hash of system prompt + stable user prefix
+    state["prefix_chars"] = length of the stable user prefix
+
+The prefix (persona system prompt, topic, role, opening speech) is
+memoized per session setup, so every turn sends byte-identical
+leading content and the backend can reuse its KV cache for it.
+
+Long speeches are not inlined: the prefix only announces them, and the
+passages most relevant to the latest guest answer are retrieved from
+the session's speech index and placed in the per-turn suffix
+(also exposed as state["speech_context"] for explainability). Callers
+that build several prompts for the same turn (the panel) retrieve once
+with retrieve_turn_passages() and pass the result as
+state["turn_passages"].
 """
 
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from src.agents.Press_Conf_Simulator.prompts.system_prompts import get_system_prompt
-from src.agents.Press_Conf_Simulator.prompts.prompt_utils import summarize_history, build_user_prompt
+from src.agents.Press_Conf_Simulator.prompts.prompt_utils import (
+    summarize_history, build_prompt_prefix, build_turn_suffix, compute_prefix_hash
+)
+from src.agents.Press_Conf_Simulator.speech_index import needs_index, retrieve_passages
 from utils.Press_Simulator.logger import log_info
 
 
+@lru_cache(maxsize=128)
+def get_prompt_prefix(persona: str, topic: str, role: str, speech: str) -> Tuple[str, str, str]:
+    """
+    Returns the memoized (system_prompt, user_prefix, prefix_hash) for a
+    conference setup. Identical inputs always yield identical bytes.
+    """
+    system_prompt = get_system_prompt(persona, topic, role).strip()
+    user_prefix = build_prompt_prefix(topic, role, speech)
+    return system_prompt, user_prefix, compute_prefix_hash(system_prompt, user_prefix)
+
+
+def retrieve_turn_passages(state: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Returns the speech passages relevant to this turn, or None when the
+    speech is short enough to inline (or there is no session index).
+    """
+    speech = state.get("speech", "")
+    session_id = state.get("session_id", "")
+    if not (session_id and needs_index(speech)):
+        return None
+    guest_answers = [t["content"] for t in state.get("history", []) if t.get("role") == "guest"]
+    query = guest_answers[-1] if guest_answers else state.get("topic", "")
+    return retrieve_passages(session_id, speech, query)
+
+
 def build_prompt_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Builds the complete input messages for Mistral based on the agent's state.
@@ -36,15 +79,25 @@ def build_prompt_node(state: Dict[str, Any]) -> Dict[str, Any]:
     # --- Summarize previous conversation ---
     history_summary = summarize_history(history)
 
-    # --- Construct prompts ---
-    system_prompt = get_system_prompt(persona, topic, role)
-    user_prompt = build_user_prompt(topic, role, speech, history_summary)
+    # --- Retrieve relevant passages instead of resending a long speech ---
+    if "turn_passages" in state:
+        passages = state["turn_passages"]
+    else:
+        passages = retrieve_turn_passages(state)
+    prefix_speech = "" if passages else speech
+    state["speech_context"] = "\n".join(passages) if passages else speech
+
+    # --- Construct prompts (stable prefix first, volatile suffix last) ---
+    system_prompt, user_prefix, prefix_hash = get_prompt_prefix(persona, topic, role, prefix_speech)
+    user_prompt = user_prefix + build_turn_suffix(history_summary, passages)
 
     # --- Prepare chat-style messages ---
     state["messages"] = [
-        {"role": "system", "content": system_prompt.strip()},
-        {"role": "user", "content": user_prompt.strip()},
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
     ]
+    state["prefix_hash"] = prefix_hash
+    state["prefix_chars"] = len(user_prefix)
 
     # --- (Optional) Keep raw text for debugging ---
     state["prompt_preview"] = f"{system_prompt}\n\n{user_prompt[:400]}..."
@@ -71,3 +124,5 @@ if __name__ == "__main__":
     print(updated_state["messages"][0]["content"][:300])
     print("\n---\n")
     print(updated_state["messages"][1]["content"][:300])
+    print("\n---\n")
+    print(f"prefix_hash={updated_state['prefix_hash']} prefix_chars={updated_state['prefix_chars']}")
@@ -0,0 +1,168 @@
+# src/agents/Press_Conf_Simulator/opening_prefetch.py
+"""
+Opening-Question Prefetch for the Press Conference Simulator
+------------------------------------------------------------
+
+Users often restart a conference with the same speech and a different
+persona. With prefetch enabled, /start generates the opening question
+of EVERY persona in PERSONAS concurrently with the requested one and
+keeps the results in a short-lived cache keyed by (speech, topic, role,
+persona). A persona switch then serves its first question instantly
+(or waits only for the generation already running). A prefetch still
+queued behind other sessions' work is cancelled instead, and the
+question is generated live, which is never slower. New prefetches are
+skipped while PRESS_PREFETCH_MAX_PENDING submissions are unfinished.
+
+Configuration (environment variables):
+    PRESS_PREFETCH_OPENINGS -> "1" to prefetch on every /start (default "0");
+                               a request can also pass "prefetch": true
+    PRESS_PREFETCH_TTL      -> cache lifetime in seconds (default 600)
+    PRESS_PREFETCH_MAX_PENDING -> queued + running prefetches, all sessions
+                               (default 2 x number of personas)
+"""
+
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from src.agents.Press_Conf_Simulator import PERSONAS
+from src.agents.Press_Conf_Simulator.journalist_nodes import build_prompt_node
+from utils.Press_Simulator.logger import log_info, log_warning
+
+
+PREFETCH_OPENINGS = os.getenv("PRESS_PREFETCH_OPENINGS", "0") == "1"
+PREFETCH_TTL = float(os.getenv("PRESS_PREFETCH_TTL", "600"))
+PREFETCH_MAX_PENDING = int(os.getenv("PRESS_PREFETCH_MAX_PENDING", str(2 * len(PERSONAS))))
+_MAX_ENTRIES = 512
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=len(PERSONAS), thread_name_prefix="prefetch")
+_CACHE: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, Future[str])
+_LOCK = threading.Lock()
+_pending = 0  # submitted prefetches not finished or cancelled yet (guarded by _LOCK)
+
+
+def _key(state: Dict[str, Any], persona: str) -> str:
+    digest = hashlib.sha256()
+    for part in (state.get("speech", ""), state.get("topic", ""), state.get("role", "")):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return f"{persona}:{digest.hexdigest()[:32]}"
+
+
+def _lookup(key: str) -> Optional[Future]:
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            return None
+        expires_at, future = entry
+        if expires_at < time.time():
+            del _CACHE[key]
+            return None
+        return future
+
+
+def _store(key: str, future: Future) -> None:
+    with _LOCK:
+        _CACHE[key] = (time.time() + PREFETCH_TTL, future)
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+
+
+def _finished(_future: Future) -> None:
+    global _pending
+    with _LOCK:
+        _pending -= 1
+
+
+def _submit(state: Dict[str, Any], persona: str) -> Optional[Future]:
+    """Queues one prefetch, or returns None when too many are already pending."""
+    global _pending
+    with _LOCK:
+        if _pending >= PREFETCH_MAX_PENDING:
+            return None
+        _pending += 1
+    future = _EXECUTOR.submit(contextvars.copy_context().run, _generate_opening, dict(state), persona)
+    future.add_done_callback(_finished)  # also runs on cancel()
+    return future
+
+
+def _generate_opening(state: Dict[str, Any], persona: str) -> str:
+    from src.agents.Press_Conf_Simulator.press_conference_agent import request_question
+    prompt_state = build_prompt_node(dict(state, persona=persona, history=[]))
+    question = request_question(
+        prompt_state["messages"], prompt_state["prefix_hash"], prompt_state["prefix_chars"],
+        session_id=state.get("session_id", ""),
+    )
+    if not question or question.startswith("["):
+        raise ValueError(f"unusable opening question: {question!r}")
+    return question
+
+
+# ===============================================================
+# Public helpers
+# ===============================================================
+def prefetch_openings(state: Dict[str, Any]) -> None:
+    """Starts opening-question generation for every persona not cached yet."""
+    started = skipped = 0
+    for persona in PERSONAS:
+        key = _key(state, persona)
+        if persona == state.get("persona") or _lookup(key) is not None:
+            continue
+        future = _submit(state, persona)
+        if future is None:
+            skipped += 1
+            continue
+        _store(key, future)
+        started += 1
+    if started:
+        log_info(f"📥 Prefetching opening questions for {started} persona(s).")
+    if skipped:
+        log_warning(f"📥 Skipped {skipped} opening prefetch(es): {PREFETCH_MAX_PENDING} already pending.")
+
+
+def remember_opening(state: Dict[str, Any], question: str) -> None:
+    """Caches the opening question generated live for the requested persona."""
+    if question and not question.startswith("["):
+        future: Future = Future()
+        future.set_result(question)
+        _store(_key(state, state.get("persona", "")), future)
+
+
+def get_prefetched_opening(state: Dict[str, Any], timeout: float = 4000) -> Optional[str]:
+    """
+    Returns the cached (or running) opening question for state's persona.
+    A prefetch that hasn't started yet is cancelled and None returned, so
+    the caller generates live instead of queueing behind other sessions.
+    """
+    key = _key(state, state.get("persona", ""))
+    future = _lookup(key)
+    if future is None:
+        return None
+    if future.cancel():  # only succeeds while still queued
+        with _LOCK:
+            if _CACHE.get(key, (None, None))[1] is future:
+                del _CACHE[key]
+        log_info(f"⏭️ Opening prefetch for '{state.get('persona')}' still queued; generating live.")
+        return None
+    try:
+        return future.result(timeout=timeout)
+    except Exception as e:
+        log_warning(f"Prefetched opening unavailable: {e}")
+        with _LOCK:
+            _CACHE.pop(key, None)
+        return None
+
+
+def prefetched_question_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Graph node: serves the prefetched question instead of calling the backend."""
+    # Still build the prompt so speech_context is set for explainability
+    state = build_prompt_node(state)
+    state["journalist_question"] = state["prefetched_question"]
+    log_info(f"⚡ Serving prefetched opening question for '{state.get('persona')}'")
+    return state
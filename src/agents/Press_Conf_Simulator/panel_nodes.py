@@ -0,0 +1,160 @@
+# src/agents/Press_Conf_Simulator/panel_nodes.py
+"""
+Multi-Journalist Panel Node for the Press Conference Simulator
+--------------------------------------------------------------
+
+Real press conferences have several reporters. In panel mode every
+persona listed in state["panel"] drafts a candidate question for the
+same turn:
+
+    1. speech passages are retrieved once, then prompts are built per
+       persona (each with its own cached prefix)
+    2. generate calls fan out on a per-turn pool, so each turn gets up to
+       PANEL_MAX_CONCURRENCY calls regardless of other live sessions
+    3. candidates still running at the per-turn deadline are dropped
+    4. a local ranker orders the rest by relevance to the speech and
+       novelty versus the questions already asked
+
+Configuration (environment variables):
+    PRESS_PANEL_MAX_CONCURRENCY -> parallel generate calls per turn (default 4)
+    PRESS_PANEL_DEADLINE        -> seconds per turn (default 30)
+
+Output:
+    state["journalist_question"] = best candidate
+    state["journalist_persona"]  = persona who asked it
+    state["panel_candidates"]    = ranked [{persona, question, score}]
+"""
+
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from src.agents.Press_Conf_Simulator import PERSONAS
+from src.agents.Press_Conf_Simulator.journalist_nodes import build_prompt_node, retrieve_turn_passages
+from src.agents.Press_Conf_Simulator.press_conference_agent import request_question
+from utils.Press_Simulator.logger import log_info, log_warning
+
+
+PANEL_MAX_CONCURRENCY = int(os.getenv("PRESS_PANEL_MAX_CONCURRENCY", "4"))
+PANEL_DEADLINE = float(os.getenv("PRESS_PANEL_DEADLINE", "30"))
+
+# Ranker weights: relevance to the speech vs. novelty versus history
+RELEVANCE_WEIGHT = 0.5
+NOVELTY_WEIGHT = 0.5
+
+
+def resolve_panel(panel: Any) -> List[str]:
+    """Normalizes a request's panel field (True or a list of keys) to persona keys."""
+    if panel is True:
+        return list(PERSONAS)
+    if isinstance(panel, (list, tuple)):
+        return [p for p in dict.fromkeys(panel) if p in PERSONAS]
+    return []
+
+
+# ===============================================================
+# 1️⃣ Local ranker
+# ===============================================================
+def rank_questions(candidates: List[Dict[str, str]], history: List[Dict[str, str]],
+                   speech: str) -> List[Dict[str, Any]]:
+    """
+    Scores candidates by TF-IDF relevance to the speech and novelty
+    (1 - max similarity to previous journalist questions), best first.
+    """
+    if not candidates:
+        return []
+    questions = [c["question"] for c in candidates]
+    asked = [t["content"] for t in history if t.get("role") == "journalist"]
+    try:
+        X = TfidfVectorizer().fit_transform(questions + [speech or " "] + asked)
+    except ValueError:
+        # Empty vocabulary: keep panel order
+        return [dict(c, score=0.0) for c in candidates]
+
+    n = len(questions)
+    relevance = cosine_similarity(X[:n], X[n:n + 1]).ravel()
+    if asked:
+        novelty = 1 - cosine_similarity(X[:n], X[n + 1:]).max(axis=1)
+    else:
+        novelty = np.ones(n)
+
+    scores = RELEVANCE_WEIGHT * relevance + NOVELTY_WEIGHT * novelty
+    ranked = [dict(c, score=round(float(s), 4)) for c, s in zip(candidates, scores)]
+    return sorted(ranked, key=lambda c: -c["score"])
+
+
+# ===============================================================
+# 2️⃣ Fan-out node
+# ===============================================================
+def panel_query_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Asks every panel persona concurrently and keeps the best question."""
+    personas = resolve_panel(state.get("panel"))
+    deadline = float(state.get("panel_deadline") or PANEL_DEADLINE)
+    started = time.perf_counter()
+
+    # One retrieval per turn: every persona sees the same passages
+    passages = retrieve_turn_passages(state)
+    state["speech_context"] = "\n".join(passages) if passages else state.get("speech", "")
+
+    # A pool per turn: a busy session can't starve another session's panel
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(PANEL_MAX_CONCURRENCY, len(personas))),
+        thread_name_prefix="panel",
+    )
+    futures = {}
+    for persona in personas:
+        prompt_state = build_prompt_node(dict(state, persona=persona, turn_passages=passages))
+        # copy_context keeps the request ID for backend calls made in the pool
+        futures[executor.submit(
+            contextvars.copy_context().run,
+            request_question,
+            prompt_state["messages"],
+            prompt_state["prefix_hash"],
+            prompt_state["prefix_chars"],
+            deadline,
+            state.get("session_id", ""),
+        )] = persona
+
+    done, not_done = wait(futures, timeout=deadline)
+    # Don't block the turn on stragglers; queued calls are cancelled
+    executor.shutdown(wait=False, cancel_futures=True)
+    for future in not_done:
+        log_warning(f"⏱️ Panel persona '{futures[future]}' dropped at the {deadline:.0f}s deadline.")
+
+    candidates = []
+    for future in done:
+        try:
+            question = future.result()
+        except Exception as e:
+            log_warning(f"Panel persona '{futures[future]}' failed: {e}")
+            continue
+        if question and not question.startswith("["):
+            candidates.append({"persona": futures[future], "question": question})
+
+    # Panel order breaks ties deterministically
+    candidates.sort(key=lambda c: personas.index(c["persona"]))
+    ranked = rank_questions(candidates, state.get("history", []), state.get("speech_context", ""))
+    state["panel_candidates"] = ranked
+    if ranked:
+        state["journalist_question"] = ranked[0]["question"]
+        state["journalist_persona"] = ranked[0]["persona"]
+    else:
+        state["journalist_question"] = "[No panel question before the deadline]"
+        state["journalist_persona"] = ""
+
+    log_info(
+        f"🎙️ Panel turn: {len(ranked)}/{len(personas)} personas answered in "
+        f"{time.perf_counter() - started:.2f}s, picked '{state['journalist_persona']}'"
+    )
+    return state
+
+
+def route_turn_mode(state: Dict[str, Any]) -> str:
+    """LangGraph router: panel fan-out when more than one persona is on the panel."""
+    return "panel" if len(resolve_panel(state.get("panel"))) > 1 else "single"
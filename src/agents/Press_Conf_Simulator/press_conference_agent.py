@@ -5,32 +5,50 @@ Press Conference Agent Graph
 
 This module defines the LangGraph pipeline that runs one full
 Press Conference turn:
-    build_prompt → mistral_query → explainability → END
-
-All model inference and explainability are executed remotely
-on Kaggle (via ngrok). The local graph only orchestrates requests
-and maintains conversation state.
+    build_prompt → mistral_query ─┐
+    panel_query (panel mode) ─────┤
+    prefetched (cached opening) ──┴→ explain_local | explain → END
+
+Model inference runs remotely on Kaggle (via ngrok). Explainability
+runs locally by default (lexical / TF-IDF / embedding similarity) and
+escalates to the remote SHAP/attention backend only when the request
+asks for "deep" mode. The local graph orchestrates requests and
+maintains conversation state.
 """
 
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, Optional
 import requests, json
 from src.agents.Press_Conf_Simulator.journalist_nodes import build_prompt_node
-from utils.Press_Simulator.api_endpoints import KAGGLE_GENERATE_API, KAGGLE_EXPLAIN_API, KAGGLE_ANALYZE_API
-from utils.Press_Simulator.logger import log_info, log_error, log_warning
+from src.agents.Press_Conf_Simulator.explainability_nodes import local_explainability_node, route_explain_mode
+from utils.Press_Simulator.backend_pool import generate_pool, explain_pool, analyze_pool
+from utils.Press_Simulator import session_protocol
+from utils.metrics import traced
+from utils.Press_Simulator.logger import log_debug, log_info, log_error, log_warning
+from utils.Press_Simulator.explain_cache import explain_cache
 
 
 # ===============================================================
 # State Schema
 # ===============================================================
 class AgentState(TypedDict, total=False):
+    session_id: str
     persona: str
     topic: str
     role: str
     speech: str
+    speech_context: str
     history: list
     messages: list
+    prefix_hash: str
+    prefix_chars: int
     journalist_question: str
+    journalist_persona: str
+    panel: list
+    panel_deadline: float
+    panel_candidates: list
+    prefetched_question: str
+    explain_mode: str
     explanation: str
 
 
@@ -66,6 +84,25 @@ def _extract_question(text: str) -> str:
 
 
 
+def request_question(messages: list, prefix_hash: str = "", prefix_chars: int = 0,
+                     timeout: float = 4000, session_id: str = "") -> str:
+    """Posts chat messages to the generate backend and returns the extracted question."""
+    if session_protocol.use_session_protocol(session_id):
+        # Only the per-turn suffix travels once the backend holds the prefix
+        res = session_protocol.generate(generate_pool, session_id, messages, prefix_hash, prefix_chars, timeout)
+    else:
+        payload = {
+            "messages": messages,
+            # Lets the backend reuse its KV cache for the stable prompt prefix
+            "prefix_hash": prefix_hash,
+            "prefix_chars": prefix_chars,
+        }
+        res = generate_pool.post(json=payload, timeout=timeout)
+    log_info(f"🌐 Status: {res.status_code}")
+    data = res.json()
+    return _extract_question(data.get("response", ""))
+
+
 def mistral_query_node(state: AgentState) -> AgentState:
     """Sends the prepared messages to the Kaggle backend for generation."""
     messages = state.get("messages", [])
@@ -76,12 +113,10 @@ def mistral_query_node(state: AgentState) -> AgentState:
 
     try:
         log_info("🚀 Sending prompt to Kaggle backend...")
-        res = requests.post(KAGGLE_GENERATE_API, json={"messages": messages}, timeout=4000)
-        log_info(f"🌐 Status: {res.status_code}")
-
-        data = res.json()
-        raw = data.get("response", "")
-        question = _extract_question(raw)
+        question = request_question(
+            messages, state.get("prefix_hash", ""), state.get("prefix_chars", 0),
+            session_id=state.get("session_id", ""),
+        )
         state["journalist_question"] = question
         log_info(f"🗞️ Journalist question: {question}")
 
@@ -99,23 +134,37 @@ def mistral_query_node(state: AgentState) -> AgentState:
 def explainability_api_node(state: AgentState) -> AgentState:
     """Calls Kaggle backend to compute SHAP/semantic/attention explanations."""
     question = state.get("journalist_question", "")
-    speech = state.get("speech", "")
+    # Only the passages retrieved for this turn, not the whole speech
+    speech = state.get("speech_context") or state.get("speech", "")
     if not question or not speech:
         log_warning("Insufficient data for explainability.")
         state["explanation"] = "No data for explainability."
         return state
 
+    # --- Repeated (speech, question) pairs skip the network entirely ---
+    cached = explain_cache.get(speech, question, "deep")
+    if cached is not None:
+        state["explanation"] = cached
+        explain_cache.log_stats()
+        return state
+
     log_info("🧩 Running explainability modes on Kaggle backend...")
 
     try:
-        payload = {"speech": speech, "question": question}
-        res = requests.post(KAGGLE_EXPLAIN_API, json=payload, timeout=4000)
+        if session_protocol.use_session_protocol(state.get("session_id", "")):
+            res = session_protocol.explain(explain_pool, state, question, speech)
+        else:
+            payload = {"speech": speech, "question": question}
+            res = explain_pool.post(json=payload, timeout=4000)
         data = res.json()
 
         # Here’s the important change 👇
         state["explanation"] = data
         shap_text = data.get("shap", "No SHAP output.")
         log_info(f"✅ Explainability (SHAP): {shap_text[:120]}...")
+        if res.ok and "general_error" not in data:
+            explain_cache.put(speech, question, "deep", data)
+        explain_cache.log_stats()
 
     except Exception as e:
         log_error(f"❌ Error during explainability: {e}")
@@ -124,21 +173,26 @@ def explainability_api_node(state: AgentState) -> AgentState:
     return state
 
 
+@traced("press.analyze")
 def analysis_api_node(state: AgentState) -> AgentState:
     """Request full conversation analysis from Kaggle backend."""
 
     try:
-        payload = {
-            "persona": state.get("persona", ""),
-            "role": state.get("role", ""),
-            "topic": state.get("topic", ""),
-            "speech": state.get("speech", ""),
-            "history": state.get("history", []),
-        }
-        res = requests.post(KAGGLE_ANALYZE_API, json=payload, timeout=4000)
+        if session_protocol.use_session_protocol(state.get("session_id", "")):
+            # Only the turns the backend has not received yet are sent
+            res = session_protocol.analyze(analyze_pool, state, scope="full")
+        else:
+            payload = {
+                "persona": state.get("persona", ""),
+                "role": state.get("role", ""),
+                "topic": state.get("topic", ""),
+                "speech": state.get("speech", ""),
+                "history": state.get("history", []),
+            }
+            res = analyze_pool.post(json=payload, timeout=4000)
         data = res.json()
         state["analysis"] = data
-        log_info(f"🧠 Raw analysis response: {data}")
+        log_debug("🧠 Raw analysis response: %s", data)
         log_info("🧠 Conversation analysis completed successfully.")
     except Exception as e:
         log_error(f"❌ Error during analysis: {e}")
@@ -155,15 +209,39 @@ def analysis_api_node(state: AgentState) -> AgentState:
 # ===============================================================
 def press_conference_agent():
     """Compiles and returns the Press Conference LangGraph pipeline."""
-    g = StateGraph(AgentState)
+    # Imported here: panel_nodes depends on request_question from this module
+    from src.agents.Press_Conf_Simulator.panel_nodes import panel_query_node, route_turn_mode
+    from src.agents.Press_Conf_Simulator.opening_prefetch import prefetched_question_node
+
+    def route_entry(state: AgentState) -> str:
+        return "prefetched" if state.get("prefetched_question") else route_turn_mode(state)
 
-    g.add_node("build_prompt", build_prompt_node)
-    g.add_node("mistral_query", mistral_query_node)
-    g.add_node("explain", explainability_api_node)
+    g = StateGraph(AgentState)
 
-    g.set_entry_point("build_prompt")
+    # Every node is timed into span_duration_seconds{span="press.<node>"}
+    nodes = {
+        "build_prompt": build_prompt_node,
+        "mistral_query": mistral_query_node,
+        "panel_query": panel_query_node,
+        "prefetched": prefetched_question_node,
+        "explain_local": local_explainability_node,
+        "explain": explainability_api_node,
+    }
+    for name, node in nodes.items():
+        g.add_node(name, traced(f"press.{name}")(node))
+
+    g.set_conditional_entry_point(route_entry, {
+        "single": "build_prompt",
+        "panel": "panel_query",
+        "prefetched": "prefetched",
+    })
     g.add_edge("build_prompt", "mistral_query")
-    g.add_edge("mistral_query", "explain")
+    for query_node in ("mistral_query", "panel_query", "prefetched"):
+        g.add_conditional_edges(query_node, route_explain_mode, {
+            "local": "explain_local",
+            "deep": "explain",
+        })
+    g.add_edge("explain_local", END)
     g.add_edge("explain", END)
 
     log_info("🧱 Press Conference Graph compiled successfully.")
@@ -8,13 +8,21 @@ Handles dynamic prompt creation:
 - Builds the user-side prompt for Mistral (speech + recent turns).
 - Maintains coherence and persona alignment across turns.
 
+Prompt layout:
+    The user prompt is split into a byte-stable PREFIX (topic, role,
+    opening speech, task rules) and a per-turn SUFFIX (history summary).
+    The prefix never changes within a session, so a backend can reuse
+    its KV cache for it; only the suffix has to be prefilled each turn.
+
 Usage:
     from src.agents.Press_Conf_Simulator.prompts.prompt_utils import (
         summarize_history, build_user_prompt
     )
 """
 
-from typing import List, Dict
+import hashlib
+import re
+from typing import List, Dict, Optional
 
 
 # ===============================================================
@@ -47,33 +55,52 @@ def summarize_history(turns: List[Dict[str, str]], max_chars: int = 800) -> str:
     return text
 
 
+# ===============================================================
+# Token estimation
+# ===============================================================
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap, tokenizer-free estimate of the number of tokens in a text
+    (one token per word or punctuation mark).
+    """
+    return len(_TOKEN_RE.findall(text or ""))
+
+
 # ===============================================================
 # Dynamic User Prompt Construction
 # ===============================================================
-def build_user_prompt(topic: str, role: str, opening_speech: str, history_summary: str) -> str:
+def build_prompt_prefix(topic: str, role: str, opening_speech: str) -> str:
     """
-    Builds the 'user' message that Mistral receives each turn.
+    Builds the session-constant part of the user message.
+
+    Everything here depends only on the conference setup, so the
+    returned string is byte-identical on every turn of a session.
 
     Args:
         topic: Main press conference topic.
         role: Role of the guest (e.g., CEO, Minister).
-        opening_speech: The initial speech or statement.
-        history_summary: Condensed dialogue summary from summarize_history().
+        opening_speech: The initial speech or statement. Pass an empty
+            string when relevant passages are injected per turn instead.
 
     Returns:
-        A formatted string representing the user input context.
+        The stable prefix of the user message.
     """
-    return f"""
-Contexte de la conférence :
+    if opening_speech:
+        speech_block = f"""Discours d'ouverture (référence constante) :
+\"\"\"{opening_speech}\"\"\"
+"""
+    else:
+        speech_block = """Discours d'ouverture : trop long pour être cité en entier,
+les extraits pertinents sont fournis à chaque tour.
+"""
+    return f"""Contexte de la conférence :
 - Sujet : {topic}
 - Interlocuteur (guest) : {role}
 
-Discours d'ouverture (référence constante) :
-\"\"\"{opening_speech}\"\"\"
-
-Résumé des derniers échanges :
-{history_summary}
-
+{speech_block}
 Tâche :
 1. Identifier les points encore ambigus ou peu explorés.
 2. Décider s’il faut relancer sur le discours initial ou sur la réponse du guest.
@@ -82,6 +109,63 @@ Tâche :
 """
 
 
+def build_turn_suffix(history_summary: str, passages: Optional[List[str]] = None) -> str:
+    """
+    Builds the volatile, per-turn part of the user message.
+
+    Args:
+        history_summary: Condensed dialogue summary from summarize_history().
+        passages: Speech passages retrieved for this turn (optional).
+
+    Returns:
+        The suffix appended after build_prompt_prefix().
+    """
+    excerpts = ""
+    if passages:
+        quoted = "\n".join(f'- "{p}"' for p in passages)
+        excerpts = f"""
+Extraits pertinents du discours :
+{quoted}
+"""
+    return f"""{excerpts}
+Résumé des derniers échanges :
+{history_summary}
+
+Ta prochaine question (entre <QUESTION> et <eoa>) :"""
+
+
+def build_user_prompt(topic: str, role: str, opening_speech: str, history_summary: str) -> str:
+    """
+    Builds the 'user' message that Mistral receives each turn.
+
+    Args:
+        topic: Main press conference topic.
+        role: Role of the guest (e.g., CEO, Minister).
+        opening_speech: The initial speech or statement.
+        history_summary: Condensed dialogue summary from summarize_history().
+
+    Returns:
+        A formatted string representing the user input context
+        (stable prefix followed by the per-turn suffix).
+    """
+    return build_prompt_prefix(topic, role, opening_speech) + build_turn_suffix(history_summary)
+
+
+def compute_prefix_hash(system_prompt: str, user_prefix: str) -> str:
+    """
+    Content hash identifying a cacheable prompt prefix.
+
+    The generation backend recomputes the same hash over the
+    system message and the first len(user_prefix) characters of
+    the user message, and reuses its KV cache when they match.
+    """
+    digest = hashlib.sha256()
+    digest.update(system_prompt.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(user_prefix.encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
 # ===============================================================
 # Example usage (debug)
 # ===============================================================
@@ -0,0 +1,194 @@
+# src/agents/Press_Conf_Simulator/speech_index.py
+"""
+Speech Passage Index for the Press Conference Simulator
+-------------------------------------------------------
+
+Long keynote transcripts make every turn expensive when the whole
+opening speech is resent. This module chunks the speech once per
+session (at /start), embeds the passages with the shared
+SentenceTransformer from `src/embeddings/embed_model`, and retrieves
+only the passages relevant to the latest guest answer.
+
+Configuration (environment variables):
+    PRESS_SPEECH_TOP_K         -> max passages injected per turn (default 4)
+    PRESS_SPEECH_TOKEN_BUDGET  -> max speech tokens per turn (default 600)
+    PRESS_SPEECH_INDEX_SIZE    -> max sessions kept in memory (default 256)
+
+Speeches that already fit in the token budget are not indexed: they
+stay inlined in the cached prompt prefix.
+
+Usage:
+    from src.agents.Press_Conf_Simulator.speech_index import (
+        build_speech_index, retrieve_passages
+    )
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from src.agents.Press_Conf_Simulator.prompts.prompt_utils import estimate_tokens
+from utils.Press_Simulator.logger import log_info
+
+
+SPEECH_TOP_K = int(os.getenv("PRESS_SPEECH_TOP_K", "4"))
+SPEECH_TOKEN_BUDGET = int(os.getenv("PRESS_SPEECH_TOKEN_BUDGET", "600"))
+SPEECH_INDEX_SIZE = int(os.getenv("PRESS_SPEECH_INDEX_SIZE", "256"))
+
+
+# ===============================================================
+# 1️⃣ Chunking
+# ===============================================================
+def _truncate(text: str, max_tokens: int) -> str:
+    """Leading words of `text` fitting in `max_tokens` (at least one word)."""
+    words, kept = text.split(), []
+    for word in words:
+        if kept and estimate_tokens(" ".join(kept + [word])) > max_tokens:
+            break
+        kept.append(word)
+    return " ".join(kept)
+
+
+def _split_long(sentence: str, max_tokens: int) -> List[str]:
+    """Cuts an over-long sentence (e.g. an unpunctuated ASR transcript) into word runs."""
+    pieces, rest = [], sentence
+    while rest and estimate_tokens(rest) > max_tokens:
+        piece = _truncate(rest, max_tokens)
+        pieces.append(piece)
+        rest = rest.split(None, len(piece.split()))[-1] if len(piece.split()) < len(rest.split()) else ""
+    if rest:
+        pieces.append(rest)
+    return pieces
+
+
+def chunk_speech(speech: str, max_tokens: int = 120, overlap_sentences: int = 1) -> List[str]:
+    """
+    Splits a speech into sentence-aligned passages of roughly
+    `max_tokens` tokens, repeating `overlap_sentences` sentences
+    between consecutive passages to keep local context. Sentences longer
+    than `max_tokens` are cut by token count into halves of the budget,
+    so a passage plus its overlapping piece still fits.
+    """
+    sentences = [piece
+                 for s in re.split(r"(?<=[.!?])\s+", speech or "") if s.strip()
+                 for piece in (_split_long(s.strip(), max(max_tokens // 2, 1))
+                               if estimate_tokens(s) > max_tokens else [s.strip()])]
+    passages, current, current_tokens = [], [], 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        if current and current_tokens + tokens > max_tokens:
+            passages.append(" ".join(current))
+            current = current[-overlap_sentences:] if overlap_sentences else []
+            current_tokens = sum(estimate_tokens(s) for s in current)
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+# ===============================================================
+# 2️⃣ Index
+# ===============================================================
+def _default_encoder(texts: List[str]) -> np.ndarray:
+    # Imported lazily: loading the SentenceTransformer is expensive
+    from src.embeddings.embed_model import embed_model
+    return embed_model.encode(texts, show_progress_bar=False, normalize_embeddings=True)
+
+
+class SpeechIndex:
+    """Passages of one speech and their normalized embeddings."""
+
+    def __init__(self, speech: str, encoder: Optional[Callable[[List[str]], np.ndarray]] = None):
+        self.encoder = encoder or _default_encoder
+        self.passages = chunk_speech(speech)
+        self.token_counts = [estimate_tokens(p) for p in self.passages]
+        vectors = np.asarray(self.encoder(self.passages), dtype=np.float32) if self.passages else np.zeros((0, 1))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True) if len(vectors) else 1.0
+        self.embeddings = vectors / np.maximum(norms, 1e-12)
+
+    def search(self, query: str, top_k: int = SPEECH_TOP_K,
+               token_budget: int = SPEECH_TOKEN_BUDGET) -> List[str]:
+        """
+        Returns the most relevant passages for `query` that fit in
+        `token_budget`, in their original speech order. Never empty for a
+        non-empty speech: if no passage fits, the best one is truncated.
+        """
+        if not self.passages:
+            return []
+        if query.strip():
+            q = np.asarray(self.encoder([query]), dtype=np.float32)[0]
+            q = q / max(float(np.linalg.norm(q)), 1e-12)
+            ranking = np.argsort(-(self.embeddings @ q))
+        else:
+            ranking = np.arange(len(self.passages))
+
+        chosen, used = [], 0
+        for idx in ranking:
+            if len(chosen) >= top_k:
+                break
+            if used + self.token_counts[idx] > token_budget:
+                continue
+            chosen.append(int(idx))
+            used += self.token_counts[idx]
+        if not chosen:
+            return [_truncate(self.passages[int(ranking[0])], token_budget)]
+        return [self.passages[i] for i in sorted(chosen)]
+
+
+# ===============================================================
+# 3️⃣ Per-session registry
+# ===============================================================
+_INDEXES: "OrderedDict[str, SpeechIndex]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def needs_index(speech: str, token_budget: int = SPEECH_TOKEN_BUDGET) -> bool:
+    """True when the speech is too long to inline in every prompt."""
+    return estimate_tokens(speech) > token_budget
+
+
+def build_speech_index(session_id: str, speech: str) -> Optional[SpeechIndex]:
+    """Builds (once) and registers the passage index for a session."""
+    if not session_id or not needs_index(speech):
+        return None
+    index = SpeechIndex(speech)
+    with _LOCK:
+        _INDEXES[session_id] = index
+        _INDEXES.move_to_end(session_id)
+        while len(_INDEXES) > SPEECH_INDEX_SIZE:
+            _INDEXES.popitem(last=False)
+    log_info(f"📚 Speech index built for session {session_id[:8]}: {len(index.passages)} passages")
+    return index
+
+
+def get_speech_index(session_id: str, speech: str = "") -> Optional[SpeechIndex]:
+    """
+    Returns the session's index, rebuilding it from `speech` if it was
+    evicted (e.g. after a server restart).
+    """
+    with _LOCK:
+        index = _INDEXES.get(session_id)
+        if index is not None:
+            _INDEXES.move_to_end(session_id)
+            return index
+    return build_speech_index(session_id, speech) if speech else None
+
+
+def drop_speech_index(session_id: str) -> None:
+    """Frees the index of a finished session."""
+    with _LOCK:
+        _INDEXES.pop(session_id, None)
+
+
+def retrieve_passages(session_id: str, speech: str, query: str,
+                      top_k: int = SPEECH_TOP_K, token_budget: int = SPEECH_TOKEN_BUDGET) -> List[str]:
+    """Top-k relevant speech passages for the latest guest answer."""
+    index = get_speech_index(session_id, speech)
+    if index is None:
+        return []
+    return index.search(query, top_k=top_k, token_budget=token_budget)
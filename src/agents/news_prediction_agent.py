@@ -8,22 +8,38 @@ import pandas as pd
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 import json
+from utils.metrics import span, traced
+from utils.llm_gateway import llm_gateway, PRIORITY_HIGH
 
 class NewsPredictionAgent:
 
-    def __init__(self, model_path: str, openai_model: str = "gpt-4.1-mini", temperature: float = 0.7):
+    def __init__(self, model_path: str, openai_model: str = "gpt-4.1-mini", temperature: float = 0.7,
+                 web_verification: bool = True):
         self.model = joblib.load(model_path)
         self.label_map = {0: "Fake News", 1: "True News"}
-        self.chat = ChatOpenAI(model_name=openai_model, temperature=temperature)
+        # OPENAI_BASE_URL can point at a compatible server (e.g. utils/openai_standin.py).
+        # Retries are left to utils/llm_gateway.py (429s, connection errors, timeouts, 5xx).
+        # Without web verification (e.g. offline bulk scoring) no client or API key is needed.
+        self.chat = ChatOpenAI(model_name=openai_model, temperature=temperature,
+                               base_url=os.getenv("OPENAI_BASE_URL") or None,
+                               max_retries=0) if web_verification else None
+        # Receives (news_item, verification) from decide_final_result (see utils/online_learning.py)
+        self.verdict_sink = None
 
 
+    @traced("news.predict_news")
     def predict_news(self, news_item: NewsItem) -> dict:
             news_dict = news_item.model_dump()
             ground_truth = news_dict.pop("label", None)
+            # Read once: a snapshot swapped in mid-request (utils/online_learning.py)
+            # must not mix one model's label with another's probabilities
+            model = self.model
             temp_df = pd.DataFrame([news_dict])
-            X_new = preprocess_and_embed(temp_df, text_column='text')
-            y_pred = self.model.predict(X_new)
-            y_prob = self.model.predict_proba(X_new)[0]
+            with span("news.embed"):
+                X_new = preprocess_and_embed(temp_df, text_column='text')
+            with span("news.classify"):
+                y_pred = model.predict(X_new)
+                y_prob = model.predict_proba(X_new)[0]
             prediction = self.label_map[y_pred[0]]
             confidence = y_prob[y_pred[0]] * 100
             return {
@@ -32,6 +48,29 @@ class NewsPredictionAgent:
                 "Ground Truth": "True News" if ground_truth == 1 else "Fake News" if ground_truth == 0 else None
             }
 
+    @traced("news.predict_batch")
+    def predict_batch(self, df: pd.DataFrame) -> list:
+            """
+            predict_news for a whole DataFrame (title/text/subject/date[/label]):
+            one batched embedding pass and one classifier call.
+            """
+            model = self.model  # read once, see predict_news
+            with span("news.embed"):
+                X_new = preprocess_and_embed(df.copy(), text_column='text')
+            with span("news.classify"):
+                y_prob = model.predict_proba(X_new)
+            y_pred = y_prob.argmax(axis=1)
+            labels = df["label"].tolist() if "label" in df else [None] * len(df)
+            return [
+                {
+                    "Prediction": self.label_map[model.classes_[k]],
+                    "Confidence": f"{prob[k] * 100:.2f}%",
+                    "Ground Truth": "True News" if truth == 1 else "Fake News" if truth == 0 else None
+                }
+                for k, prob, truth in zip(y_pred, y_prob, labels)
+            ]
+
+    @traced("news.verify_news_with_websearch")
     def verify_news_with_websearch(self, news_item: NewsItem) -> VerificationResult:
         system_prompt = (
             "You are a news verification assistant. "
@@ -54,7 +93,9 @@ class NewsPredictionAgent:
     """
 
         messages = [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
-        response = self.chat.invoke(messages, tools=[{"type": "web_search"}])
+        with span("news.web_search"):
+            response = llm_gateway.invoke(self.chat, messages, route="predict_news",
+                                          priority=PRIORITY_HIGH, tools=[{"type": "web_search"}])
 
         # Safely extract text
         if isinstance(response.content, list):
@@ -72,10 +113,15 @@ class NewsPredictionAgent:
             return VerificationResult(verdict=0, url="")
         
         
-    def decide_final_result(self, prediction: dict, verification: VerificationResult) -> dict:
+    @traced("news.decide_final_result")
+    def decide_final_result(self, prediction: dict, verification: VerificationResult,
+                            news_item: NewsItem = None) -> dict:
             """
             Combine model prediction and web verification to produce a final verdict.
+            With `news_item`, the verdict is also passed to verdict_sink (online learning).
             """
+            if news_item is not None and getattr(self, "verdict_sink", None):
+                self.verdict_sink(news_item, verification)
             if verification.verdict == 1:
                 return {
                     "Final Verdict": "True News",
@@ -1,5 +1,6 @@
 # src/embeddings/embed_model.py
 import os
+from typing import List, Optional, Tuple
 from sentence_transformers import SentenceTransformer
 import pandas as pd
 import numpy as np
@@ -12,18 +13,143 @@ HF_TOKEN = os.getenv("HF_TOKEN")
 # Path to optionally load a previously saved embedding model
 SAVED_MODEL_PATH = os.path.join(os.path.dirname(__file__), "../models/embedding_model")
 
+# Encoding mode:
+#   plain    -> embed_model.encode on the raw list (text past max_seq_length is dropped)
+#   bucketed -> inputs sorted by token length and batched under a token budget,
+#               so short items are not padded to the longest article; order restored
+#   windowed -> bucketed + long articles split into overlapping windows that are
+#               encoded in the same batches and mean-pooled back to one vector
+# plain stays the default until the embed_text[mode=...] benchmarks show a gain for
+# another mode and its vectors/accuracy are confirmed to match plain on held-out data.
+EMBED_MODE = os.getenv("EMBED_MODE", "plain")
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "8192"))   # padded tokens per batch
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "128"))
+EMBED_WINDOW_OVERLAP = int(os.getenv("EMBED_WINDOW_OVERLAP", "32"))  # tokens shared by windows
+EMBED_MAX_WINDOWS = int(os.getenv("EMBED_MAX_WINDOWS", "32"))       # per article
+
+# Encoder backend (CPU inference):
+#   torch -> fp32 PyTorch (reference)
+#   int8  -> PyTorch dynamic int8 quantization of the Linear layers, applied at load
+#   onnx  -> ONNX Runtime graph exported by `python -m src.embeddings.quantize_encoder export`
+#            (EMBED_ONNX_FILE picks the file, e.g. the int8-quantized one)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+ONNX_MODEL_PATH = os.path.join(os.path.dirname(__file__), "../models/embedding_model_onnx")
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE", "onnx/model_qint8_avx2.onnx")
+
+
+def load_encoder(backend: str = EMBED_BACKEND) -> SentenceTransformer:
+    """Loads the sentence encoder with the requested backend."""
+    source = SAVED_MODEL_PATH if os.path.exists(SAVED_MODEL_PATH) else 'all-MiniLM-L6-v2'
+    if backend == "onnx":
+        if not os.path.exists(ONNX_MODEL_PATH):
+            raise FileNotFoundError(
+                f"{ONNX_MODEL_PATH} not found: run `python -m src.embeddings.quantize_encoder export` first"
+            )
+        return SentenceTransformer(ONNX_MODEL_PATH, backend="onnx", device="cpu",
+                                   model_kwargs={"file_name": EMBED_ONNX_FILE})
+    model = SentenceTransformer(source, use_auth_token=HF_TOKEN)
+    if backend == "int8":
+        import torch
+        model = model.to("cpu")
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    elif backend != "torch":
+        raise ValueError(f"Unknown EMBED_BACKEND: {backend!r}")
+    return model
+
+
 # Load model: saved first, else pretrained
-if os.path.exists(SAVED_MODEL_PATH):
-    embed_model = SentenceTransformer(SAVED_MODEL_PATH)
-else:
-    embed_model = SentenceTransformer('all-MiniLM-L6-v2', use_auth_token=HF_TOKEN)
+embed_model = load_encoder(EMBED_BACKEND)
+
+
+def _normalizes(model: SentenceTransformer) -> bool:
+    return any(type(module).__name__ == "Normalize" for module in model)
+
+
+def window_spans(n_tokens: int, window: int, overlap: int, max_windows: int) -> List[Tuple[int, int]]:
+    """Overlapping [start, end) token spans covering n_tokens (at most max_windows)."""
+    if n_tokens <= window:
+        return [(0, n_tokens)]
+    step = max(window - overlap, 1)
+    spans = []
+    for start in range(0, n_tokens, step):
+        spans.append((start, min(start + window, n_tokens)))
+        if start + window >= n_tokens or len(spans) >= max_windows:
+            break
+    return spans
+
+
+def length_batches(lengths: List[int], batch_tokens: int, max_batch: int) -> List[List[int]]:
+    """
+    Indices sorted by length and grouped so that batch_size * longest item
+    stays under batch_tokens (short items get large batches, long ones small).
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches, current, longest = [], [], 0
+    for i in order:
+        padded = max(longest, lengths[i], 1)
+        if current and ((len(current) + 1) * padded > batch_tokens or len(current) >= max_batch):
+            batches.append(current)
+            current, longest = [], 0
+            padded = max(lengths[i], 1)
+        current.append(i)
+        longest = padded
+    if current:
+        batches.append(current)
+    return batches
+
+
+def encode_texts(texts: List[str], mode: Optional[str] = None,
+                 model: Optional[SentenceTransformer] = None) -> np.ndarray:
+    """
+    Encodes texts with the configured mode; rows follow the input order.
+    `model` defaults to the module-level embed_model.
+    """
+    mode = mode or EMBED_MODE
+    encoder = model or embed_model
+    if mode == "plain" or not texts:
+        return encoder.encode(texts, show_progress_bar=False)
+
+    tokenizer = encoder.tokenizer
+    window = encoder.max_seq_length - 2  # room for [CLS] / [SEP]
+    token_ids = tokenizer(texts, add_special_tokens=False, verbose=False)["input_ids"]
+
+    # Segments: (article index, text, token count)
+    segments = []
+    for article, (text, ids) in enumerate(zip(texts, token_ids)):
+        if mode == "windowed" and len(ids) > window:
+            for start, end in window_spans(len(ids), window, EMBED_WINDOW_OVERLAP, EMBED_MAX_WINDOWS):
+                segments.append((article, tokenizer.decode(ids[start:end]), end - start))
+        else:
+            segments.append((article, text, min(len(ids), window)))
+
+    dim = encoder.get_sentence_embedding_dimension()
+    vectors = np.zeros((len(segments), dim), dtype=np.float32)
+    for batch in length_batches([s[2] + 2 for s in segments], EMBED_BATCH_TOKENS, EMBED_MAX_BATCH):
+        vectors[batch] = encoder.encode(
+            [segments[i][1] for i in batch], batch_size=len(batch), show_progress_bar=False
+        )
+
+    if len(segments) == len(texts):
+        return vectors
+
+    # Token-weighted mean of each article's windows
+    pooled = np.zeros((len(texts), dim), dtype=np.float32)
+    weights = np.zeros(len(texts), dtype=np.float32)
+    for (article, _, n_tokens), vector in zip(segments, vectors):
+        pooled[article] += vector * max(n_tokens, 1)
+        weights[article] += max(n_tokens, 1)
+    pooled /= weights[:, None]
+    if _normalizes(encoder):
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+    return pooled
+
 
-def embed_text(df: pd.DataFrame, text_column: str = 'text') -> np.ndarray:
+def embed_text(df: pd.DataFrame, text_column: str = 'text', mode: Optional[str] = None) -> np.ndarray:
     """
-    Minimal preprocessing + embeddings.
+    Minimal preprocessing + embeddings (see EMBED_MODE for the encoding mode).
     """
     df['text_clean'] = df[text_column].astype(str).str.lower().str.strip()
-    embeddings = embed_model.encode(df['text_clean'].tolist(), show_progress_bar=False)
+    embeddings = encode_texts(df['text_clean'].tolist(), mode=mode)
     return embeddings
 
 def preprocess_and_embed(df: pd.DataFrame, text_column: str = 'text') -> np.ndarray:
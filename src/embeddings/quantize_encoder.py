@@ -0,0 +1,157 @@
+# src/embeddings/quantize_encoder.py
+"""
+Quantized Encoder: Export & Parity Check
+----------------------------------------
+
+export:
+    Exports the saved sentence encoder (src/models/embedding_model, else
+    all-MiniLM-L6-v2) to ONNX and writes a dynamically int8-quantized copy
+    for the given CPU instruction set into src/models/embedding_model_onnx:
+        onnx/model.onnx                  fp32 graph
+        onnx/model_qint8_<config>.onnx   int8 graph
+    Select it at runtime with EMBED_BACKEND=onnx and
+    EMBED_ONNX_FILE=onnx/model_qint8_<config>.onnx.
+    (EMBED_BACKEND=int8 needs no export: PyTorch quantizes at load.)
+
+parity:
+    Encodes the held-out split used by utils/train_and_save_model.py
+    (test_size=0.2, random_state=42, stratified) with the fp32 encoder and
+    with the candidate backend, then reports:
+        - cosine similarity between fp32 and candidate embeddings
+        - accuracy of the saved classifier on both embeddings
+        - encoder throughput (texts/s) and speed-up
+    Exits non-zero when drift or accuracy loss exceeds the given limits.
+
+Usage:
+    python -m src.embeddings.quantize_encoder export --config avx2
+    python -m src.embeddings.quantize_encoder parity --backend int8 --threads 1
+    EMBED_ONNX_FILE=onnx/model_qint8_avx2.onnx \
+        python -m src.embeddings.quantize_encoder parity --backend onnx --limit 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from src.embeddings import embed_model as em
+
+QUANT_CONFIGS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+
+def export_onnx(config: str = "avx2", output: str = em.ONNX_MODEL_PATH) -> str:
+    """Exports fp32 + dynamic int8 ONNX graphs; returns the int8 file name."""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    source = em.SAVED_MODEL_PATH if os.path.exists(em.SAVED_MODEL_PATH) else 'all-MiniLM-L6-v2'
+    model = SentenceTransformer(source, backend="onnx", device="cpu")  # converts via optimum
+    model.save(output)
+    export_dynamic_quantized_onnx_model(model, quantization_config=config, model_name_or_path=output)
+    file_name = f"onnx/model_qint8_{config}.onnx"
+    print(f"✅ Exported {output}/{file_name}")
+    print(f"   Use it with: EMBED_BACKEND=onnx EMBED_ONNX_FILE={file_name}")
+    return file_name
+
+
+def held_out_split(limit: int = 2000, split: str = "test"):
+    """Texts (cleaned like embed_text) and labels of the training script's test (or train) split."""
+    fake_df = pd.read_csv("src/data/News_dataset/Fake.csv")
+    true_df = pd.read_csv("src/data/News_dataset/True.csv")
+    fake_df["label"] = 0
+    true_df["label"] = 1
+    merged_news = pd.concat([fake_df, true_df], axis=0).reset_index(drop=True)
+    y = merged_news["label"].values
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42, stratify=y)
+    idx = train_idx if split == "train" else test_idx
+    idx = idx[:limit] if limit else idx
+    texts = merged_news["text"].iloc[idx].astype(str).str.lower().str.strip().tolist()
+    return texts, y[idx]
+
+
+def _timed_encode(texts, model, mode):
+    started = time.perf_counter()
+    vectors = em.encode_texts(texts, mode=mode, model=model)
+    return vectors, len(texts) / (time.perf_counter() - started)
+
+
+def parity(backend: str, limit: int = 2000, mode: str = None,
+           classifier_path: str = "src/models/logisticRegressor.pkl") -> dict:
+    reference = em.embed_model if em.EMBED_BACKEND == "torch" else em.load_encoder("torch")
+    candidate = em.load_encoder(backend)
+    texts, labels = held_out_split(limit)
+    print(f"🔎 {len(texts)} held-out articles, fp32 vs {backend} (mode={mode or em.EMBED_MODE})")
+
+    _timed_encode(texts[:16], reference, mode)  # warm-up
+    _timed_encode(texts[:16], candidate, mode)
+    ref, ref_tps = _timed_encode(texts, reference, mode)
+    cand, cand_tps = _timed_encode(texts, candidate, mode)
+
+    cosine = np.sum(ref * cand, axis=1) / (
+        np.linalg.norm(ref, axis=1) * np.linalg.norm(cand, axis=1) + 1e-12
+    )
+    clf = joblib.load(classifier_path)
+    acc_ref = accuracy_score(labels, clf.predict(ref))
+    acc_cand = accuracy_score(labels, clf.predict(cand))
+
+    report = {
+        "backend": backend,
+        "texts": len(texts),
+        "cosine_mean": float(cosine.mean()),
+        "cosine_p1": float(np.percentile(cosine, 1)),
+        "cosine_min": float(cosine.min()),
+        "accuracy_fp32": float(acc_ref),
+        "accuracy_candidate": float(acc_cand),
+        "fp32_texts_per_s": float(ref_tps),
+        "candidate_texts_per_s": float(cand_tps),
+        "speedup": float(cand_tps / ref_tps),
+    }
+    print(f"   cosine vs fp32: mean {report['cosine_mean']:.5f}, p1 {report['cosine_p1']:.5f}, "
+          f"min {report['cosine_min']:.5f}")
+    print(f"   accuracy: fp32 {acc_ref:.4f} → {backend} {acc_cand:.4f} ({acc_cand - acc_ref:+.4f})")
+    print(f"   throughput: fp32 {ref_tps:.1f}/s → {backend} {cand_tps:.1f}/s (x{report['speedup']:.2f})")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantized encoder export and parity check.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="Export ONNX fp32 + dynamic int8 graphs.")
+    exp.add_argument("--config", choices=QUANT_CONFIGS, default="avx2",
+                     help="Target CPU instruction set for int8 kernels.")
+    exp.add_argument("--output", default=em.ONNX_MODEL_PATH)
+
+    par = sub.add_parser("parity", help="Compare a backend with fp32 on the held-out split.")
+    par.add_argument("--backend", choices=("int8", "onnx"), default="int8")
+    par.add_argument("--limit", type=int, default=2000, help="Held-out articles to encode (0 = all).")
+    par.add_argument("--mode", choices=("plain", "bucketed", "windowed"), default=None)
+    par.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = default).")
+    par.add_argument("--min-cosine", type=float, default=0.98, help="Fail below this mean cosine.")
+    par.add_argument("--max-accuracy-drop", type=float, default=0.005)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.config, args.output)
+        sys.exit(0)
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+    result = parity(args.backend, args.limit, args.mode)
+    failed = []
+    if result["cosine_mean"] < args.min_cosine:
+        failed.append(f"mean cosine {result['cosine_mean']:.4f} < {args.min_cosine}")
+    if result["accuracy_fp32"] - result["accuracy_candidate"] > args.max_accuracy_drop:
+        failed.append(f"accuracy drop {result['accuracy_fp32'] - result['accuracy_candidate']:.4f} "
+                      f"> {args.max_accuracy_drop}")
+    if failed:
+        print("❌ Parity check failed: " + "; ".join(failed))
+        sys.exit(1)
+    print("✅ Parity check passed.")
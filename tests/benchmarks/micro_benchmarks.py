@@ -0,0 +1,398 @@
+# tests/benchmarks/micro_benchmarks.py
+"""
+Micro-benchmarks for the Classification & Prompt Hot Paths
+----------------------------------------------------------
+
+Offline benchmarks over fixed synthetic inputs (no network, no API key):
+
+    embed_text[batch=N]       sentence embeddings for N articles
+    embed_text[mode=M]        64 mixed-length articles per encoding mode
+    preprocess_new_data       TF-IDF + handcrafted features + scaling
+    predict_news_stubbed_llm  predict_news + verify (stubbed chat) + decide
+    extract_question          parsing of raw generation outputs
+    summarize_history         over a 400-turn conversation
+    build_user_prompt         full prompt over a long speech and history
+
+Each benchmark reports the best time per call over several repeats
+(like timeit: the minimum is the run least disturbed by other load on
+the machine, so it is far steadier than the median on shared CI boxes).
+Results are compared with tests/benchmarks/baseline.json; a benchmark
+fails when it is slower than its baseline by more than the tolerance.
+Timings are normalized by a fixed pure-Python calibration loop measured
+on both machines, so a baseline recorded on a laptop stays usable on CI.
+The loop is also timed between the repeats of every benchmark, and each
+benchmark is rescaled by that interleaved reading, so machine speed
+drifting during a run (frequency scaling, noisy neighbours) cancels out.
+--update-baseline records the median of --baseline-runs runs, and a
+regression is re-measured (--rechecks times) before it fails the gate.
+
+The classification benchmarks run against offline stand-ins by default
+(tests/benchmarks/standins.py: encoder, NLTK, fitted artifacts), so the
+gate needs no network, model download or src/models/*.pkl and measures
+the repo's own embedding, preprocessing and prediction code. With
+--real-models (or BENCH_REAL_MODELS=1) they use the real artifacts
+instead and are recorded as "<name>@real"; record those baselines with
+--update-baseline on a machine that has the models.
+
+A skipped benchmark, or one with no baseline entry, fails the gate:
+nothing was checked for it. --allow-skips gates only what could run.
+
+Usage:
+    python -m tests.benchmarks.micro_benchmarks                  # compare with baseline
+    python -m tests.benchmarks.micro_benchmarks --tolerance 0.5  # allow +50%
+    python -m tests.benchmarks.micro_benchmarks --only extract_question
+    python -m tests.benchmarks.micro_benchmarks --allow-skips     # gate what can run
+    python -m tests.benchmarks.micro_benchmarks --update-baseline
+    python -m tests.benchmarks.micro_benchmarks --real-models --update-baseline  # model machine
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Never download models while benchmarking
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.25"))
+# Repeats continue until this much time has passed, so a short burst of
+# load from other processes can't cover every repeat of a benchmark
+MIN_SECONDS = float(os.getenv("BENCH_MIN_SECONDS", "1.0"))
+REAL_MODELS = os.getenv("BENCH_REAL_MODELS", "0") == "1"
+
+_WORDS = ("government officials announced new policy measures economy growth election "
+          "investigation report minister president senate vote budget health market "
+          "security court ruling energy climate protest reform crisis").split()
+
+
+class Skip(Exception):
+    """Raised by a benchmark setup when a dependency or artifact is missing."""
+
+
+# ===============================================================
+# 1️⃣ Synthetic inputs
+# ===============================================================
+def synthetic_articles(count: int, seed: int = 0) -> List[str]:
+    """Deterministic pseudo-articles with a long-tailed length distribution."""
+    import random
+    rng = random.Random(seed)
+    articles = []
+    for _ in range(count):
+        words = int(min(3000, rng.lognormvariate(5.0, 0.9)))  # median ~150 words
+        body = " ".join(rng.choice(_WORDS) for _ in range(max(words, 8)))
+        articles.append(body.capitalize() + ". Officials SAID the plan, however, remains unclear!")
+    return articles
+
+
+def synthetic_history(turns: int) -> List[Dict[str, str]]:
+    history = []
+    for i in range(turns):
+        history.append({"role": "journalist", "content": f"Question {i}: pouvez-vous préciser le coût du point {i} ?"})
+        history.append({"role": "guest", "content": f"Réponse {i}: le coût est de {i * 13} millions, financé sur trois ans."})
+    return history
+
+
+def _news_frame(count: int):
+    import pandas as pd
+    return pd.DataFrame({
+        "title": [f"Headline {i}" for i in range(count)],
+        "text": synthetic_articles(count),
+        "subject": ["politicsNews"] * count,
+        "date": ["2024-01-01"] * count,
+    })
+
+
+# ===============================================================
+# 2️⃣ Benchmarks (setup -> callable)
+# ===============================================================
+BENCHMARKS: Dict[str, Tuple[Callable[[], Callable[[], object]], int, bool]] = {}
+
+
+def benchmark(name: str, number: int = 1, uses_models: bool = False):
+    """
+    Registers a setup function returning the callable to time `number` times
+    per repeat. `uses_models` marks benchmarks that run on the stand-ins
+    unless --real-models is given.
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, number, uses_models)
+        return setup
+    return decorator
+
+
+def _require_embed_model():
+    try:
+        from src.embeddings import embed_model
+    except Exception as e:  # missing package or model not cached locally
+        raise Skip(f"embedding model unavailable: {e}")
+    return embed_model
+
+
+# Small batches are timed several times per repeat so a repeat lasts long enough to be stable
+for _batch, _number in ((1, 20), (8, 4), (32, 1), (128, 1)):
+    @benchmark(f"embed_text[batch={_batch}]", number=_number, uses_models=True)
+    def _embed(batch=_batch):
+        embed_model = _require_embed_model()
+        df = _news_frame(batch)
+        return lambda: embed_model.embed_text(df.copy(), text_column="text")
+
+
+# Same mixed-length corpus through each encoding mode (see EMBED_MODE)
+for _mode in ("plain", "bucketed", "windowed"):
+    @benchmark(f"embed_text[mode={_mode}]", uses_models=True)
+    def _embed_mode(mode=_mode):
+        embed_model = _require_embed_model()
+        df = _news_frame(64)
+        return lambda: embed_model.embed_text(df.copy(), text_column="text", mode=mode)
+
+
+@benchmark("preprocess_new_data", uses_models=True)
+def _preprocess():
+    try:
+        from utils.data_preprocessing import preprocess_new_data
+    except Exception as e:
+        raise Skip(f"preprocessing artifacts unavailable: {e}")
+    df = _news_frame(32)
+    return lambda: preprocess_new_data(df.copy())
+
+
+class _StubChat:
+    """Stands in for ChatOpenAI: canned web-verification answer."""
+
+    class _Response:
+        content = '{"verdict": 0, "url": "Not found"}'
+
+    def invoke(self, messages, **kwargs):
+        return self._Response()
+
+
+@benchmark("predict_news_stubbed_llm", number=10, uses_models=True)
+def _predict_news():
+    _require_embed_model()
+    try:
+        import joblib
+        from src.agents.news_prediction_agent import NewsPredictionAgent
+        from utils.data_validation import NewsItem
+        model = joblib.load("src/models/logisticRegressor.pkl")
+    except Exception as e:
+        raise Skip(f"classifier unavailable: {e}")
+    # Bypass __init__ so no ChatOpenAI client (or API key) is needed
+    agent = NewsPredictionAgent.__new__(NewsPredictionAgent)
+    agent.model, agent.label_map, agent.chat = model, {0: "Fake News", 1: "True News"}, _StubChat()
+    item = NewsItem(title="Senate approves budget", text=synthetic_articles(1, seed=7)[0],
+                    subject="politicsNews", date="2024-01-01", label=1)
+
+    def run():
+        pred = agent.predict_news(item)
+        return agent.decide_final_result(pred, agent.verify_news_with_websearch(item))
+    return run
+
+
+@benchmark("extract_question", number=1000)
+def _extract():
+    from src.agents.Press_Conf_Simulator.press_conference_agent import _extract_question
+    filler = " ".join(synthetic_articles(1, seed=3)[0].split()[:400])
+    outputs = [
+        f"{filler} <QUESTION> Quel est le calendrier exact ? <eoa>",
+        f"<QUESTION> brouillon <eoa> {filler} <QUESTION> Pourquoi maintenant ? <eoa>",
+        f"{filler} <QUESTION> Combien cela coûte-t-il",
+        filler,
+    ]
+    return lambda: [_extract_question(text) for text in outputs]
+
+
+@benchmark("summarize_history", number=5000)
+def _summarize():
+    from src.agents.Press_Conf_Simulator.prompts.prompt_utils import summarize_history
+    history = synthetic_history(200)
+    return lambda: summarize_history(history)
+
+
+@benchmark("build_user_prompt", number=2000)
+def _user_prompt():
+    from src.agents.Press_Conf_Simulator.prompts.prompt_utils import build_user_prompt, summarize_history
+    speech = " ".join(synthetic_articles(20, seed=11))
+    history = synthetic_history(200)
+    return lambda: build_user_prompt("Santé publique", "Ministre", speech, summarize_history(history))
+
+
+# ===============================================================
+# 3️⃣ Runner
+# ===============================================================
+def _calibration_work():
+    total = 0
+    for i in range(200_000):
+        total += (i * 7) % 13
+    return "-".join(str(x) for x in range(20_000)).count("9") + total
+
+
+def calibrate(repeats: int = 9) -> float:
+    """Seconds for a fixed pure-Python workload (machine speed reference)."""
+    return _measure(_calibration_work, 1, repeats)[0]
+
+
+def _measure(fn: Callable[[], object], number: int, repeats: int,
+             interleave: bool = False) -> Tuple[float, float]:
+    """
+    Best per-call time over at least `repeats` repeats spread over
+    MIN_SECONDS; with `interleave`, also the best calibration time measured
+    between those repeats (else 0.0).
+    """
+    fn()  # warm-up (lazy imports, caches)
+    timings, references = [], []
+    first = time.perf_counter()
+    while len(timings) < repeats or (time.perf_counter() - first < MIN_SECONDS and len(timings) < 200):
+        if interleave:
+            started = time.perf_counter()
+            _calibration_work()
+            references.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return min(timings), min(references, default=0.0)
+
+
+def run(names: Optional[List[str]] = None, repeats: int = 7, real_models: bool = REAL_MODELS,
+        calibration: Optional[float] = None, exact: bool = False) -> Dict[str, Dict[str, object]]:
+    """
+    Times the benchmarks whose names contain one of `names` (all when
+    empty; with `exact`, whose result names are in `names`). With
+    `calibration`, timings are rescaled to that machine-speed reading.
+    """
+    if not real_models:
+        from tests.benchmarks import standins
+        standins.install(synthetic_articles(400, seed=99))
+    results = {}
+    for name, (setup, number, uses_models) in BENCHMARKS.items():
+        key = f"{name}@real" if real_models and uses_models else name
+        if names and (key not in names if exact else not any(n in name for n in names)):
+            continue
+        try:
+            fn = setup()
+        except Skip as e:
+            results[key] = {"skipped": str(e).splitlines()[0][:160]}
+            continue
+        seconds, reference = _measure(fn, number, repeats, interleave=bool(calibration))
+        results[key] = {"seconds": seconds * calibration / reference if calibration else seconds}
+    return results
+
+
+def compare(results: Dict[str, Dict[str, object]], baseline: Dict[str, object], calibration: float,
+            tolerance: float) -> List[str]:
+    """Prints a comparison table; returns the names of regressed benchmarks."""
+    scale = calibration / baseline.get("calibration_s", calibration) if baseline else 1.0
+    regressions = []
+    print(f"{'benchmark':<28} | {'best':>11} | {'baseline':>11} | {'ratio':>6} | status")
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:<28} | {'-':>11} | {'-':>11} | {'-':>6} | skipped ({result['skipped']})")
+            continue
+        seconds = result["seconds"]
+        reference = baseline.get("benchmarks", {}).get(name)
+        if reference is None:
+            print(f"{name:<28} | {_fmt(seconds):>11} | {'-':>11} | {'-':>6} | no baseline")
+            continue
+        ratio = seconds / (reference * scale)
+        status = "ok"
+        if ratio > 1 + tolerance:
+            status = f"REGRESSION (> +{tolerance:.0%})"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            status = "faster (consider --update-baseline)"
+        print(f"{name:<28} | {_fmt(seconds):>11} | {_fmt(reference * scale):>11} | {ratio:>6.2f} | {status}")
+    return regressions
+
+
+def _fmt(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.1f} µs"
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, object]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, Dict[str, object]], calibration: float, path: str = BASELINE_PATH) -> None:
+    baseline = load_baseline(path)
+    benchmarks = dict(baseline.get("benchmarks", {}))
+    old_scale = calibration / baseline.get("calibration_s", calibration) if baseline else 1.0
+    # Keep entries that were skipped here, rescaled to this machine's calibration
+    benchmarks = {k: v * old_scale for k, v in benchmarks.items()}
+    benchmarks.update({k: r["seconds"] for k, r in results.items() if "seconds" in r})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "calibration_s": calibration,
+            "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+            "benchmarks": {k: round(v, 9) for k, v in sorted(benchmarks.items())},
+        }, f, indent=2)
+        f.write("\n")
+    print(f"📝 Baseline written to {path}")
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks with regression gate.")
+    parser.add_argument("--only", nargs="*", help="Substrings of benchmark names to run.")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown vs baseline (0.25 = +25%%; env BENCH_TOLERANCE).")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--baseline-runs", type=int, default=3,
+                        help="Runs whose median is recorded by --update-baseline.")
+    parser.add_argument("--rechecks", type=int, default=2,
+                        help="Times a regressed benchmark is re-measured before the gate fails.")
+    parser.add_argument("--real-models", action="store_true", default=REAL_MODELS,
+                        help="Benchmark the real encoder/artifacts instead of the offline stand-ins.")
+    parser.add_argument("--allow-skips", action="store_true",
+                        help="Don't fail on skipped benchmarks or missing baseline entries.")
+    args = parser.parse_args()
+
+    calibration = calibrate()
+    results = run(args.only, args.repeats, args.real_models, calibration)
+    if args.update_baseline:
+        # A baseline is used for every later comparison: take the median of several runs
+        runs = [results] + [run(args.only, args.repeats, args.real_models, calibration)
+                            for _ in range(args.baseline_runs - 1)]
+        for name, result in results.items():
+            if "seconds" in result:
+                result["seconds"] = statistics.median(r[name]["seconds"] for r in runs)
+        save_baseline(results, calibration, args.baseline)
+        sys.exit(0)
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, calibration, args.tolerance)
+    # A regression must show up again before it fails the gate (one noisy repeat window isn't enough)
+    for _ in range(args.rechecks):
+        if not regressions:
+            break
+        print(f"🔁 Re-measuring {len(regressions)} regressed benchmark(s)...")
+        again = run(regressions, args.repeats, args.real_models, calibration, exact=True)
+        for name in regressions:
+            results[name]["seconds"] = min(results[name]["seconds"], again[name]["seconds"])
+        regressions = compare({name: results[name] for name in regressions}, baseline, calibration,
+                              args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    unchecked = [name for name, result in results.items()
+                 if "skipped" in result or name not in baseline.get("benchmarks", {})]
+    if unchecked and not args.allow_skips:
+        print(f"❌ {len(unchecked)} benchmark(s) not checked (skipped or no baseline): "
+              f"{', '.join(unchecked)}. Record them with --update-baseline (on a machine with the models "
+              f"for --real-models), or pass --allow-skips.")
+        sys.exit(1)
+    print("✅ No regression beyond tolerance.")
@@ -17,6 +17,12 @@ Usage:
         check_endpoints
     )
 
+Multiple backends:
+    Set KAGGLE_GENERATE_APIS / KAGGLE_EXPLAIN_APIS / KAGGLE_ANALYZE_APIS to
+    comma-separated URL lists to spread load across several instances
+    (see utils/Press_Simulator/backend_pool.py). Without them, each list
+    holds the single KAGGLE_*_API URL.
+
 Notes:
     - If the environment variables are not set, fallback URLs will be used.
     - Update your ngrok tunnel link manually or via environment variables
@@ -49,6 +55,16 @@ KAGGLE_EXPLAIN_API = os.getenv(
 )
 
 
+def _url_list(env_name: str, default: str) -> list:
+    urls = [u.strip() for u in os.getenv(env_name, "").split(",") if u.strip()]
+    return urls or [default]
+
+
+KAGGLE_GENERATE_APIS = _url_list("KAGGLE_GENERATE_APIS", KAGGLE_GENERATE_API)
+KAGGLE_EXPLAIN_APIS = _url_list("KAGGLE_EXPLAIN_APIS", KAGGLE_EXPLAIN_API)
+KAGGLE_ANALYZE_APIS = _url_list("KAGGLE_ANALYZE_APIS", KAGGLE_ANALYZE_API)
+
+
 # ===============================================================
 # Helper Function
 # ===============================================================
@@ -58,8 +74,9 @@ def check_endpoints() -> None:
     Useful to call once when launching the Flask app.
     """
     log_info("🔗 Kaggle backend endpoints in use:")
-    log_info(f"   • GENERATE: {KAGGLE_GENERATE_API}")
-    log_info(f"   • EXPLAIN:  {KAGGLE_EXPLAIN_API}")
+    log_info(f"   • GENERATE: {', '.join(KAGGLE_GENERATE_APIS)}")
+    log_info(f"   • EXPLAIN:  {', '.join(KAGGLE_EXPLAIN_APIS)}")
+    log_info(f"   • ANALYZE:  {', '.join(KAGGLE_ANALYZE_APIS)}")
 
 
 # ===============================================================
@@ -0,0 +1,205 @@
+# utils/Press_Simulator/backend_pool.py
+"""
+Load-Balanced Backend Pools for the Press Conference Simulator
+--------------------------------------------------------------
+
+Each endpoint type (generate, explain, analyze) can be served by
+several Kaggle/GPU backends. A BackendPool routes every request to one
+healthy backend and keeps the others in rotation:
+
+- routing: "least_outstanding" (default) picks the backend with the
+  fewest in-flight requests; "latency" weights that by the EWMA latency.
+- ejection: a backend is ejected after PRESS_BACKEND_MAX_FAILURES
+  consecutive connection errors / 5xx responses.
+- re-admission: a background thread pings every backend
+  on `<base>/ping` every PRESS_BACKEND_HEALTH_INTERVAL seconds and
+  re-admits them once they answer.
+
+Failed requests are retried once on another backend when possible.
+Calls made with `affinity=<session_id>` stick to the same backend while
+it stays healthy (needed by the session protocol, which keeps
+per-session state on the backend).
+
+Usage:
+    from utils.Press_Simulator.backend_pool import generate_pool
+    res = generate_pool.post(json=payload, timeout=60)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+from utils.Press_Simulator.api_endpoints import (
+    KAGGLE_GENERATE_APIS, KAGGLE_EXPLAIN_APIS, KAGGLE_ANALYZE_APIS
+)
+from utils.Press_Simulator.logger import log_info, log_warning
+from utils.metrics import request_headers, span
+
+
+ROUTING_STRATEGY = os.getenv("PRESS_BACKEND_ROUTING", "least_outstanding")
+HEALTH_INTERVAL = float(os.getenv("PRESS_BACKEND_HEALTH_INTERVAL", "10"))
+MAX_FAILURES = int(os.getenv("PRESS_BACKEND_MAX_FAILURES", "3"))
+
+_EWMA_ALPHA = 0.3
+_AFFINITY_SIZE = 4096
+
+
+def _health_url(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, "/ping", "", ""))
+
+
+class Backend:
+    """Routing bookkeeping for one backend URL."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.health_url = _health_url(url)
+        self.outstanding = 0
+        self.latency = 0.0  # EWMA in seconds
+        self.failures = 0
+        self.healthy = True
+
+    def cost(self, strategy: str) -> float:
+        if strategy == "latency":
+            return (self.outstanding + 1) * (self.latency or 1e-3)
+        return self.outstanding
+
+
+class BackendPool:
+    """Health-checked pool of interchangeable backends for one endpoint type."""
+
+    def __init__(self, name: str, urls: List[str], strategy: str = ROUTING_STRATEGY,
+                 health_interval: float = HEALTH_INTERVAL, max_failures: int = MAX_FAILURES):
+        self.name = name
+        self.backends = [Backend(u) for u in urls]
+        self.strategy = strategy
+        self.health_interval = health_interval
+        self.max_failures = max_failures
+        self._lock = threading.Lock()
+        self._turn = 0  # round-robin tie-breaker
+        self._affinity: "OrderedDict[str, Backend]" = OrderedDict()
+        self._health_thread: Optional[threading.Thread] = None
+
+    # -----------------------------------------------------------
+    # Routing
+    # -----------------------------------------------------------
+    def _acquire(self, exclude: Optional[Backend] = None, affinity: Optional[str] = None) -> Backend:
+        with self._lock:
+            pinned = self._affinity.get(affinity) if affinity else None
+            if pinned is not None and pinned.healthy and pinned is not exclude:
+                self._affinity.move_to_end(affinity)
+                pinned.outstanding += 1
+                return pinned
+            candidates = [b for b in self.backends if b.healthy and b is not exclude]
+            if not candidates:
+                # Everything ejected: try the least-failing backend rather than failing outright
+                candidates = [b for b in self.backends if b is not exclude] or self.backends
+            self._turn += 1
+            n = len(self.backends)
+            backend = min(candidates, key=lambda b: (
+                b.cost(self.strategy), (self.backends.index(b) - self._turn) % n
+            ))
+            backend.outstanding += 1
+            if affinity:
+                self._affinity[affinity] = backend
+                self._affinity.move_to_end(affinity)
+                while len(self._affinity) > _AFFINITY_SIZE:
+                    self._affinity.popitem(last=False)
+            return backend
+
+    def _release(self, backend: Backend, elapsed: float, ok: bool) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+            if ok:
+                backend.latency = elapsed if not backend.latency else (
+                    _EWMA_ALPHA * elapsed + (1 - _EWMA_ALPHA) * backend.latency
+                )
+                backend.failures = 0
+                return
+            backend.failures += 1
+            if backend.healthy and backend.failures >= self.max_failures and len(self.backends) > 1:
+                backend.healthy = False
+                log_warning(f"🚫 {self.name} backend ejected: {backend.url}")
+
+    def post(self, json: Any = None, timeout: float = 4000, affinity: Optional[str] = None,
+             **kwargs) -> requests.Response:
+        """POSTs to one healthy backend, retrying once on another on failure."""
+        self._ensure_health_thread()
+        # Propagate the caller's request ID to the backend
+        kwargs["headers"] = {**request_headers(), **(kwargs.get("headers") or {})}
+        attempts = 2 if len(self.backends) > 1 else 1
+        last_backend, last_error = None, None
+        for attempt in range(attempts):
+            backend = self._acquire(exclude=last_backend, affinity=affinity)
+            started = time.perf_counter()
+            try:
+                with span(f"backend.{self.name}"):
+                    res = requests.post(backend.url, json=json, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self._release(backend, time.perf_counter() - started, ok=False)
+                last_backend, last_error = backend, e
+                continue
+            ok = res.status_code < 500
+            self._release(backend, time.perf_counter() - started, ok=ok)
+            if ok or attempt == attempts - 1:
+                return res
+            last_backend = backend
+        raise last_error
+
+    # -----------------------------------------------------------
+    # Health checks
+    # -----------------------------------------------------------
+    def check_health(self) -> None:
+        """Pings every backend once and updates its health."""
+        for backend in self.backends:
+            try:
+                alive = requests.get(backend.health_url, timeout=5).ok
+            except requests.RequestException:
+                alive = False
+            with self._lock:
+                if alive and not backend.healthy:
+                    log_info(f"✅ {self.name} backend re-admitted: {backend.url}")
+                if alive:
+                    backend.healthy, backend.failures = True, 0
+                elif backend.healthy and len(self.backends) > 1:
+                    backend.healthy = False
+                    log_warning(f"🚫 {self.name} backend failed health check: {backend.url}")
+
+    def _health_loop(self) -> None:
+        while True:
+            time.sleep(self.health_interval)
+            self.check_health()
+
+    def _ensure_health_thread(self) -> None:
+        # A single backend has nowhere to fail over to: skip background pings
+        if self._health_thread is not None or len(self.backends) < 2 or self.health_interval <= 0:
+            return
+        with self._lock:
+            if self._health_thread is None:
+                self._health_thread = threading.Thread(
+                    target=self._health_loop, name=f"{self.name}-health", daemon=True
+                )
+                self._health_thread.start()
+
+    def status(self) -> List[dict]:
+        """Snapshot of every backend's routing state."""
+        with self._lock:
+            return [
+                {"url": b.url, "healthy": b.healthy, "outstanding": b.outstanding,
+                 "latency_ms": round(b.latency * 1000, 1), "failures": b.failures}
+                for b in self.backends
+            ]
+
+
+# ===============================================================
+# Shared pools
+# ===============================================================
+generate_pool = BackendPool("generate", KAGGLE_GENERATE_APIS)
+explain_pool = BackendPool("explain", KAGGLE_EXPLAIN_APIS)
+analyze_pool = BackendPool("analyze", KAGGLE_ANALYZE_APIS)
@@ -0,0 +1,202 @@
+# utils/Press_Simulator/explain_cache.py
+"""
+Explainability Result Cache for the Press Conference Simulator
+--------------------------------------------------------------
+
+Remote explanations are expensive and deterministic for a given
+(speech, question, mode) triple. Repeats are common: replayed sessions,
+reset-and-restart with the same speech, or a model re-asking a question.
+
+This module provides a two-tier cache:
+    1. a bounded in-memory LRU (per process)
+    2. an optional persistent SQLite tier (shared across restarts), bounded
+       by a row limit and a TTL. It is opened on first use, and writes go
+       through a background thread so a request never waits on a commit.
+
+Keys are content hashes, so raw speeches are never stored as keys.
+
+Configuration (environment variables):
+    PRESS_EXPLAIN_CACHE_SIZE     -> in-memory entries (default 512, 0 disables)
+    PRESS_EXPLAIN_CACHE_DB       -> SQLite file (default .cache/explain_cache.sqlite,
+                                    empty string disables the disk tier)
+    PRESS_EXPLAIN_CACHE_DB_ROWS  -> max rows on disk, oldest evicted (default 20000)
+    PRESS_EXPLAIN_CACHE_TTL      -> seconds before a disk entry expires
+                                    (default 2592000 = 30 days, 0 = never)
+
+Usage:
+    from utils.Press_Simulator.explain_cache import explain_cache
+    cached = explain_cache.get(speech, question, "deep")
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from utils.Press_Simulator.logger import log_info, log_warning
+
+
+def make_key(speech: str, question: str, mode: str) -> str:
+    """Content-hash key for one explanation request."""
+    speech_hash = hashlib.sha256(speech.encode("utf-8")).hexdigest()[:32]
+    question_hash = hashlib.sha256(question.strip().encode("utf-8")).hexdigest()[:32]
+    return f"{mode}:{speech_hash}:{question_hash}"
+
+
+class ExplainCache:
+    """Bounded LRU in front of an optional, bounded SQLite store."""
+
+    def __init__(self, max_entries: int = 512, db_path: Optional[str] = None,
+                 max_rows: int = 20000, ttl: float = 30 * 24 * 3600):
+        self.max_entries = max_entries
+        self.db_path, self.max_rows, self.ttl = db_path, max_rows, ttl
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits_memory": 0, "hits_disk": 0, "misses": 0, "writes": 0, "dropped_writes": 0}
+        self._db = None
+        self._db_opened = False
+        self._writes: "queue.Queue" = queue.Queue(maxsize=1000)
+        self._writer: Optional[threading.Thread] = None
+
+    # -----------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+        db.execute("PRAGMA journal_mode=WAL")  # readers do not wait for the writer
+        return db
+
+    def _open_db(self) -> None:
+        """Opens the disk tier on first use (caller holds the lock)."""
+        if self._db_opened:
+            return
+        self._db_opened = True
+        if not self.db_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._db = self._connect()
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS explanations ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS explanations_created ON explanations (created)")
+            self._db.commit()
+        except sqlite3.Error as e:
+            log_warning(f"Explain cache disk tier disabled: {e}")
+            self._db = None
+            return
+        self._writer = threading.Thread(target=self._write_loop, name="explain-cache-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def _write_loop(self) -> None:
+        db = self._connect()
+        while True:
+            batch = [self._writes.get()]
+            while True:  # group whatever is queued into one transaction
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                rows = [item for item in batch if item is not None]
+                db.executemany(
+                    "INSERT OR REPLACE INTO explanations (key, value, created) VALUES (?, ?, ?)", rows)
+                self._evict(db)
+                db.commit()
+            except sqlite3.Error as e:
+                log_warning(f"Explain cache write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        if self.ttl > 0:
+            db.execute("DELETE FROM explanations WHERE created < ?", (time.time() - self.ttl,))
+        if self.max_rows > 0:
+            db.execute(
+                "DELETE FROM explanations WHERE key IN (SELECT key FROM explanations "
+                "ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.max_rows,))
+
+    def flush(self) -> None:
+        """Waits until queued disk writes are committed."""
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writes.join()
+
+    # -----------------------------------------------------------
+    def _remember(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, speech: str, question: str, mode: str) -> Optional[Any]:
+        """Returns the cached explanation or None."""
+        key = make_key(speech, question, mode)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["hits_memory"] += 1
+                return self._memory[key]
+            self._open_db()
+            if self._db is not None:
+                oldest = time.time() - self.ttl if self.ttl > 0 else 0.0
+                row = self._db.execute("SELECT value FROM explanations WHERE key = ? AND created >= ?",
+                                       (key, oldest)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self._stats["hits_disk"] += 1
+                    return value
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, speech: str, question: str, mode: str, value: Any) -> None:
+        """Stores an explanation in memory and queues the disk write."""
+        key = make_key(speech, question, mode)
+        with self._lock:
+            self._remember(key, value)
+            self._stats["writes"] += 1
+            self._open_db()
+            if self._db is None:
+                return
+            try:
+                self._writes.put_nowait((key, json.dumps(value, ensure_ascii=False), time.time()))
+            except queue.Full:  # disk tier is best effort; memory tier already has it
+                self._stats["dropped_writes"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of hit/miss counters and sizes."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["memory_entries"] = len(self._memory)
+        lookups = snapshot["hits_memory"] + snapshot["hits_disk"] + snapshot["misses"]
+        snapshot["hit_rate"] = round((lookups - snapshot["misses"]) / lookups, 4) if lookups else 0.0
+        return snapshot
+
+    def log_stats(self) -> None:
+        s = self.stats()
+        log_info(
+            f"💾 Explain cache: hit_rate={s['hit_rate']:.0%} "
+            f"(memory={s['hits_memory']}, disk={s['hits_disk']}, misses={s['misses']}, "
+            f"entries={s['memory_entries']})"
+        )
+
+
+# ===============================================================
+# Shared instance
+# ===============================================================
+explain_cache = ExplainCache(
+    max_entries=int(os.getenv("PRESS_EXPLAIN_CACHE_SIZE", "512")),
+    db_path=os.getenv("PRESS_EXPLAIN_CACHE_DB", ".cache/explain_cache.sqlite"),
+    max_rows=int(os.getenv("PRESS_EXPLAIN_CACHE_DB_ROWS", "20000")),
+    ttl=float(os.getenv("PRESS_EXPLAIN_CACHE_TTL", str(30 * 24 * 3600))),
+)
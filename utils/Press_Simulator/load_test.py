@@ -0,0 +1,314 @@
+# utils/Press_Simulator/load_test.py
+"""
+Load Test for the Press Conference Simulator
+--------------------------------------------
+
+Drives many simulated conferences concurrently through `/start`,
+repeated `/reply` and `/stop` of `Press_Conf_Simulator.py` and reports:
+
+    - throughput (requests/s, sessions/s)
+    - p50 / p95 / p99 latency and error rate per route
+    - session-state size over time: the Flask session cookie per turn
+      and the server's resident memory (when the server is spawned here)
+
+By default everything runs locally and headless: a replay/stand-in
+backend (utils/Press_Simulator/record_replay.py) with configurable
+latency distributions and the simulator itself are spawned as
+subprocesses on free ports, so no GPU, ngrok or browser is needed.
+
+Usage:
+    python -m utils.Press_Simulator.load_test --sessions 200 --concurrency 20 --replies 5 \
+        --generate-latency lognormal:800,0.35 --analyze-latency uniform:50,150
+
+    # Against an already running server (no subprocesses)
+    python -m utils.Press_Simulator.load_test --target http://127.0.0.1:7860
+
+    # CI: write a JSON report and fail above 1% errors
+    python -m utils.Press_Simulator.load_test --sessions 50 --json load_report.json --max-error-rate 0.01
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from utils.load_testing import free_port, percentile, wait_ready
+from utils.Press_Simulator.logger import flush, log_error, log_info, log_warning
+
+
+ROUTES = ("/start", "/reply", "/stop")
+COOKIE_LIMIT = 4093  # bytes browsers keep for one cookie
+
+
+# ===============================================================
+# 1️⃣ Measurements
+# ===============================================================
+class Recorder:
+    """Thread-safe collector of request samples and memory samples."""
+
+    def __init__(self):
+        self.samples: List[Dict[str, Any]] = []
+        self.memory: List[Dict[str, float]] = []
+        self.started = time.perf_counter()
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def session_started(self) -> None:
+        with self._lock:
+            self.active += 1
+
+    def session_ended(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+    def add(self, route: str, ms: float, ok: bool, turn: int, cookie_bytes: int) -> None:
+        with self._lock:
+            self.samples.append({
+                "route": route, "ms": ms, "ok": ok, "turn": turn,
+                "cookie_bytes": cookie_bytes, "t": time.perf_counter() - self.started,
+            })
+
+    def add_memory(self, rss_mb: float, active_sessions: int) -> None:
+        with self._lock:
+            self.memory.append({"t": time.perf_counter() - self.started,
+                                "rss_mb": rss_mb, "active_sessions": active_sessions})
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        return None
+    return None
+
+
+# ===============================================================
+# 2️⃣ Virtual conference
+# ===============================================================
+def _speech(sentences: int) -> str:
+    return " ".join(
+        f"Point {i}: notre programme augmente l'accès aux soins de {i * 2} pour cent dans la région {i % 7}."
+        for i in range(sentences)
+    )
+
+
+def run_session(base: str, index: int, replies: int, speech: str, recorder: Recorder,
+                timeout: float) -> bool:
+    """One conference: /start, `replies` × /reply, /stop. Aborts on the first error."""
+    rng = random.Random(index)
+    client = requests.Session()
+    steps = [("/start", {"persona": rng.choice(["investigative_hawk", "analytical_columnist"]),
+                         "topic": "Santé publique", "role": "Ministre", "speech": speech})]
+    steps += [("/reply", {"answer": f"Réponse {turn} de la session {index}: "
+                                    f"nous avons financé {rng.randint(10, 900)} nouveaux centres."})
+              for turn in range(1, replies + 1)]
+    steps.append(("/stop", {}))
+
+    recorder.session_started()
+    try:
+        for turn, (route, body) in enumerate(steps):
+            started = time.perf_counter()
+            try:
+                res = client.post(f"{base}{route}", json=body, timeout=timeout)
+                ok = res.status_code == 200
+            except requests.RequestException:
+                ok = False
+            cookie = client.cookies.get("session") or ""
+            recorder.add(route, (time.perf_counter() - started) * 1000, ok, turn, len(cookie))
+            if not ok:
+                return False
+        return True
+    finally:
+        recorder.session_ended()
+
+
+# ===============================================================
+# 3️⃣ Local servers
+# ===============================================================
+def spawn_servers(args) -> Dict[str, Any]:
+    """Starts the stand-in backend and the simulator as subprocesses."""
+    backend_port, app_port = free_port(), free_port()
+    env = dict(os.environ, PRESS_LOG_LEVEL=os.getenv("PRESS_LOG_LEVEL", "WARN"))
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+
+    backend = subprocess.Popen([
+        sys.executable, "-m", "utils.Press_Simulator.record_replay", "replay",
+        "--port", str(backend_port), "--store", args.store,
+        "--generate-latency", args.generate_latency,
+        "--explain-latency", args.explain_latency,
+        "--analyze-latency", args.analyze_latency,
+    ], env=env, stdout=log, stderr=log)
+
+    backend_base = f"http://127.0.0.1:{backend_port}"
+    for endpoint in ("generate", "explain", "analyze"):
+        env[f"KAGGLE_{endpoint.upper()}_API"] = f"{backend_base}/{endpoint}"
+        env.pop(f"KAGGLE_{endpoint.upper()}_APIS", None)
+    app = subprocess.Popen([
+        sys.executable, "-m", "utils.Press_Simulator.load_test", "--serve-app", "--port", str(app_port),
+    ], env=env, stdout=log, stderr=log)
+
+    wait_ready(f"{backend_base}/ping")
+    wait_ready(f"http://127.0.0.1:{app_port}/metrics")
+    return {"base": f"http://127.0.0.1:{app_port}", "processes": [app, backend], "app_pid": app.pid}
+
+
+# ===============================================================
+# 4️⃣ Report
+# ===============================================================
+def build_report(recorder: Recorder, wall_s: float, sessions_ok: int, sessions: int) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "wall_s": round(wall_s, 2),
+        "requests": len(recorder.samples),
+        "throughput_rps": round(len(recorder.samples) / max(wall_s, 1e-9), 2),
+        "sessions": sessions,
+        "sessions_ok": sessions_ok,
+        "sessions_per_s": round(sessions_ok / max(wall_s, 1e-9), 3),
+        "routes": {},
+        "cookie_bytes_by_turn": {},
+        "memory": recorder.memory,
+    }
+    for route in ROUTES:
+        rows = [s for s in recorder.samples if s["route"] == route]
+        latencies = [s["ms"] for s in rows if s["ok"]]
+        errors = sum(1 for s in rows if not s["ok"])
+        report["routes"][route] = {
+            "count": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+        }
+    by_turn: Dict[int, List[int]] = {}
+    for s in recorder.samples:
+        if s["route"] != "/stop":
+            by_turn.setdefault(s["turn"], []).append(s["cookie_bytes"])
+    for turn in sorted(by_turn):
+        sizes = by_turn[turn]
+        report["cookie_bytes_by_turn"][turn] = {"avg": round(sum(sizes) / len(sizes)), "max": max(sizes)}
+    total_errors = sum(r["errors"] for r in report["routes"].values())
+    report["error_rate"] = round(total_errors / max(len(recorder.samples), 1), 4)
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    log_info(f"⏱️ {report['requests']} requests in {report['wall_s']}s → "
+             f"{report['throughput_rps']} req/s, {report['sessions_per_s']} sessions/s "
+             f"({report['sessions_ok']}/{report['sessions']} sessions completed)")
+    log_info(f"{'route':<7} | {'count':>6} | {'err %':>6} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    for route, r in report["routes"].items():
+        log_info(f"{route:<7} | {r['count']:>6} | {r['error_rate'] * 100:>6.2f} | "
+                 f"{r['p50_ms']:>8.1f} | {r['p95_ms']:>8.1f} | {r['p99_ms']:>8.1f}")
+    # One record: the logger samples repeated line patterns
+    lines = ["🍪 Session cookie size by turn (avg / max bytes):"]
+    for turn, size in report["cookie_bytes_by_turn"].items():
+        flag = "  ⚠️ over browser cookie limit" if size["max"] > COOKIE_LIMIT else ""
+        lines.append(f"   turn {turn:>3}: {size['avg']:>6} / {size['max']:>6}{flag}")
+    log_info("\n".join(lines))
+    if report["memory"]:
+        peak = max(report["memory"], key=lambda m: m["rss_mb"])
+        log_info(f"🧠 Server RSS: start {report['memory'][0]['rss_mb']:.1f} MB, "
+                 f"peak {peak['rss_mb']:.1f} MB at {peak['t']:.1f}s "
+                 f"({peak['active_sessions']} active sessions), end {report['memory'][-1]['rss_mb']:.1f} MB")
+
+
+# ===============================================================
+# 5️⃣ Driver
+# ===============================================================
+def run_load_test(args) -> Dict[str, Any]:
+    servers = None if args.target else spawn_servers(args)
+    base = args.target or servers["base"]
+    recorder = Recorder()
+    stop_sampling = threading.Event()
+
+    def sample_memory():
+        while not stop_sampling.is_set():
+            rss = _rss_mb(servers["app_pid"])
+            if rss is not None:
+                recorder.add_memory(rss, recorder.active)
+            stop_sampling.wait(args.sample_interval)
+
+    if servers:
+        threading.Thread(target=sample_memory, daemon=True).start()
+
+    speech = _speech(args.speech_sentences)
+    log_info(f"🚦 {args.sessions} sessions × {args.replies} replies, concurrency {args.concurrency} → {base}")
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = []
+            for index in range(args.sessions):
+                if args.ramp_up > 0 and index < args.concurrency:
+                    time.sleep(args.ramp_up / args.concurrency)
+                futures.append(pool.submit(run_session, base, index, args.replies, speech,
+                                           recorder, args.timeout))
+            sessions_ok = sum(1 for f in futures if f.result())
+        wall_s = time.perf_counter() - started
+    finally:
+        stop_sampling.set()
+        if servers:
+            for process in servers["processes"]:
+                process.terminate()
+                process.wait(timeout=10)
+
+    report = build_report(recorder, wall_s, sessions_ok, args.sessions)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        log_info(f"📝 Report written to {args.json}")
+    return report
+
+
+def serve_app(port: int) -> None:
+    """Runs Press_Conf_Simulator.py threaded, without the debug reloader."""
+    from Press_Conf_Simulator import app
+    app.run(host="127.0.0.1", port=port, threaded=True, debug=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for Press_Conf_Simulator.py")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--replies", type=int, default=5)
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="Seconds to reach full concurrency.")
+    parser.add_argument("--speech-sentences", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--target", default="", help="Existing simulator URL (skip spawning servers).")
+    parser.add_argument("--store", default=".cache/recordings/press.jsonl.gz",
+                        help="Recordings replayed by the stand-in (misses are synthesized).")
+    parser.add_argument("--generate-latency", default="lognormal:400,0.3")
+    parser.add_argument("--explain-latency", default="uniform:20,60")
+    parser.add_argument("--analyze-latency", default="uniform:50,150")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--server-log", default="", help="File for server output (default: discarded).")
+    parser.add_argument("--json", default="", help="Write the full report to this file.")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="Exit non-zero when the overall error rate is higher.")
+    parser.add_argument("--serve-app", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=7860, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_app:
+        serve_app(args.port)
+        sys.exit(0)
+
+    result = run_load_test(args)
+    flush()
+    if args.max_error_rate is not None and result["error_rate"] > args.max_error_rate:
+        log_error(f"❌ Error rate {result['error_rate']:.2%} above {args.max_error_rate:.2%}")
+        flush()
+        sys.exit(1)
+    if result["sessions_ok"] < result["sessions"]:
+        log_warning(f"{result['sessions'] - result['sessions_ok']} session(s) did not complete.")
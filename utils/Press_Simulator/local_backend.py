@@ -0,0 +1,367 @@
+# utils/Press_Simulator/local_backend.py
+"""
+Local Stand-in Backend for the Press Conference Simulator
+---------------------------------------------------------
+
+A small Flask server that mimics the Kaggle `/generate`, `/explain` and
+`/analyze` endpoints so the simulator can run without a GPU notebook.
+It does not run a model: it synthesizes a `<QUESTION> ... <eoa>` answer,
+lightweight explanations and a rule-based analysis, and *simulates*
+prefill cost (milliseconds per prompt token) to show the effect of
+prefix caching.
+
+Prefix caching:
+    Each request may carry `prefix_hash` and `prefix_chars`. The backend
+    recomputes the hash over the system message and the first
+    `prefix_chars` characters of the user message. If it matches and the
+    hash is already cached, only the remaining suffix tokens are
+    "prefilled"; otherwise the whole prompt is, and the prefix is cached.
+
+Session protocol:
+    Also implements the receiving side of utils/Press_Simulator/session_protocol.py:
+    gzip request bodies, per-session context sent once, and delta
+    payloads (prompt suffix only, new turns only). Unknown sessions or
+    history gaps are answered with 409 so the client resends context.
+
+Usage:
+    python -m utils.Press_Simulator.local_backend --port 8000
+    export KAGGLE_GENERATE_API=http://127.0.0.1:8000/generate
+    export KAGGLE_EXPLAIN_API=http://127.0.0.1:8000/explain
+    export KAGGLE_ANALYZE_API=http://127.0.0.1:8000/analyze
+
+    # Print the prefill savings over a simulated session
+    python -m utils.Press_Simulator.local_backend --demo
+"""
+
+import argparse
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from flask import Flask, jsonify, request
+
+from src.agents.Press_Conf_Simulator.prompts.prompt_utils import compute_prefix_hash, estimate_tokens
+from utils.Press_Simulator.logger import log_info
+from utils.Press_Simulator.session_protocol import decode_body
+
+
+# ===============================================================
+# 1️⃣ Prefix KV-cache bookkeeping
+# ===============================================================
+class PrefixCache:
+    """Thread-safe LRU of prefix_hash -> cached prefix token count."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: str, tokens: int) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = tokens
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _split_messages(messages: List[Dict[str, str]]):
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+    user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    return system, user
+
+
+# ===============================================================
+# 2️⃣ Fake question synthesis
+# ===============================================================
+def synthesize_question(messages: List[Dict[str, str]]) -> str:
+    """Builds a plausible `<QUESTION> ... <eoa>` reply from the prompt."""
+    _, user = _split_messages(messages)
+    guest_lines = re.findall(r"- Guest: (.+)", user)
+    if guest_lines:
+        anchor = guest_lines[-1].strip().rstrip(".")[:160]
+        question = f"Vous dites « {anchor} ». Sur quelles preuves concrètes vous appuyez-vous ?"
+    else:
+        speech = re.search(r'"""(.*?)"""', user, flags=re.DOTALL)
+        first = (speech.group(1) if speech else user).strip().split(".")[0][:160]
+        question = f"Pouvez-vous détailler ce point : « {first} » ?"
+    return f"<QUESTION> {question} <eoa>"
+
+
+def synthesize_analysis(history: List[Dict[str, str]]) -> Dict[str, object]:
+    """Rule-based stand-in for the model-written conversation analysis."""
+    answers = [t.get("content", "") for t in history if t.get("role") == "guest"]
+    words = [len(a.split()) for a in answers] or [0]
+    avg_words = sum(words) / len(words)
+    detail = min(5, max(0, round(avg_words / 8)))
+    has_numbers = any(re.search(r"\d", a) for a in answers)
+    return {
+        "summary": f"{len(answers)} guest answer(s) analyzed, {avg_words:.0f} words on average.",
+        "strengths": ["Answers stay on topic."] + (["Uses concrete figures."] if has_numbers else []),
+        "weaknesses": ["Answers are short."] if avg_words < 15 else ["Some answers are long-winded."],
+        "suggestions": ["Back claims with sources."] if not has_numbers else ["Keep citing figures."],
+        "scores": {
+            "clarity": 5 - abs(3 - detail),
+            "relevance": 4,
+            "persuasiveness": 4 if has_numbers else 2,
+            "consistency": 3,
+            "engagement": detail,
+        },
+    }
+
+
+class SessionStore:
+    """Bounded per-session state for the delta protocol."""
+
+    def __init__(self, max_sessions: int = 1024):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, create: bool = False) -> Optional[dict]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None and create:
+                session = {"conversation": None, "prefixes": {}, "history": []}
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+class UnknownSession(Exception):
+    """Raised when a delta arrives for context the backend does not have."""
+
+
+# ===============================================================
+# 3️⃣ Flask app factory
+# ===============================================================
+def create_app(prefill_ms_per_token: float = 0.5, decode_ms: float = 40.0,
+               cache_entries: int = 256, explain_ms: float = 20.0, analyze_ms: float = 60.0) -> Flask:
+    """
+    Creates the stand-in backend.
+
+    Args:
+        prefill_ms_per_token: Simulated prefill latency per uncached prompt token.
+        decode_ms: Simulated fixed decode latency per request.
+        cache_entries: Prefix cache capacity (0 disables prefix caching).
+        explain_ms: Simulated latency of /explain.
+        analyze_ms: Simulated latency of /analyze.
+    """
+    from src.agents.Press_Conf_Simulator.explainability_nodes import lexical_explain, tfidf_explain
+
+    app = Flask(__name__)
+    cache = PrefixCache(cache_entries)
+    sessions = SessionStore()
+    stats = {"requests": 0, "prompt_tokens": 0, "prefill_tokens": 0, "cached_tokens": 0, "bytes_in": 0}
+    stats_lock = threading.Lock()
+
+    def read_payload() -> dict:
+        raw = request.get_data()
+        with stats_lock:
+            stats["bytes_in"] += len(raw)
+        return decode_body(raw, request.headers.get("Content-Encoding"))
+
+    def conversation(data: dict) -> dict:
+        """Session context for explain/analyze deltas (stored on first delivery)."""
+        session = sessions.get(data["session_id"], create="context" in data)
+        if session is None:
+            raise UnknownSession()
+        if "context" in data:
+            session["conversation"] = data["context"]
+        if session["conversation"] is None:
+            raise UnknownSession()
+        return session
+
+    @app.errorhandler(UnknownSession)
+    def unknown_session(_):
+        return jsonify({"error": "unknown_session"}), 409
+
+    @app.route("/generate", methods=["POST"])
+    def generate():
+        data = read_payload()
+        if "suffix" in data:
+            # Session protocol: rebuild the messages from the stored prefix
+            session = sessions.get(data.get("session_id", ""), create="context" in data)
+            if session is None:
+                raise UnknownSession()
+            if "context" in data:
+                session["prefixes"][data["prefix_hash"]] = data["context"]
+            prefix = session["prefixes"].get(data.get("prefix_hash"))
+            if prefix is None:
+                raise UnknownSession()
+            messages = [
+                {"role": "system", "content": prefix["system"]},
+                {"role": "user", "content": prefix["user_prefix"] + data["suffix"]},
+            ]
+            prefix_hash, prefix_chars = data["prefix_hash"], len(prefix["user_prefix"])
+        else:
+            messages = data.get("messages", [])
+            prefix_hash = data.get("prefix_hash") or ""
+            prefix_chars = int(data.get("prefix_chars") or 0)
+
+        system, user = _split_messages(messages)
+        prompt_tokens = estimate_tokens(system) + estimate_tokens(user)
+
+        cached_tokens = 0
+        if prefix_hash and 0 < prefix_chars <= len(user):
+            user_prefix = user[:prefix_chars]
+            # Never trust the client hash blindly: recompute it over the bytes received
+            if compute_prefix_hash(system, user_prefix) == prefix_hash:
+                hit = cache.get(prefix_hash)
+                if hit is not None:
+                    cached_tokens = hit
+                else:
+                    cache.put(prefix_hash, estimate_tokens(system) + estimate_tokens(user_prefix))
+
+        prefill_tokens = max(prompt_tokens - cached_tokens, 0)
+        time.sleep((prefill_tokens * prefill_ms_per_token + decode_ms) / 1000.0)
+
+        with stats_lock:
+            stats["requests"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["prefill_tokens"] += prefill_tokens
+            stats["cached_tokens"] += cached_tokens
+
+        return jsonify({
+            "response": synthesize_question(messages),
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "prefill_tokens": prefill_tokens,
+                "cached_tokens": cached_tokens,
+            },
+        })
+
+    @app.route("/explain", methods=["POST"])
+    def explain():
+        data = read_payload()
+        if "session_id" in data:
+            speech = data.get("speech_context") or conversation(data)["conversation"].get("speech", "")
+        else:
+            speech = data.get("speech", "")
+        question = data.get("question", "")
+        time.sleep(explain_ms / 1000.0)
+        return jsonify({
+            "semantic": tfidf_explain(speech, question),
+            "lexical": lexical_explain(speech, question),
+            "shap": "SHAP not available on the local stand-in backend.",
+        })
+
+    @app.route("/analyze", methods=["POST"])
+    def analyze():
+        data = read_payload()
+        if "session_id" in data:
+            session = conversation(data)
+            offset = int(data.get("history_offset", 0))
+            if offset > len(session["history"]):
+                raise UnknownSession()  # missing turns: client resends everything
+            session["history"] = session["history"][:offset] + list(data.get("history_delta", []))
+            history = session["history"]
+        else:
+            history = data.get("history", [])
+        if data.get("scope") == "turn":
+            history = history[-2:]
+        time.sleep(analyze_ms / 1000.0)
+        return jsonify(synthesize_analysis(history))
+
+    @app.route("/ping", methods=["GET"])
+    def ping():
+        return jsonify({"status": "alive"})
+
+    @app.route("/stats", methods=["GET"])
+    def get_stats():
+        with stats_lock:
+            snapshot = dict(stats)
+        snapshot["cached_prefixes"] = len(cache)
+        snapshot["sessions"] = len(sessions)
+        return jsonify(snapshot)
+
+    return app
+
+
+# ===============================================================
+# 4️⃣ Prefill savings demo
+# ===============================================================
+def demo_prefill_savings(turns: int = 8) -> Dict[str, Dict[str, int]]:
+    """
+    Replays one simulated session against two in-process backends
+    (prefix cache on / off) and reports the prefill tokens each paid.
+    """
+    from src.agents.Press_Conf_Simulator.journalist_nodes import build_prompt_node
+
+    speech = (
+        "Aujourd'hui nous lançons un modèle d'IA pour le diagnostic médical. "
+        "Il a été entraîné sur deux millions d'images annotées par des radiologues. "
+        "Nous estimons qu'il réduit les erreurs de diagnostic de trente pour cent. "
+    ) * 12
+
+    results = {}
+    for label, entries in (("prefix_cache", 256), ("no_cache", 0)):
+        client = create_app(prefill_ms_per_token=0.0, decode_ms=0.0, cache_entries=entries).test_client()
+        state = {"persona": "investigative_hawk", "topic": "IA en santé", "role": "CEO",
+                 "speech": speech, "history": []}
+        for turn in range(turns):
+            state = build_prompt_node(state)
+            res = client.post("/generate", json={
+                "messages": state["messages"],
+                "prefix_hash": state["prefix_hash"],
+                "prefix_chars": state["prefix_chars"],
+            }).get_json()
+            question = res["response"]
+            state["history"] = state["history"] + [
+                {"role": "journalist", "content": question},
+                {"role": "guest", "content": f"Réponse numéro {turn + 1} du guest."},
+            ]
+        results[label] = client.get("/stats").get_json()
+
+    on, off = results["prefix_cache"], results["no_cache"]
+    saved = 1 - on["prefill_tokens"] / max(off["prefill_tokens"], 1)
+    log_info(f"📦 Prompt tokens over {turns} turns: {off['prompt_tokens']}")
+    log_info(f"🐢 Prefill without prefix cache: {off['prefill_tokens']} tokens")
+    log_info(f"⚡ Prefill with prefix cache:    {on['prefill_tokens']} tokens ({saved:.0%} saved)")
+    return results
+
+
+# ===============================================================
+# Run server
+# ===============================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Kaggle backend.")
+    parser.add_argument("--port", type=int, default=int(os.getenv("LOCAL_BACKEND_PORT", "8000")))
+    parser.add_argument("--prefill-ms-per-token", type=float, default=0.5)
+    parser.add_argument("--decode-ms", type=float, default=40.0)
+    parser.add_argument("--cache-entries", type=int, default=256)
+    parser.add_argument("--explain-ms", type=float, default=20.0)
+    parser.add_argument("--analyze-ms", type=float, default=60.0)
+    parser.add_argument("--demo", action="store_true", help="Print prefill savings and exit.")
+    args = parser.parse_args()
+
+    if args.demo:
+        demo_prefill_savings()
+    else:
+        log_info(f"🧪 Local backend running on http://127.0.0.1:{args.port}")
+        create_app(args.prefill_ms_per_token, args.decode_ms, args.cache_entries,
+                   args.explain_ms, args.analyze_ms).run(
+            host="0.0.0.0", port=args.port, threaded=True
+        )
@@ -3,8 +3,30 @@
 Lightweight Logger Utility for Press Conference Simulator
 ---------------------------------------------------------
 
-This logger provides consistent, colored console output across
-the local Flask app and Kaggle backend requests.
+Non-blocking structured logger used across the local Flask app and
+Kaggle backend requests. Calling a log function only builds a small
+record and puts it on a queue; a background thread serializes and
+writes it, so request threads never block on stdout.
+
+Features:
+    - JSON lines (default) or colored text output
+    - levels: DEBUG < INFO (incl. OK) < WARN < ERROR
+    - lazy %-style arguments (log_debug("payload: %s", data)) that are
+      only formatted, on the writer thread, when the level is enabled
+    - truncation of long messages, and of long strings / collections
+      inside structured arguments (large payload dumps)
+    - per-message sampling: at most N records per second for the same
+      message pattern; the next emitted record reports how many were
+      suppressed (errors are never sampled)
+    - the current request ID (utils.metrics) is attached to each record
+
+Configuration (environment variables):
+    PRESS_LOG_LEVEL      -> DEBUG | INFO | WARN | ERROR (default INFO)
+    PRESS_LOG_FORMAT     -> json | text (default json)
+    PRESS_LOG_MAX_CHARS  -> max message length (default 2000)
+    PRESS_LOG_MAX_FIELD_CHARS -> max length of a string inside an argument (default 300)
+    PRESS_LOG_MAX_ITEMS  -> max items shown per list/dict argument (default 20)
+    PRESS_LOG_SAMPLE_PER_SEC -> records/second per message pattern (default 20)
 
 Usage:
     from src.utils.Press_Simulator.logger import (
@@ -15,36 +37,196 @@ Example:
     log_info("Starting Flask server...")
     log_warning("Response took longer than expected.")
     log_error("Failed to connect to Kaggle backend.")
+    log_debug("Raw payload: %s", payload)   # arguments must not be mutated afterwards
 """
 
+import atexit
+import json
+import os
+import queue
+import re
 import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from utils.metrics import get_request_id
+
+_LEVELS = {"DEBUG": 10, "INFO": 20, "OK": 20, "WARN": 30, "ERROR": 40}
+_MIN_LEVEL = _LEVELS.get(os.getenv("PRESS_LOG_LEVEL", "INFO").upper(), 20)
+_FORMAT = os.getenv("PRESS_LOG_FORMAT", "json").lower()
+_MAX_CHARS = int(os.getenv("PRESS_LOG_MAX_CHARS", "2000"))
+_SAMPLE_PER_SEC = int(os.getenv("PRESS_LOG_SAMPLE_PER_SEC", "20"))
+_MAX_FIELD_CHARS = int(os.getenv("PRESS_LOG_MAX_FIELD_CHARS", "300"))
+_MAX_ITEMS = int(os.getenv("PRESS_LOG_MAX_ITEMS", "20"))
 
 # ANSI color codes for readability (auto-disabled if output not a terminal)
 _COLOR = sys.stdout.isatty()
+_COLORS = {"DEBUG": "90", "INFO": "34", "OK": "32", "WARN": "33", "ERROR": "31"}
+
+_QUEUE: "queue.Queue" = queue.Queue(maxsize=10000)
+_DIGITS = re.compile(r"\d+")
+_samples = {}  # pattern -> [window_start, count_in_window, suppressed]
+_samples_lock = threading.Lock()
+_dropped = 0
+
 
 def _colorize(text: str, color_code: str) -> str:
     if not _COLOR:
         return text
     return f"\033[{color_code}m{text}\033[0m"
 
+
+# ===============================================================
+# Hot path: filter, sample, enqueue
+# ===============================================================
+def _sample(level: str, message: str) -> int:
+    """
+    Returns -1 to drop the record, else the number of records of the same
+    pattern suppressed since the last emitted one.
+    """
+    if level == "ERROR" or _SAMPLE_PER_SEC <= 0:
+        return 0
+    pattern = level + _DIGITS.sub("#", message[:60])
+    now = time.monotonic()
+    with _samples_lock:
+        window = _samples.get(pattern)
+        if window is None or now - window[0] >= 1.0:
+            suppressed = window[2] if window else 0
+            _samples[pattern] = [now, 1, 0]
+            if len(_samples) > 5000:
+                _samples.clear()
+            return suppressed
+        if window[1] >= _SAMPLE_PER_SEC:
+            window[2] += 1
+            return -1
+        window[1] += 1
+        suppressed, window[2] = window[2], 0
+        return suppressed
+
+
+def _log(level: str, message: str, args: tuple = ()) -> None:
+    global _dropped
+    if _LEVELS[level] < _MIN_LEVEL:
+        return
+    suppressed = _sample(level, message)
+    if suppressed < 0:
+        return
+    record = (time.time(), level, message, args, get_request_id(), threading.current_thread().name, suppressed)
+    try:
+        _QUEUE.put_nowait(record)
+    except queue.Full:
+        _dropped += 1
+
+
+# ===============================================================
+# Background writer
+# ===============================================================
+def _shrink(value, depth: int = 0):
+    """Returns a copy of a structured argument with long fields cut down."""
+    if isinstance(value, str):
+        if len(value) > _MAX_FIELD_CHARS:
+            return value[:_MAX_FIELD_CHARS] + f"… [+{len(value) - _MAX_FIELD_CHARS} chars]"
+        return value
+    if depth >= 4:
+        return value if isinstance(value, (int, float, bool, type(None))) else f"<{type(value).__name__}>"
+    if isinstance(value, dict):
+        items = list(value.items())
+        shrunk = {k: _shrink(v, depth + 1) for k, v in items[:_MAX_ITEMS]}
+        if len(items) > _MAX_ITEMS:
+            shrunk["…"] = f"+{len(items) - _MAX_ITEMS} keys"
+        return shrunk
+    if isinstance(value, (list, tuple)):
+        shrunk = [_shrink(v, depth + 1) for v in value[:_MAX_ITEMS]]
+        if len(value) > _MAX_ITEMS:
+            shrunk.append(f"… +{len(value) - _MAX_ITEMS} items")
+        return shrunk
+    return value
+
+
+def _render(message, args: tuple) -> str:
+    if not args:
+        return str(message)
+    try:
+        return str(message) % tuple(_shrink(a) for a in args)
+    except (TypeError, ValueError):
+        return " ".join([str(message)] + [str(_shrink(a)) for a in args])
+
+
+def _format(record) -> str:
+    ts, level, message, args, request_id, thread, suppressed = record
+    message = _render(message, args)
+    if len(message) > _MAX_CHARS:
+        message = message[:_MAX_CHARS] + f"… [truncated {len(message) - _MAX_CHARS} chars]"
+    if _FORMAT == "text":
+        prefix = f"[{level}]"
+        extra = f" (+{suppressed} similar suppressed)" if suppressed else ""
+        return _colorize(f"{prefix} {message}{extra}", _COLORS[level])
+    entry = {
+        "ts": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(timespec="milliseconds"),
+        "level": level,
+        "msg": message,
+        "thread": thread,
+    }
+    if request_id:
+        entry["request_id"] = request_id
+    if suppressed:
+        entry["suppressed"] = suppressed
+    return json.dumps(entry, ensure_ascii=False)
+
+
+def _writer() -> None:
+    global _dropped
+    while True:
+        record = _QUEUE.get()
+        try:
+            stream = sys.stderr if record[1] == "ERROR" else sys.stdout
+            print(_format(record), file=stream, flush=_QUEUE.empty())
+            if _dropped:
+                dropped, _dropped = _dropped, 0
+                print(_format((time.time(), "WARN", f"Logger queue full: {dropped} records dropped",
+                               (), "", "logger", 0)), file=sys.stderr)
+        except Exception:
+            pass
+        finally:
+            _QUEUE.task_done()
+
+
+def flush(timeout: float = 2.0) -> None:
+    """Blocks until queued records are written (or timeout)."""
+    deadline = time.monotonic() + timeout
+    while _QUEUE.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.005)
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+
+threading.Thread(target=_writer, name="log-writer", daemon=True).start()
+atexit.register(flush)
+
+
 # ===============================================================
 # Core logging helpers
 # ===============================================================
-def log_info(message: str) -> None:
-    """Prints informational messages (blue color)."""
-    print(_colorize(f"[INFO] {message}", "34"))
+def log_debug(message: str, *args) -> None:
+    """Debug details (large payloads); hidden unless PRESS_LOG_LEVEL=DEBUG."""
+    _log("DEBUG", message, args)
+
+def log_info(message: str, *args) -> None:
+    """Informational messages (blue in text mode)."""
+    _log("INFO", message, args)
 
-def log_warning(message: str) -> None:
-    """Prints warning messages (yellow color)."""
-    print(_colorize(f"[WARN] {message}", "33"))
+def log_warning(message: str, *args) -> None:
+    """Warning messages (yellow in text mode)."""
+    _log("WARN", message, args)
 
-def log_error(message: str) -> None:
-    """Prints error messages (red color)."""
-    print(_colorize(f"[ERROR] {message}", "31"), file=sys.stderr)
+def log_error(message: str, *args) -> None:
+    """Error messages (red in text mode, written to stderr)."""
+    _log("ERROR", message, args)
 
-def log_success(message: str) -> None:
+def log_success(message: str, *args) -> None:
     """Optional: green highlight for success logs."""
-    print(_colorize(f"[OK] {message}", "32"))
+    _log("OK", message, args)
 
 # ===============================================================
 # Example usage (debug)
@@ -54,3 +236,8 @@ if __name__ == "__main__":
     log_success("Connected to backend.")
     log_warning("Using fallback ngrok URLs.")
     log_error("Example error: could not fetch /generate.")
+    for i in range(100):
+        log_info(f"High-volume message {i}")
+    log_info("x" * 5000)
+    log_info("Structured payload: %s", {"history": [{"content": "y" * 1000}] * 50})
+    flush()
@@ -0,0 +1,347 @@
+# utils/Press_Simulator/record_replay.py
+"""
+Record / Replay Stand-in for the Kaggle Backend
+-----------------------------------------------
+
+Makes press-conference runs reproducible without the ngrok tunnel.
+
+record:
+    A pass-through proxy for `/generate`, `/explain` and `/analyze`. Each
+    request is forwarded unchanged (gzip bodies included) to the real
+    KAGGLE_*_API endpoint, and the response is appended to a compact
+    gzip JSON-lines store:
+        {"e": "generate", "k": "<request key>", "s": 200, "ms": 812.4, "r": {...}}
+    The request key is a hash of the decoded body without the volatile
+    `session_id` / `context` fields, so the same conversation replayed
+    later (new session ids) maps to the same recordings.
+
+replay:
+    Serves recorded responses back (repeated keys cycle through their
+    recordings in order). Misses are synthesized by the local stand-in
+    (utils/Press_Simulator/local_backend.py: `<QUESTION> ... <eoa>`,
+    local explanations, rule-based analysis) or answered with 404.
+    Latency per endpoint follows a configurable distribution:
+        fixed:40 | uniform:20,80 | normal:800,150 | lognormal:800,0.35
+    and recorded hits can keep their recorded latency ("recorded").
+    With PRESS_BACKEND_PROTOCOL=session, /analyze deltas depend on when
+    background turn analyses complete, so some may miss and be synthesized.
+
+smoke:
+    Starts a replay server in-process and drives the real Flask app
+    (/start, /reply, /stop) through the LangGraph pipeline, without network.
+
+Usage:
+    # 1. Record against the real backend (KAGGLE_*_API point to ngrok)
+    python -m utils.Press_Simulator.record_replay record --port 8001
+    export KAGGLE_GENERATE_API=http://127.0.0.1:8001/generate   # etc., then use the app
+
+    # 2. Replay offline
+    python -m utils.Press_Simulator.record_replay replay --port 8000 \
+        --generate-latency lognormal:800,0.35 --hit-latency recorded
+
+    # 3. Offline end-to-end check
+    python -m utils.Press_Simulator.record_replay smoke
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from flask import Flask, Response, g, jsonify, request
+
+from utils.load_testing import parse_latency
+from utils.Press_Simulator.logger import log_info, log_warning
+from utils.Press_Simulator.session_protocol import decode_body
+
+
+ENDPOINTS = ("generate", "explain", "analyze")
+DEFAULT_STORE = os.getenv("PRESS_RECORDINGS", ".cache/recordings/press.jsonl.gz")
+
+# Fields that differ between otherwise identical runs
+_VOLATILE_FIELDS = ("session_id", "context")
+
+
+# ===============================================================
+# 1️⃣ Request keys & latency distributions
+# ===============================================================
+def request_key(payload: Dict[str, Any]) -> str:
+    """Stable hash of a request body, ignoring per-session fields."""
+    stable = {k: v for k, v in payload.items() if k not in _VOLATILE_FIELDS}
+    raw = json.dumps(stable, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+# ===============================================================
+# 2️⃣ On-disk store
+# ===============================================================
+class RecordingStore:
+    """Append-only gzip JSON-lines store of backend responses."""
+
+    def __init__(self, path: str = DEFAULT_STORE):
+        self.path = path
+        self._records: Dict[Tuple[str, str], List[dict]] = {}
+        self._cursor: Dict[Tuple[str, str], int] = {}
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def load(self) -> "RecordingStore":
+        if not os.path.exists(self.path):
+            log_warning(f"No recordings at {self.path}; every request will be a miss.")
+            return self
+        count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._records.setdefault((record["e"], record["k"]), []).append(record)
+                        count += 1
+            except (EOFError, json.JSONDecodeError):
+                # Recorder was killed mid-write: keep everything before the cut
+                pass
+        log_info(f"📼 Loaded {count} recording(s) ({len(self._records)} distinct requests) from {self.path}")
+        return self
+
+    def lookup(self, endpoint: str, key: str) -> Optional[dict]:
+        with self._lock:
+            records = self._records.get((endpoint, key))
+            if not records:
+                return None
+            index = self._cursor.get((endpoint, key), 0)
+            self._cursor[(endpoint, key)] = index + 1
+            return records[index % len(records)]
+
+    def append(self, endpoint: str, key: str, status: int, body: Any, ms: float) -> None:
+        record = {"e": endpoint, "k": key, "s": status, "ms": round(ms, 1), "r": body}
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._writer is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                # Appending adds a new gzip member; readers handle several
+                self._writer = gzip.open(self.path, "at", encoding="utf-8")
+            self._writer.write(line)
+            self._writer.flush()
+            self._records.setdefault((endpoint, key), []).append(record)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._records.values())
+
+
+# ===============================================================
+# 3️⃣ Recording proxy
+# ===============================================================
+def create_record_app(store: RecordingStore, upstreams: Dict[str, str], timeout: float = 4000) -> Flask:
+    """Proxy that forwards to `upstreams[endpoint]` and records every response."""
+    app = Flask(__name__)
+    forwarded = ("Content-Type", "Content-Encoding", "X-Request-ID")
+
+    def proxy(endpoint: str) -> Response:
+        raw = request.get_data()
+        headers = {h: request.headers[h] for h in forwarded if h in request.headers}
+        started = time.perf_counter()
+        upstream = requests.post(upstreams[endpoint], data=raw, headers=headers, timeout=timeout)
+        ms = (time.perf_counter() - started) * 1000
+        try:
+            body = upstream.json()
+        except ValueError:
+            body = upstream.text
+        # 409 reflects backend session state, not the request: never replay it
+        if upstream.status_code != 409:
+            payload = decode_body(raw, request.headers.get("Content-Encoding"))
+            store.append(endpoint, request_key(payload), upstream.status_code, body, ms)
+        return Response(upstream.content, status=upstream.status_code,
+                        content_type=upstream.headers.get("Content-Type", "application/json"))
+
+    for endpoint in ENDPOINTS:
+        app.add_url_rule(f"/{endpoint}", endpoint, lambda endpoint=endpoint: proxy(endpoint), methods=["POST"])
+
+    @app.route("/ping", methods=["GET"])
+    def ping():
+        return jsonify({"status": "alive", "recorded": len(store)})
+
+    return app
+
+
+# ===============================================================
+# 4️⃣ Replay server
+# ===============================================================
+def create_replay_app(store: RecordingStore, latencies: Optional[Dict[str, str]] = None,
+                      hit_latency: str = "recorded", miss: str = "synthesize",
+                      seed: Optional[int] = 0, prefill_ms_per_token: float = 0.0) -> Flask:
+    """
+    Replays recordings; misses are synthesized by the local stand-in
+    (miss="synthesize") or answered with 404 (miss="error").
+
+    Args:
+        latencies: Per-endpoint latency spec for synthesized responses.
+        hit_latency: "recorded", or a spec applied to every hit.
+        seed: RNG seed for latency sampling (None = nondeterministic).
+        prefill_ms_per_token: Extra simulated prefill on synthesized /generate.
+    """
+    from utils.Press_Simulator.local_backend import create_app
+
+    # The stand-in only synthesizes; latency is applied here
+    app = create_app(prefill_ms_per_token=prefill_ms_per_token, decode_ms=0, explain_ms=0, analyze_ms=0)
+    latencies = latencies or {}
+    miss_samplers = {e: parse_latency(latencies.get(e, "fixed:0")) for e in ENDPOINTS}
+    hit_sampler = parse_latency(hit_latency)
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    counters = {"hits": 0, "misses": 0}
+
+    def sample(sampler, recorded_ms: float = 0.0) -> float:
+        if sampler is None:
+            return recorded_ms
+        with rng_lock:
+            return sampler(rng)
+
+    @app.before_request
+    def serve_recording():
+        endpoint = (request.path or "").strip("/")
+        if endpoint not in ENDPOINTS or request.method != "POST":
+            return None
+        payload = decode_body(request.get_data(), request.headers.get("Content-Encoding"))
+        record = store.lookup(endpoint, request_key(payload))
+        with rng_lock:
+            counters["hits" if record else "misses"] += 1
+        if record is not None:
+            g.replay_delay_ms = sample(hit_sampler, record.get("ms", 0.0))
+            body = record["r"]
+            if isinstance(body, str):
+                return Response(body, status=record["s"])
+            return jsonify(body), record["s"]
+        if miss == "error":
+            g.replay_delay_ms = 0.0
+            return jsonify({"error": "no_recording", "endpoint": endpoint}), 404
+        g.replay_delay_ms = sample(miss_samplers[endpoint])
+        return None
+
+    @app.after_request
+    def apply_latency(response):
+        delay = g.pop("replay_delay_ms", 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return response
+
+    @app.route("/replay/stats", methods=["GET"])
+    def replay_stats():
+        with rng_lock:
+            return jsonify(dict(counters, recordings=len(store)))
+
+    return app
+
+
+# ===============================================================
+# 5️⃣ Offline end-to-end smoke run
+# ===============================================================
+def serve_in_background(app: Flask) -> Tuple[Any, str]:
+    """Starts `app` on a free localhost port; returns (server, base URL)."""
+    from werkzeug.serving import make_server
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def point_endpoints_at(base: str) -> None:
+    """Routes the KAGGLE_*_API settings to `base` (call before importing the app)."""
+    for endpoint in ENDPOINTS:
+        os.environ[f"KAGGLE_{endpoint.upper()}_API"] = f"{base}/{endpoint}"
+        os.environ.pop(f"KAGGLE_{endpoint.upper()}_APIS", None)
+
+
+def smoke_run(store_path: str = DEFAULT_STORE, replies: int = 3) -> List[str]:
+    """Drives /start, /reply and /stop of the real app against a replay server."""
+    server, base = serve_in_background(create_replay_app(RecordingStore(store_path).load()))
+    point_endpoints_at(base)
+    from Press_Conf_Simulator import app
+
+    client = app.test_client()
+    questions = []
+    res = client.post("/start", json={
+        "persona": "investigative_hawk", "topic": "IA en santé", "role": "CEO",
+        "speech": "Nous lançons un modèle d'IA pour le diagnostic médical. "
+                  "Il réduit les erreurs de diagnostic de trente pour cent.",
+    }).get_json()
+    questions.append(res["question"])
+    for turn in range(replies):
+        res = client.post("/reply", json={
+            "answer": f"Réponse {turn + 1}: les essais cliniques ont porté sur {(turn + 1) * 400} patients.",
+            "explain_mode": "deep" if turn == 0 else "local",
+        }).get_json()
+        questions.append(res["question"])
+    analysis = client.post("/stop").get_json()["analysis"]
+
+    for i, question in enumerate(questions):
+        log_info(f"🎤 Q{i}: {question}")
+    log_info(f"🧾 Analysis keys: {sorted(analysis) if isinstance(analysis, dict) else analysis}")
+    log_info(f"📼 Replay stats: {requests.get(f'{base}/replay/stats', timeout=10).json()}")
+    server.shutdown()
+    return questions
+
+
+# ===============================================================
+# CLI
+# ===============================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record / replay the Kaggle backend.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Proxy the real backend and record responses.")
+    rec.add_argument("--port", type=int, default=8001)
+    rec.add_argument("--store", default=DEFAULT_STORE)
+    rec.add_argument("--timeout", type=float, default=4000)
+
+    rep = sub.add_parser("replay", help="Serve recordings (and synthesize misses).")
+    rep.add_argument("--port", type=int, default=int(os.getenv("LOCAL_BACKEND_PORT", "8000")))
+    rep.add_argument("--store", default=DEFAULT_STORE)
+    for name in ENDPOINTS:
+        rep.add_argument(f"--{name}-latency", default="fixed:0",
+                         help="fixed:MS | uniform:LO,HI | normal:MEAN,STD | lognormal:MEDIAN,SIGMA")
+    rep.add_argument("--hit-latency", default="recorded", help="'recorded' or a latency spec")
+    rep.add_argument("--miss", choices=("synthesize", "error"), default="synthesize")
+    rep.add_argument("--prefill-ms-per-token", type=float, default=0.0)
+    rep.add_argument("--seed", type=int, default=0)
+
+    smoke = sub.add_parser("smoke", help="Run a full conference offline against a replay server.")
+    smoke.add_argument("--store", default=DEFAULT_STORE)
+    smoke.add_argument("--replies", type=int, default=3)
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        from utils.Press_Simulator.api_endpoints import (
+            KAGGLE_GENERATE_API, KAGGLE_EXPLAIN_API, KAGGLE_ANALYZE_API
+        )
+        upstreams = {"generate": KAGGLE_GENERATE_API, "explain": KAGGLE_EXPLAIN_API,
+                     "analyze": KAGGLE_ANALYZE_API}
+        store = RecordingStore(args.store)
+        log_info(f"🔴 Recording to {args.store} via http://127.0.0.1:{args.port}")
+        try:
+            create_record_app(store, upstreams, args.timeout).run(host="0.0.0.0", port=args.port, threaded=True)
+        finally:
+            store.close()
+    elif args.command == "replay":
+        app = create_replay_app(
+            RecordingStore(args.store).load(),
+            latencies={e: getattr(args, f"{e}_latency") for e in ENDPOINTS},
+            hit_latency=args.hit_latency, miss=args.miss, seed=args.seed,
+            prefill_ms_per_token=args.prefill_ms_per_token,
+        )
+        log_info(f"▶️ Replay backend running on http://127.0.0.1:{args.port}")
+        app.run(host="0.0.0.0", port=args.port, threaded=True)
+    else:
+        smoke_run(args.store, args.replies)
@@ -0,0 +1,250 @@
+# utils/Press_Simulator/session_protocol.py
+"""
+Session-Aware Delta Protocol for Backend Calls
+----------------------------------------------
+
+The legacy protocol resends everything on every call: the rendered
+messages (speech included) to /generate, the speech to /explain and
+the whole history to /analyze. Over a slow tunnel, payload size grows
+with the session.
+
+With PRESS_BACKEND_PROTOCOL=session:
+    - every body carries a `session_id` and is gzip-compressed
+      (`Content-Encoding: gzip`);
+    - the session context (persona, topic, role, speech) and each
+      stable prompt prefix are sent ONCE, the first time a backend
+      needs them;
+    - later calls only send what is new: the per-turn prompt suffix,
+      the question to explain, or the turns not yet delivered.
+
+A backend that does not know a session (restart, fail-over to another
+node) answers 409 and the client transparently resends with context.
+Calls are pinned to one backend per session via pool affinity.
+
+The receiving side is implemented by utils/Press_Simulator/local_backend.py.
+
+Usage:
+    python -m utils.Press_Simulator.session_protocol   # bytes-per-turn benchmark
+"""
+
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from utils.Press_Simulator.logger import log_info
+
+
+BACKEND_PROTOCOL = os.getenv("PRESS_BACKEND_PROTOCOL", "full")
+
+_KNOWN: "OrderedDict[tuple, int]" = OrderedDict()  # (pool, session, key) -> turns delivered
+_KNOWN_SIZE = 4096
+_LOCK = threading.Lock()
+
+
+def use_session_protocol(session_id: str) -> bool:
+    return BACKEND_PROTOCOL == "session" and bool(session_id)
+
+
+# ===============================================================
+# 1️⃣ Wire encoding
+# ===============================================================
+def encode_body(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """requests.post kwargs for a gzip-compressed JSON body."""
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return {
+        "data": gzip.compress(raw, compresslevel=6),
+        "headers": {"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    }
+
+
+def decode_body(raw: bytes, content_encoding: Optional[str]) -> Dict[str, Any]:
+    """Backend side: inverse of encode_body (plain JSON also accepted)."""
+    if (content_encoding or "").lower() == "gzip":
+        raw = gzip.decompress(raw)
+    return json.loads(raw or b"{}")
+
+
+# ===============================================================
+# 2️⃣ Delivery bookkeeping
+# ===============================================================
+def _get_known(key: tuple) -> Optional[int]:
+    with _LOCK:
+        return _KNOWN.get(key)
+
+
+def _set_known(key: tuple, value: int) -> None:
+    with _LOCK:
+        _KNOWN[key] = value
+        _KNOWN.move_to_end(key)
+        while len(_KNOWN) > _KNOWN_SIZE:
+            _KNOWN.popitem(last=False)
+
+
+def forget_session(session_id: str) -> None:
+    """Drops delivery bookkeeping for a finished session."""
+    with _LOCK:
+        for key in [k for k in _KNOWN if k[1] == session_id]:
+            del _KNOWN[key]
+
+
+def _post(pool, session_id: str, body: Dict[str, Any], context_key: str,
+          context: Dict[str, Any], timeout: float) -> requests.Response:
+    """
+    Posts a delta body; attaches `context` only if this backend has not
+    acknowledged it yet, and resends with context on a 409.
+    """
+    known_key = (pool.name, session_id, context_key)
+    payload = dict(body, session_id=session_id)
+    if _get_known(known_key) is None:
+        payload["context"] = context
+    res = pool.post(timeout=timeout, affinity=session_id, **encode_body(payload))
+    if res.status_code == 409 and "context" not in payload:
+        payload["context"] = context
+        res = pool.post(timeout=timeout, affinity=session_id, **encode_body(payload))
+    return res
+
+
+def session_context(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "persona": state.get("persona", ""),
+        "topic": state.get("topic", ""),
+        "role": state.get("role", ""),
+        "speech": state.get("speech", ""),
+    }
+
+
+# ===============================================================
+# 3️⃣ Endpoint calls
+# ===============================================================
+def generate(pool, session_id: str, messages: List[Dict[str, str]], prefix_hash: str,
+             prefix_chars: int, timeout: float = 4000) -> requests.Response:
+    """Sends only the per-turn suffix once the prefix is known to the backend."""
+    system, user = messages[0]["content"], messages[-1]["content"]
+    context = {"system": system, "user_prefix": user[:prefix_chars]}
+    res = _post(pool, session_id, {"prefix_hash": prefix_hash, "suffix": user[prefix_chars:]},
+                f"prefix:{prefix_hash}", context, timeout)
+    if res.ok:
+        _set_known((pool.name, session_id, f"prefix:{prefix_hash}"), 0)
+    return res
+
+
+def explain(pool, state: Dict[str, Any], question: str, speech_context: str,
+            timeout: float = 4000) -> requests.Response:
+    """Explains a question against the stored speech (or retrieved passages)."""
+    session_id = state["session_id"]
+    body = {"question": question}
+    if speech_context and speech_context != state.get("speech", ""):
+        body["speech_context"] = speech_context
+    res = _post(pool, session_id, body, "conversation", session_context(state), timeout)
+    if res.ok and _get_known((pool.name, session_id, "conversation")) is None:
+        _set_known((pool.name, session_id, "conversation"), 0)
+    return res
+
+
+def analyze(pool, state: Dict[str, Any], scope: str = "full", turns: Optional[List[Dict]] = None,
+            timeout: float = 4000) -> requests.Response:
+    """
+    Delivers the turns the backend has not seen yet, then asks for an
+    analysis of either the whole conversation or the latest exchange.
+    """
+    session_id = state["session_id"]
+    history = turns if turns is not None else state.get("history", [])
+    known_key = (pool.name, session_id, "conversation")
+    delivered = _get_known(known_key) or 0
+    if delivered > len(history):
+        delivered = 0
+
+    body = {"scope": scope, "history_offset": delivered, "history_delta": history[delivered:]}
+    res = _post(pool, session_id, body, "conversation", session_context(state), timeout)
+    if res.status_code == 409:
+        # Backend lost the turns as well: resend everything
+        body.update(history_offset=0, history_delta=history)
+        res = pool.post(timeout=timeout, affinity=session_id, **encode_body(
+            dict(body, session_id=session_id, context=session_context(state))
+        ))
+    if res.ok:
+        _set_known(known_key, len(history))
+    return res
+
+
+# ===============================================================
+# 4️⃣ Benchmark: bytes sent per turn
+# ===============================================================
+def benchmark_payload_savings(turns: int = 12) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs the same simulated conference through the legacy and session
+    protocols against an in-process reference backend and reports the
+    request bytes it received: per turn (generate + explain + turn
+    analysis) and for the final full-conversation analysis.
+    """
+    from werkzeug.serving import make_server
+    from src.agents.Press_Conf_Simulator.journalist_nodes import build_prompt_node
+    from utils.Press_Simulator.backend_pool import BackendPool
+    from utils.Press_Simulator.local_backend import create_app
+
+    server = make_server("127.0.0.1", 0, create_app(prefill_ms_per_token=0, decode_ms=0), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    def bytes_in() -> int:
+        return requests.get(f"{base}/stats", timeout=10).json()["bytes_in"]
+
+    # Kept under PRESS_SPEECH_TOKEN_BUDGET so it is inlined (no embedding model needed)
+    speech = " ".join(
+        f"Point {i}: notre plateforme améliore la qualité du service public de {i * 3} pour cent."
+        for i in range(30)
+    )
+    results = {}
+    for protocol in ("full", "session"):
+        pools = {name: BackendPool(name, [f"{base}/{name}"], health_interval=0)
+                 for name in ("generate", "explain", "analyze")}
+        state = {"session_id": f"bench-{protocol}", "persona": "analytical_columnist",
+                 "topic": "Services publics", "role": "Ministre", "speech": speech, "history": []}
+        per_turn = []
+        for turn in range(turns):
+            before = bytes_in()
+            state = build_prompt_node(state)
+            if protocol == "session":
+                generate(pools["generate"], state["session_id"], state["messages"],
+                         state["prefix_hash"], state["prefix_chars"])
+            else:
+                pools["generate"].post(json={"messages": state["messages"]})
+            question = f"Question {turn} sur le point {turn}?"
+            answer = f"Réponse {turn}: nous publierons les chiffres détaillés du point {turn}."
+            state["history"] = state["history"] + [
+                {"role": "journalist", "content": question}, {"role": "guest", "content": answer},
+            ]
+            if protocol == "session":
+                explain(pools["explain"], state, question, state["speech_context"])
+                analyze(pools["analyze"], state, scope="turn")
+            else:
+                pools["explain"].post(json={"speech": speech, "question": question})
+                pools["analyze"].post(json=dict(session_context(state), history=state["history"][-2:]))
+            per_turn.append(bytes_in() - before)
+
+        before = bytes_in()
+        if protocol == "session":
+            analyze(pools["analyze"], state, scope="full")
+        else:
+            pools["analyze"].post(json=dict(session_context(state), history=state["history"]))
+        results[protocol] = {"per_turn": per_turn, "final_analysis": bytes_in() - before}
+
+    server.shutdown()
+    full, session = results["full"], results["session"]
+    log_info(f"{'turn':>4} | {'legacy bytes':>12} | {'session+gzip':>12}")
+    for i, (a, b) in enumerate(zip(full["per_turn"], session["per_turn"]), start=1):
+        log_info(f"{i:>4} | {a:>12} | {b:>12}")
+    log_info(f" end | {full['final_analysis']:>12} | {session['final_analysis']:>12}  (final analysis)")
+    total_full = sum(full["per_turn"]) + full["final_analysis"]
+    total_session = sum(session["per_turn"]) + session["final_analysis"]
+    log_info(f"📉 Total: {total_full} → {total_session} bytes ({1 - total_session / total_full:.0%} saved)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_payload_savings()
@@ -0,0 +1,329 @@
+# utils/bulk_score.py
+"""
+Resumable Bulk Scoring for Large Article Files
+----------------------------------------------
+
+Scores a CSV or JSONL file of articles (title, text[, subject, date,
+label, id]) with NewsPredictionAgent, for archives far too large for the
+one-at-a-time /predict_news route:
+
+    reader  -> streams the input in chunks (pandas chunksize)
+    workers -> process pool; each worker loads the agent once and embeds
+               its whole batch in one pass (NewsPredictionAgent.predict_batch)
+    writer  -> appends results in input order to the output (CSV or JSONL,
+               by extension), then updates the checkpoint
+
+The checkpoint (<output>.ckpt.json) records how many input rows are in the
+output and the output size at that point. Re-running the same command
+resumes: the output is truncated to the checkpointed size (dropping a
+half-written batch) and the already-scored rows are skipped. It also
+records the scoring options (model, columns, --verify); resuming with
+different ones, or writing over an existing output that has no
+checkpoint, is refused unless --restart is given.
+
+Web verification (--verify) is optional: each article is then also checked
+through verify_news_with_websearch (rate-limited by utils/llm_gateway.py in
+each worker) and combined with decide_final_result.
+
+Usage:
+    python -m utils.bulk_score archive.csv scores.jsonl --workers 4
+    python -m utils.bulk_score archive.jsonl scores.csv --batch-size 256 --verify
+    python -m utils.bulk_score archive.csv scores.jsonl --restart   # ignore checkpoint, overwrite
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pandas as pd
+
+MODEL_PATH = "src/models/logisticRegressor.pkl"
+NEWS_COLUMNS = ("title", "text", "subject", "date")
+OUTPUT_FIELDS = ["row", "id", "title", "prediction", "confidence", "ground_truth",
+                 "verdict", "source", "final_verdict", "error"]
+
+
+# ===============================================================
+# 1️⃣ Input streaming
+# ===============================================================
+class _CountingReader(io.RawIOBase):
+    """Binary file wrapper exposing how many bytes pandas has consumed."""
+
+    def __init__(self, raw):
+        self.raw, self.position = raw, 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self.raw.readinto(buffer)
+        self.position += n or 0
+        return n
+
+
+def iter_chunks(path: str, chunk_size: int, skip_rows: int = 0) -> Iterator[Tuple[int, pd.DataFrame, float]]:
+    """Yields (first row index, chunk, fraction of the file read) after skipping `skip_rows`."""
+    size = max(os.path.getsize(path), 1)
+    with open(path, "rb", buffering=0) as raw:
+        counter = _CountingReader(raw)
+        stream = io.TextIOWrapper(io.BufferedReader(counter), encoding="utf-8")
+        if path.endswith((".jsonl", ".json")):
+            reader = pd.read_json(stream, lines=True, chunksize=chunk_size, dtype=False)
+            start, to_skip = 0, skip_rows  # parsed, then dropped
+        else:
+            reader = pd.read_csv(stream, chunksize=chunk_size, dtype=str, keep_default_na=False,
+                                 skiprows=range(1, skip_rows + 1) if skip_rows else None)
+            start, to_skip = skip_rows, 0
+        for chunk in reader:
+            if to_skip:
+                dropped = min(to_skip, len(chunk))
+                chunk, to_skip, start = chunk.iloc[dropped:], to_skip - dropped, start + dropped
+                if chunk.empty:
+                    continue
+            yield start, chunk.reset_index(drop=True), counter.position / size
+            start += len(chunk)
+
+
+def _normalize(chunk: pd.DataFrame, text_column: str, title_column: str) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "title": chunk.get(title_column, pd.Series([""] * len(chunk))).astype(str),
+        "text": chunk[text_column].astype(str),
+        "subject": chunk.get("subject", pd.Series([""] * len(chunk))).astype(str),
+        "date": chunk.get("date", pd.Series([""] * len(chunk))).astype(str),
+    })
+    if "label" in chunk:
+        df["label"] = pd.to_numeric(chunk["label"], errors="coerce")
+    df["id"] = chunk["id"].astype(str) if "id" in chunk else None
+    return df
+
+
+# ===============================================================
+# 2️⃣ Workers (one agent per process)
+# ===============================================================
+_agent = None
+_verify_threads = 1
+
+
+def _init_worker(model_path: str, verify: bool, torch_threads: int, verify_threads: int) -> None:
+    global _agent, _verify_threads
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is handled by the parent
+    os.environ["OMP_NUM_THREADS"] = str(torch_threads)
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    from src.agents.news_prediction_agent import NewsPredictionAgent
+    _agent = NewsPredictionAgent(model_path=model_path, web_verification=verify)
+    _verify_threads = verify_threads
+
+
+def _verify_row(row: Dict[str, object], prediction: Dict[str, object]) -> Dict[str, object]:
+    from utils.data_validation import NewsItem
+    item = NewsItem(title=row["title"], text=row["text"], subject=row["subject"], date=row["date"])
+    try:
+        verification = _agent.verify_news_with_websearch(item)
+    except Exception as e:
+        return {"verdict": None, "source": None, "final_verdict": prediction["Prediction"],
+                "error": f"verification failed: {type(e).__name__}: {e}"[:300]}
+    final = _agent.decide_final_result(prediction, verification)
+    return {"verdict": verification.verdict, "source": final.get("Source"),
+            "final_verdict": final["Final Verdict"]}
+
+
+def score_batch(start: int, df: pd.DataFrame) -> List[Dict[str, object]]:
+    """Scores one batch in a worker; rows keep the input order."""
+    news = df[[c for c in (*NEWS_COLUMNS, "label") if c in df]]
+    predictions = _agent.predict_batch(news)
+    rows = []
+    for offset, (record, pred) in enumerate(zip(df.to_dict("records"), predictions)):
+        rows.append({
+            "row": start + offset,
+            "id": record.get("id"),
+            "title": record["title"],
+            "prediction": pred["Prediction"],
+            "confidence": float(pred["Confidence"].rstrip("%")),
+            "ground_truth": pred["Ground Truth"],
+        })
+    if _agent.chat is not None:
+        records = df.to_dict("records")
+        with ThreadPoolExecutor(max_workers=_verify_threads) as pool:
+            verified = pool.map(_verify_row, records, predictions)
+            for row, extra in zip(rows, verified):
+                row.update(extra)
+    return rows
+
+
+# ===============================================================
+# 3️⃣ Output & checkpoint
+# ===============================================================
+def checkpoint_path(output: str) -> str:
+    return output + ".ckpt.json"
+
+
+def load_checkpoint(input_path: str, output: str, options: dict) -> Dict[str, object]:
+    path = checkpoint_path(output)
+    if not os.path.exists(path):
+        if os.path.exists(output) and os.path.getsize(output) > 0:
+            raise SystemExit(f"❌ {output} exists but has no checkpoint; use --restart to overwrite it.")
+        return {}
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("input") != os.path.abspath(input_path):
+        raise SystemExit(f"❌ {path} belongs to {checkpoint.get('input')}; use --restart or another output.")
+    saved = checkpoint.get("options", {})
+    changed = {k: (saved[k], options.get(k)) for k in saved if saved[k] != options.get(k)}
+    if changed:
+        diff = ", ".join(f"{k}: {old!r} -> {new!r}" for k, (old, new) in changed.items())
+        raise SystemExit(f"❌ Options differ from {path} ({diff}); "
+                         f"re-run with the original options or use --restart.")
+    return checkpoint
+
+
+def save_checkpoint(input_path: str, output: str, rows_done: int, output_bytes: int, options: dict) -> None:
+    path = checkpoint_path(output)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"input": os.path.abspath(input_path), "rows_done": rows_done,
+                   "output_bytes": output_bytes, "options": options, "updated": time.time()}, f)
+    os.replace(tmp, path)  # atomic: a crash leaves the previous checkpoint
+
+
+class ResultWriter:
+    def __init__(self, output: str, resume_bytes: Optional[int]):
+        self.jsonl = output.endswith((".jsonl", ".json"))
+        fresh = not resume_bytes
+        self.file = open(output, "w" if fresh else "r+", encoding="utf-8", newline="")
+        if not fresh:
+            self.file.truncate(resume_bytes)  # drop rows written after the last checkpoint
+            self.file.seek(resume_bytes)
+        self.csv = None if self.jsonl else csv.DictWriter(self.file, fieldnames=OUTPUT_FIELDS,
+                                                         extrasaction="ignore")
+        if self.csv and fresh:
+            self.csv.writeheader()
+
+    def write(self, rows: List[Dict[str, object]]) -> int:
+        """Writes rows durably; returns the output size."""
+        for row in rows:
+            if self.jsonl:
+                self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            else:
+                self.csv.writerow(row)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# ===============================================================
+# 4️⃣ Driver
+# ===============================================================
+def _eta(seconds: float) -> str:
+    if seconds != seconds or seconds == float("inf"):
+        return "?"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
+
+
+def run(args) -> Dict[str, object]:
+    options = {"verify": args.verify, "text_column": args.text_column, "title_column": args.title_column,
+               "model_path": os.path.abspath(args.model_path)}
+    checkpoint = {} if args.restart else load_checkpoint(args.input, args.output, options)
+    rows_done = int(checkpoint.get("rows_done", 0))
+    if checkpoint:
+        print(f"↩️ Resuming after {rows_done} scored row(s) (checkpoint {checkpoint_path(args.output)})")
+    writer = ResultWriter(args.output, checkpoint.get("output_bytes"))
+    if not checkpoint:
+        save_checkpoint(args.input, args.output, 0, writer.file.tell(), options)
+
+    started = time.perf_counter()
+    scored, submitted, last_report = 0, 0, started
+    first_fraction = None  # file share already covered when this run started
+    pending: deque = deque()  # (AsyncResult, rows in batch, file fraction), in input order
+    max_pending = args.workers * 2
+
+    def drain(block_until: int) -> None:
+        nonlocal rows_done, scored, last_report
+        while len(pending) > block_until:
+            result, size, fraction = pending.popleft()
+            rows = result.get()
+            output_bytes = writer.write(rows)
+            rows_done += size
+            scored += size
+            save_checkpoint(args.input, args.output, rows_done, output_bytes, options)
+            now = time.perf_counter()
+            if now - last_report >= args.progress_every or not pending:
+                rate = scored / max(now - started, 1e-9)
+                covered = fraction - first_fraction
+                eta = (now - started) * (1 - fraction) / covered if covered > 0 else float("nan")
+                print(f"⏱️ {rows_done} rows | {rate:.1f} rows/s | {fraction:.1%} of file | ETA {_eta(eta)}",
+                      flush=True)
+                last_report = now
+
+    context = get_context("spawn")  # workers load torch/encoder themselves (no fork after threads)
+    os.environ.setdefault("LLM_PROCESSES", str(args.workers))  # per-worker share of LLM_BUDGETS
+    pool = context.Pool(args.workers, initializer=_init_worker,
+                        initargs=(args.model_path, args.verify, args.torch_threads, args.verify_threads))
+    try:
+        for start, chunk, fraction in iter_chunks(args.input, args.batch_size, rows_done):
+            if first_fraction is None:
+                first_fraction = 0.0 if rows_done == 0 else fraction
+            df = _normalize(chunk, args.text_column, args.title_column)
+            pending.append((pool.apply_async(score_batch, (start, df)), len(df), fraction))
+            submitted += len(df)
+            drain(max_pending)
+            if args.limit and submitted >= args.limit:
+                break
+        drain(0)
+    except KeyboardInterrupt:
+        # Everything up to the checkpoint is already fsynced: drop in-flight batches
+        pool.terminate()
+        writer.close()
+        print(f"\n⏸️ Interrupted: {rows_done} rows saved; re-run the same command to resume.")
+        raise SystemExit(130)
+    except BaseException:
+        pool.terminate()
+        writer.close()
+        raise
+    pool.close()
+    pool.join()
+    writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {scored} row(s) scored in {elapsed:.1f}s ({scored / max(elapsed, 1e-9):.1f} rows/s); "
+          f"{rows_done} total in {args.output}")
+    return {"rows_done": rows_done, "scored": scored, "seconds": elapsed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable bulk scoring with NewsPredictionAgent.")
+    parser.add_argument("input", help="CSV or JSONL file of articles.")
+    parser.add_argument("output", help="Results file (.jsonl or .csv); checkpoint is <output>.ckpt.json.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--title-column", default="title")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("BULK_BATCH_SIZE", "256")),
+                        help="Rows per worker batch (one embedding pass each).")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BULK_WORKERS", str(os.cpu_count() or 1))))
+    parser.add_argument("--torch-threads", type=int, default=1, help="Intra-op threads per worker.")
+    parser.add_argument("--verify", action="store_true", help="Also run web verification (OpenAI).")
+    parser.add_argument("--verify-threads", type=int, default=4,
+                        help="Concurrent verification calls per worker (gateway-limited).")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after about this many rows (0 = all).")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="Seconds between progress lines.")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore an existing checkpoint and overwrite the output.")
+    run(parser.parse_args())
@@ -0,0 +1,328 @@
+# utils/llm_gateway.py
+"""
+Shared LLM Gateway
+------------------
+
+Every ChatOpenAI call in the app goes through `llm_gateway.invoke(...)`:
+
+    from utils.llm_gateway import llm_gateway, PRIORITY_HIGH
+    response = llm_gateway.invoke(chat, messages, route="predict_news",
+                                  priority=PRIORITY_HIGH, tools=[...])
+
+It provides:
+    - an adaptive concurrency limit (AIMD): grows by ~1 per window of
+      healthy calls, halves on a 429, and shrinks by 10% when latency
+      rises well above the best recent latency of the same route
+      (queueing at the provider). Latency is compared per output token
+      when the response reports usage, and the limit is cut at most once
+      per LLM_DECREASE_WINDOW, so a burst of concurrent 429s halves it once.
+    - priority admission: when the limit is reached, waiting calls are
+      admitted highest priority first (/predict_news verification before
+      /generate_news), FIFO within a priority
+    - per-route budgets: requests and tokens per minute; a call waits for
+      budget up to LLM_BUDGET_WAIT seconds, then raises BudgetExceeded
+    - retries with exponential backoff + jitter (Retry-After honoured),
+      outside the concurrency slot, of 429s and of the transient errors the
+      OpenAI SDK would otherwise retry itself: connection errors, timeouts,
+      408/409 and 5xx. The ChatOpenAI clients are built with max_retries=0
+      so the gateway sees every such error; only 429s cut the limit.
+    - per-call token accounting (prompt/completion tokens, latency) per
+      route, exported on /metrics and via `llm_gateway.usage()`
+
+Configuration (environment variables):
+    LLM_INITIAL_CONCURRENCY -> starting limit (default 4)
+    LLM_MIN_CONCURRENCY     -> floor (default 1)
+    LLM_MAX_CONCURRENCY     -> ceiling (default 32)
+    LLM_LATENCY_TOLERANCE   -> latency / best latency ratio that counts as
+                               congestion (default 2.0)
+    LLM_DECREASE_WINDOW     -> min seconds between two cuts of the limit (default 2)
+    LLM_MAX_RETRIES         -> retries on 429 / transient errors (default 3)
+    LLM_BUDGET_WAIT         -> max seconds to wait for budget (default 30)
+    LLM_BUDGETS             -> "route=rpm:N,tpm:N;route=..." e.g.
+                               "predict_news=rpm:600,tpm:400000;generate_news=rpm:60,tpm:40000"
+    LLM_PROCESSES           -> processes sharing the account (default 1). The
+                               gateway lives in each process: budgets are
+                               divided by this number, and LLM_MAX_CONCURRENCY
+                               is per process. serve_prefork.py and
+                               utils/bulk_score.py set it to their worker count.
+"""
+
+import heapq
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from utils.metrics import Counter, Histogram, register_gauge, register_metric
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+LLM_TOKENS = register_metric(Counter("llm_tokens_total", "LLM tokens by route and kind (prompt/completion)."))
+LLM_CALLS = register_metric(Counter("llm_calls_total", "LLM calls by route and outcome."))
+LLM_SECONDS = register_metric(Histogram("llm_call_duration_seconds", "LLM call latency by route (excluding queueing)."))
+LLM_WAIT_SECONDS = register_metric(Histogram("llm_queue_wait_seconds", "Time waiting for a concurrency slot or budget."))
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a route's request/token budget stays exhausted past LLM_BUDGET_WAIT."""
+
+
+def _status(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return _status(error) == 429 or "RateLimit" in type(error).__name__
+
+
+def is_transient(error: Exception) -> bool:
+    """Errors worth retrying besides 429s (what the OpenAI SDK retries by default)."""
+    # APITimeoutError subclasses APIConnectionError; matched by name so openai stays optional
+    if any(cls.__name__ == "APIConnectionError" for cls in type(error).__mro__):
+        return True
+    status = _status(error)
+    return isinstance(status, int) and (status in (408, 409) or status >= 500)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(messages: Any) -> int:
+    """Rough prompt size before the call (actual usage is recorded after)."""
+    if isinstance(messages, (list, tuple)):
+        text = " ".join(str(getattr(m, "content", m)) for m in messages)
+    else:
+        text = str(messages)
+    return len(_TOKEN.findall(text))
+
+
+def token_usage(response: Any) -> Tuple[int, int]:
+    """(prompt, completion) tokens reported by a LangChain chat response."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage:
+        return int(usage.get("input_tokens", 0)), int(usage.get("output_tokens", 0))
+    meta = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return int(meta.get("prompt_tokens", 0)), int(meta.get("completion_tokens", 0))
+
+
+# ===============================================================
+# 1️⃣ Per-route budgets (sliding 60 s window)
+# ===============================================================
+class RouteBudget:
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        self.rpm, self.tpm = rpm, tpm
+        self._events: deque = deque()  # (timestamp, tokens)
+        self._tokens = 0
+
+    def _trim(self, now: float) -> None:
+        while self._events and now - self._events[0][0] >= 60.0:
+            self._tokens -= self._events.popleft()[1]
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """Seconds until a call of `tokens` fits in the budget (0 = now)."""
+        self._trim(now)
+        over_requests = self.rpm is not None and len(self._events) >= self.rpm
+        over_tokens = self.tpm is not None and self._events and self._tokens + tokens > self.tpm
+        if not (over_requests or over_tokens):
+            return 0.0
+        return max(0.01, 60.0 - (now - self._events[0][0]))
+
+    def add(self, tokens: int, now: float) -> None:
+        self._events.append((now, tokens))
+        self._tokens += tokens
+
+    def adjust_last(self, delta: int) -> None:
+        """Corrects the estimated tokens of the latest call with actual usage."""
+        if self._events:
+            ts, tokens = self._events[-1]
+            self._events[-1] = (ts, tokens + delta)
+            self._tokens += delta
+
+
+def parse_budgets(spec: str, processes: int = 1) -> Dict[str, RouteBudget]:
+    """Per-process budgets: each configured limit is split across `processes`."""
+    share = lambda value: max(1, int(value) // max(processes, 1))
+    budgets = {}
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        route, _, limits = part.partition("=")
+        values = dict(item.split(":", 1) for item in limits.split(",") if ":" in item)
+        budgets[route.strip()] = RouteBudget(
+            rpm=share(values["rpm"]) if "rpm" in values else None,
+            tpm=share(values["tpm"]) if "tpm" in values else None,
+        )
+    return budgets
+
+
+# ===============================================================
+# 2️⃣ Gateway
+# ===============================================================
+class LLMGateway:
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 latency_tolerance: float = 2.0, max_retries: int = 3, budget_wait: float = 30.0,
+                 budgets: Optional[Dict[str, RouteBudget]] = None, decrease_window: float = 2.0):
+        self.limit = float(initial)
+        self.minimum, self.maximum = minimum, maximum
+        self.latency_tolerance = latency_tolerance
+        self.max_retries = max_retries
+        self.budget_wait = budget_wait
+        self.budgets = budgets or {}
+        self.in_flight = 0
+        self.decrease_window = decrease_window
+        self._best_latency: Dict[str, float] = {}  # per route: s per output token (or per call)
+        self._last_decrease = float("-inf")
+        self._waiters: list = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._usage: Dict[str, Dict[str, float]] = {}
+
+    # --- admission ----------------------------------------------------
+    def _wait_for_budget(self, route: str, tokens: int, deadline: float) -> None:
+        budget = self.budgets.get(route)
+        while budget:
+            wait = budget.wait_time(tokens, time.monotonic())
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise BudgetExceeded(f"LLM budget exhausted for route '{route}'")
+            self._cond.wait(timeout=wait)
+
+    def _acquire(self, route: str, priority: int, tokens: int) -> None:
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.budget_wait
+        with self._cond:
+            while True:
+                # Calls out of budget wait outside the priority queue, so they
+                # never hold up other routes
+                self._wait_for_budget(route, tokens, deadline)
+                ticket = (priority, next(self._seq))
+                heapq.heappush(self._waiters, ticket)
+                while self._waiters[0] != ticket or self.in_flight >= int(self.limit):
+                    self._cond.wait()
+                heapq.heappop(self._waiters)
+                budget = self.budgets.get(route)
+                if not budget or not budget.wait_time(tokens, time.monotonic()):
+                    break
+                self._cond.notify_all()  # spent meanwhile by the same route: back to budget wait
+            self.in_flight += 1
+            if budget:
+                budget.add(tokens, time.monotonic())
+            # The next waiter may fit as well
+            self._cond.notify_all()
+        LLM_WAIT_SECONDS.observe(time.perf_counter() - started, route=route)
+
+    def _decrease(self, factor: float) -> None:
+        """Multiplicative decrease, at most once per window (one congestion event)."""
+        now = time.monotonic()
+        if now - self._last_decrease >= self.decrease_window:
+            self.limit = max(self.minimum, self.limit * factor)
+            self._last_decrease = now
+
+    def _release(self, route: str, latency: Optional[float], rate_limited: bool,
+                 completion_tokens: int = 0) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self._decrease(0.5)
+            elif latency is not None:
+                # Routes differ (web search vs plain completion) and so do answer
+                # lengths: compare like with like
+                cost = latency / completion_tokens if completion_tokens else latency
+                best = self._best_latency.get(route)
+                # Slowly forget the best latency so the reference can follow real drift
+                self._best_latency[route] = cost if best is None else min(cost, best * 1.01)
+                if best is not None and cost > best * self.latency_tolerance:
+                    self._decrease(0.9)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+            self._cond.notify_all()
+
+    # --- accounting ---------------------------------------------------
+    def _record(self, route: str, outcome: str, prompt: int = 0, completion: int = 0,
+                latency: float = 0.0) -> None:
+        LLM_CALLS.inc(route=route, outcome=outcome)
+        if outcome == "ok":
+            LLM_TOKENS.inc(prompt, route=route, kind="prompt")
+            LLM_TOKENS.inc(completion, route=route, kind="completion")
+            LLM_SECONDS.observe(latency, route=route)
+        with self._cond:
+            stats = self._usage.setdefault(route, {
+                "calls": 0, "errors": 0, "rate_limited": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "latency_s": 0.0,
+            })
+            if outcome == "ok":
+                stats["calls"] += 1
+                stats["prompt_tokens"] += prompt
+                stats["completion_tokens"] += completion
+                stats["latency_s"] += latency
+            elif outcome == "rate_limited":
+                stats["rate_limited"] += 1
+            else:
+                stats["errors"] += 1
+
+    def usage(self) -> Dict[str, Dict[str, float]]:
+        with self._cond:
+            return {route: dict(stats) for route, stats in self._usage.items()}
+
+    def status(self) -> Dict[str, float]:
+        with self._cond:
+            return {"limit": self.limit, "in_flight": self.in_flight, "waiting": len(self._waiters),
+                    "best_latency_s": dict(self._best_latency)}
+
+    # --- call ---------------------------------------------------------
+    def invoke(self, chat: Any, messages: Any, route: str = "default",
+               priority: int = PRIORITY_NORMAL, **kwargs) -> Any:
+        """chat.invoke(messages, **kwargs) under concurrency, priority and budget control."""
+        estimate = estimate_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            self._acquire(route, priority, estimate)
+            started = time.perf_counter()
+            try:
+                response = chat.invoke(messages, **kwargs)
+            except Exception as e:
+                limited = is_rate_limited(e)
+                # Only 429s mean "too many calls"; a blip doesn't cut the limit
+                self._release(route, None, rate_limited=limited)
+                self._record(route, "rate_limited" if limited else "error")
+                if not (limited or is_transient(e)) or attempt == self.max_retries:
+                    raise
+                delay = _retry_after(e) or min(30.0, 0.5 * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.8, 1.2))
+                continue
+            latency = time.perf_counter() - started
+            prompt, completion = token_usage(response)
+            self._release(route, latency, rate_limited=False, completion_tokens=completion)
+            budget = self.budgets.get(route)
+            if budget and prompt + completion:
+                with self._cond:
+                    budget.adjust_last(prompt + completion - estimate)
+            self._record(route, "ok", prompt, completion, latency)
+            return response
+
+
+llm_gateway = LLMGateway(
+    initial=int(os.getenv("LLM_INITIAL_CONCURRENCY", "4")),
+    minimum=int(os.getenv("LLM_MIN_CONCURRENCY", "1")),
+    maximum=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+    latency_tolerance=float(os.getenv("LLM_LATENCY_TOLERANCE", "2.0")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+    budget_wait=float(os.getenv("LLM_BUDGET_WAIT", "30")),
+    budgets=parse_budgets(os.getenv("LLM_BUDGETS", ""), int(os.getenv("LLM_PROCESSES", "1"))),
+    decrease_window=float(os.getenv("LLM_DECREASE_WINDOW", "2")),
+)
+
+register_gauge("llm_concurrency_limit", "Adaptive LLM concurrency limit.", lambda: llm_gateway.status()["limit"])
+register_gauge("llm_in_flight", "LLM calls in flight.", lambda: llm_gateway.status()["in_flight"])
+register_gauge("llm_waiting", "LLM calls waiting for admission.", lambda: llm_gateway.status()["waiting"])
@@ -0,0 +1,75 @@
+# utils/load_testing.py
+"""
+Shared Helpers for the Load Tests and Stand-in Servers
+------------------------------------------------------
+
+Small, app-independent pieces used by both load generators
+(utils/Press_Simulator/load_test.py, utils/news_load_test.py) and the
+stand-in backends (utils/Press_Simulator/record_replay.py,
+utils/openai_standin.py):
+
+    free_port     -> an unused local TCP port for a spawned server
+    wait_ready    -> polls a URL until it answers 2xx
+    percentile    -> nearest-rank percentile of latency samples
+    parse_latency -> latency distribution spec -> sampler (ms)
+                     fixed:40 | uniform:20,80 | normal:800,150 | lognormal:800,0.35
+"""
+
+import math
+import random
+import socket
+import time
+from typing import Callable, List, Optional
+
+import requests
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 90.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server not ready: {url}")
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def parse_latency(spec: str) -> Optional[Callable[[random.Random], float]]:
+    """
+    Parses a latency spec into a sampler returning milliseconds.
+    Returns None for "recorded" (use the latency stored with the hit).
+    """
+    spec = spec.strip().lower()
+    if spec == "recorded":
+        return None
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    values = [float(v) for v in args.split(",")]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        # values = (median ms, sigma of the underlying normal)
+        mu = math.log(max(values[0], 1e-6))
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
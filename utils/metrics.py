@@ -0,0 +1,224 @@
+# utils/metrics.py
+"""
+Tracing & Metrics Layer
+-----------------------
+
+Dependency-free latency instrumentation shared by both Flask apps
+(`app.py` and `Press_Conf_Simulator.py`).
+
+- span(name) / traced(name): time a block or a function into the
+  `span_duration_seconds` histogram, count failures in `span_errors_total`.
+- init_app(app, service): per-route HTTP histograms and counters, an
+  `X-Request-ID` header (read or generated) and a Prometheus-text
+  `/metrics` endpoint.
+- register_gauge(name, help, fn): expose values computed on scrape
+  (cache hit rates, backend health, ...).
+- get_request_id() / request_headers(): the current request ID, for
+  propagation to backend calls. Use `contextvars.copy_context().run`
+  when handing work to a thread pool so the ID follows it.
+
+Usage:
+    from utils.metrics import span, traced, init_app
+
+    @traced("news.verify")
+    def verify(...): ...
+
+    with span("news.embed"):
+        X = preprocess_and_embed(df)
+"""
+
+import bisect
+import contextvars
+import functools
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Seconds; covers in-process nodes (ms) up to remote LLM calls (tens of s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_request_id: contextvars.ContextVar = contextvars.ContextVar("request_id", default="")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+# ===============================================================
+# 1️⃣ Metric types
+# ===============================================================
+class Histogram:
+    """Cumulative-bucket histogram keyed by label set."""
+
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.buckets = name, help_text, tuple(buckets)
+        self._series: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            # Layout: per-bucket counts, then +Inf count, then sum
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', le),))} {cumulative:g}")
+            lines.append(f"{self.name}_count{_labels(key)} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_labels(key)} {series[-1]:.6f}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by label set."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help = name, help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines += [f"{self.name}{_labels(k)} {v:g}" for k, v in self._values.items()]
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+# ===============================================================
+# 2️⃣ Registry
+# ===============================================================
+SPAN_SECONDS = Histogram("span_duration_seconds", "Latency of instrumented pipeline steps.")
+SPAN_ERRORS = Counter("span_errors_total", "Exceptions raised inside instrumented steps.")
+HTTP_SECONDS = Histogram("http_request_duration_seconds", "Latency of Flask routes.")
+HTTP_REQUESTS = Counter("http_requests_total", "Flask requests by route and status.")
+
+_METRICS = [SPAN_SECONDS, SPAN_ERRORS, HTTP_SECONDS, HTTP_REQUESTS]
+_GAUGES: Dict[str, Tuple[str, Callable]] = {}
+
+
+def register_metric(metric):
+    """Adds a Counter/Histogram defined in another module to /metrics."""
+    _METRICS.append(metric)
+    return metric
+
+
+def register_gauge(name: str, help_text: str, fn: Callable) -> None:
+    """
+    Registers a gauge evaluated at scrape time. `fn` returns a number or
+    a list of (labels_dict, number) samples.
+    """
+    _GAUGES[name] = (help_text, fn)
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines += metric.render()
+    for name, (help_text, fn) in list(_GAUGES.items()):
+        try:
+            value = fn()
+        except Exception:
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        samples = value if isinstance(value, list) else [({}, value)]
+        for labels, sample in samples:
+            lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {float(sample):g}")
+    return "\n".join(lines) + "\n"
+
+
+# ===============================================================
+# 3️⃣ Spans
+# ===============================================================
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Times a block into span_duration_seconds{span=name}."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        SPAN_ERRORS.inc(span=name)
+        raise
+    finally:
+        SPAN_SECONDS.observe(time.perf_counter() - started, span=name)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span()."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ===============================================================
+# 4️⃣ Request IDs & Flask integration
+# ===============================================================
+def get_request_id() -> str:
+    return _request_id.get()
+
+
+def request_headers() -> Dict[str, str]:
+    """Headers to forward on outgoing backend calls."""
+    rid = get_request_id()
+    return {REQUEST_ID_HEADER: rid} if rid else {}
+
+
+def init_app(app, service: str, metrics_path: str = "/metrics") -> None:
+    """Adds request IDs, per-route HTTP metrics and a /metrics route to a Flask app."""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_request():
+        g._metrics_started = time.perf_counter()
+        g._metrics_token = _request_id.set(request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex)
+
+    @app.after_request
+    def _finish_request(response):
+        started: Optional[float] = g.pop("_metrics_started", None)
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        if started is not None and route != metrics_path:
+            labels = {"service": service, "route": route, "method": request.method}
+            HTTP_SECONDS.observe(time.perf_counter() - started, **labels)
+            HTTP_REQUESTS.inc(status=str(response.status_code), **labels)
+        response.headers[REQUEST_ID_HEADER] = get_request_id()
+        return response
+
+    @app.teardown_request
+    def _reset_request_id(_exc):
+        token = g.pop("_metrics_token", None)
+        if token is not None:
+            _request_id.reset(token)
+
+    @app.route(metrics_path)
+    def metrics():
+        return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
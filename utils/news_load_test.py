@@ -0,0 +1,183 @@
+# utils/news_load_test.py
+"""
+Load Generator for the Fake-News App
+------------------------------------
+
+Measures how `app.py` scales with concurrency. Each virtual user loops:
+GET /generate_news, then POST /predict_news with the generated item
+(classification + web verification). Concurrency is stepped up
+(e.g. 1, 2, 4, 8, 16) and each step runs for a fixed duration; for
+every step and route the tool reports requests/s, error rate and
+p50/p95/p99 latency.
+
+By default the OpenAI stand-in (utils/openai_standin.py) and the app are
+spawned as subprocesses, with OPENAI_BASE_URL pointing the agents at the
+stand-in, so no API key or network is needed.
+
+Usage:
+    python -m utils.news_load_test --levels 1,2,4,8,16 --duration 20 \
+        --completion-latency lognormal:600,0.3 --web-search-latency lognormal:2000,0.4
+
+    # Against a running app (its OPENAI_BASE_URL is up to you)
+    python -m utils.news_load_test --target http://127.0.0.1:5000 --levels 4,8
+
+    python -m utils.news_load_test --json news_load.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import requests
+
+from utils.load_testing import free_port, percentile, wait_ready
+
+
+ROUTES = ("/generate_news", "/predict_news")
+
+FALLBACK_ITEM = {
+    "title": "City council approves new budget",
+    "text": "The city council approved a new budget on Monday. The plan funds schools and roads.",
+    "subject": "politicsNews",
+    "date": "2024-03-01",
+    "label": 1,
+}
+
+
+# ===============================================================
+# 1️⃣ Servers
+# ===============================================================
+def spawn_servers(args) -> Dict[str, Any]:
+    """Starts the OpenAI stand-in and app.py (threaded, no reloader)."""
+    standin_port, app_port = free_port(), free_port()
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    env = dict(os.environ, PRESS_LOG_LEVEL=os.getenv("PRESS_LOG_LEVEL", "WARN"))
+
+    standin = subprocess.Popen([
+        sys.executable, "-m", "utils.openai_standin", "--port", str(standin_port),
+        "--completion-latency", args.completion_latency,
+        "--web-search-latency", args.web_search_latency,
+        "--rate-limit-rate", str(args.rate_limit_rate), "--seed", "0",
+    ], env=env, stdout=log, stderr=log)
+
+    env.update(OPENAI_BASE_URL=f"http://127.0.0.1:{standin_port}/v1",
+               OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "sk-local-standin"))
+    app = subprocess.Popen([
+        sys.executable, "-m", "utils.news_load_test", "--serve-app", "--port", str(app_port),
+    ], env=env, stdout=log, stderr=log)
+
+    wait_ready(f"http://127.0.0.1:{standin_port}/v1/models")
+    wait_ready(f"http://127.0.0.1:{app_port}/metrics", timeout=300)  # model loading
+    return {"base": f"http://127.0.0.1:{app_port}", "processes": [app, standin]}
+
+
+def serve_app(port: int) -> None:
+    from app import app
+    app.run(host="127.0.0.1", port=port, threaded=True, debug=False)
+
+
+# ===============================================================
+# 2️⃣ Workload
+# ===============================================================
+def run_level(base: str, concurrency: int, duration: float, timeout: float) -> Dict[str, Any]:
+    """Runs `concurrency` users for `duration` seconds; returns per-route stats."""
+    samples: List[tuple] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def timed(route: str, call) -> Any:
+        started = time.perf_counter()
+        try:
+            res = call()
+            ok = res.status_code == 200
+        except requests.RequestException:
+            res, ok = None, False
+        with lock:
+            samples.append((route, (time.perf_counter() - started) * 1000, ok))
+        return res if ok else None
+
+    def user():
+        client = requests.Session()
+        while time.perf_counter() < deadline:
+            res = timed("/generate_news", lambda: client.get(f"{base}/generate_news", timeout=timeout))
+            item = res.json().get("news_item") if res is not None else FALLBACK_ITEM
+            timed("/predict_news", lambda: client.post(f"{base}/predict_news",
+                                                       json={"news_item": item}, timeout=timeout))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(user) for _ in range(concurrency)]:
+            future.result()
+    wall_s = time.perf_counter() - started
+
+    level: Dict[str, Any] = {"concurrency": concurrency, "wall_s": round(wall_s, 2), "routes": {}}
+    for route in ROUTES:
+        rows = [s for s in samples if s[0] == route]
+        latencies = [ms for _, ms, ok in rows if ok]
+        errors = sum(1 for _, _, ok in rows if not ok)
+        level["routes"][route] = {
+            "count": len(rows),
+            "rps": round(len(latencies) / max(wall_s, 1e-9), 2),
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+        }
+    return level
+
+
+def print_report(levels: List[Dict[str, Any]]) -> None:
+    print(f"{'conc':>4} | {'route':<14} | {'req/s':>7} | {'err %':>6} | "
+          f"{'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    for level in levels:
+        for route, r in level["routes"].items():
+            print(f"{level['concurrency']:>4} | {route:<14} | {r['rps']:>7.2f} | {r['error_rate'] * 100:>6.2f} | "
+                  f"{r['p50_ms']:>8.1f} | {r['p95_ms']:>8.1f} | {r['p99_ms']:>8.1f}")
+
+
+def run_load_test(args) -> List[Dict[str, Any]]:
+    servers = None if args.target else spawn_servers(args)
+    base = args.target or servers["base"]
+    levels = []
+    try:
+        for concurrency in [int(c) for c in args.levels.split(",") if c.strip()]:
+            print(f"🚦 {concurrency} concurrent user(s) for {args.duration:g}s → {base}")
+            levels.append(run_level(base, concurrency, args.duration, args.timeout))
+    finally:
+        if servers:
+            for process in servers["processes"]:
+                process.terminate()
+                process.wait(timeout=10)
+    print_report(levels)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(levels, f, indent=2)
+        print(f"📝 Report written to {args.json}")
+    return levels
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for app.py")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Comma-separated concurrency steps.")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per step.")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--target", default="", help="Existing app URL (skip spawning servers).")
+    parser.add_argument("--completion-latency", default="lognormal:600,0.3")
+    parser.add_argument("--web-search-latency", default="lognormal:2000,0.4")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--server-log", default="")
+    parser.add_argument("--json", default="")
+    parser.add_argument("--serve-app", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=5000, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_app:
+        serve_app(args.port)
+    else:
+        run_load_test(args)
@@ -0,0 +1,449 @@
+# utils/online_learning.py
+"""
+Online Model Updates from Verified Verdicts
+-------------------------------------------
+
+Turns confident web-verification verdicts into training examples instead
+of discarding them:
+
+    decide_final_result ──put──▶ VerdictQueue (SQLite, bounded, on disk)
+                                      │
+    background thread (one leader process) ─ take batch ─ embed ─ partial_fit
+                                      │        on a copy of the current model
+                                      ▼
+                             holdout guard: accuracy on a fixed held-out set
+                                      │ accepted            │ rejected
+                                      ▼                     ▼
+              publish snapshot (src/models/online/)     batch dropped
+                                      │
+    every serving process ◀── reload when current.json changes ── agent.model swap
+
+The classifier is an SGDClassifier (log loss, so predict_proba keeps
+working) initialised from the coefficients of the saved logistic
+regression, over the same sentence embeddings. Training always happens
+on a copy; serving only sees a finished model through one attribute
+assignment, so requests never wait on training.
+
+Labels taken from verdicts:
+    verdict 1 with a source URL -> 1 (True News)
+    verdict 0                   -> 0 (Fake News) only with ONLINE_LEARN_NEGATIVES=1,
+                                   since "no source found" is weaker evidence
+
+So by default every queued example is "True News", and partial_fit on
+such a batch alone would only push the model towards that class. Each
+update therefore mixes in replay examples of both classes, drawn from a
+sample of the original training split embedded by `init` (replay.npz,
+ONLINE_REPLAY_RATIO replay examples per queued one, half of each
+class). Without a replay set (snapshot made by an older init), batches
+holding a single class are acknowledged and skipped rather than trained.
+
+Setup (once): builds the holdout and replay embeddings and the initial snapshot
+    python -m utils.online_learning init --limit 2000 --replay 2000
+Serving (also with serve_prefork.py; the learner starts on each process's first request):
+    ONLINE_LEARNING=1 python app.py
+Inspect:
+    python -m utils.online_learning status
+
+Configuration (environment variables):
+    ONLINE_DIR               -> snapshots, holdout, queue (default src/models/online)
+    ONLINE_QUEUE_MAX         -> queue bound, oldest dropped first (default 10000)
+    ONLINE_MIN_BATCH         -> examples that trigger an update (default 32)
+    ONLINE_MAX_BATCH         -> examples per update (default 512)
+    ONLINE_PUBLISH_INTERVAL  -> seconds after which a smaller batch is used (default 300)
+    ONLINE_POLL_SECONDS      -> background loop period (default 5)
+    ONLINE_MAX_ACCURACY_DROP -> tolerated holdout accuracy loss (default 0.0)
+    ONLINE_REPLAY_RATIO      -> replay examples per queued example (default 1.0)
+    ONLINE_ETA0 / ONLINE_ALPHA -> SGD step size / L2 penalty (default 0.001 / 1e-5)
+    ONLINE_KEEP_SNAPSHOTS    -> snapshots kept on disk (default 5)
+"""
+
+import argparse
+import copy
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import joblib
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score
+
+from utils.metrics import Counter, register_gauge, register_metric
+
+ONLINE_DIR = os.getenv("ONLINE_DIR", "src/models/online")
+ONLINE_QUEUE_MAX = int(os.getenv("ONLINE_QUEUE_MAX", "10000"))
+ONLINE_MIN_BATCH = int(os.getenv("ONLINE_MIN_BATCH", "32"))
+ONLINE_MAX_BATCH = int(os.getenv("ONLINE_MAX_BATCH", "512"))
+ONLINE_PUBLISH_INTERVAL = float(os.getenv("ONLINE_PUBLISH_INTERVAL", "300"))
+ONLINE_POLL_SECONDS = float(os.getenv("ONLINE_POLL_SECONDS", "5"))
+ONLINE_MAX_ACCURACY_DROP = float(os.getenv("ONLINE_MAX_ACCURACY_DROP", "0.0"))
+ONLINE_ETA0 = float(os.getenv("ONLINE_ETA0", "0.001"))
+ONLINE_ALPHA = float(os.getenv("ONLINE_ALPHA", "1e-5"))
+ONLINE_KEEP_SNAPSHOTS = int(os.getenv("ONLINE_KEEP_SNAPSHOTS", "5"))
+ONLINE_LEARN_NEGATIVES = os.getenv("ONLINE_LEARN_NEGATIVES", "0") == "1"
+ONLINE_REPLAY_RATIO = float(os.getenv("ONLINE_REPLAY_RATIO", "1.0"))
+
+ONLINE_UPDATES = register_metric(Counter("online_updates_total", "Online model updates by outcome."))
+ONLINE_EXAMPLES = register_metric(Counter("online_examples_total", "Verified verdicts by outcome."))
+
+
+def verdict_label(verification: Any) -> Optional[int]:
+    """Training label for a verification result, or None when not confident enough."""
+    url = (getattr(verification, "url", "") or "").strip()
+    if verification.verdict == 1 and url and url.lower() != "not found":
+        return 1
+    if verification.verdict == 0 and ONLINE_LEARN_NEGATIVES:
+        return 0
+    return None
+
+
+# ===============================================================
+# 1️⃣ Bounded on-disk queue
+# ===============================================================
+class VerdictQueue:
+    """
+    SQLite-backed FIFO of labelled articles, shared by all serving
+    processes. When full, the oldest entries are dropped.
+    """
+
+    def __init__(self, path: str, max_items: int = ONLINE_QUEUE_MAX):
+        self.path, self.max_items = path, max_items
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "ts REAL, label INTEGER, title TEXT, text TEXT, subject TEXT, date TEXT)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=5.0)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def put(self, news_item: Any, label: int) -> None:
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO verdicts (ts, label, title, text, subject, date) VALUES (?, ?, ?, ?, ?, ?)",
+                (time.time(), int(label), news_item.title, news_item.text, news_item.subject, news_item.date),
+            )
+            dropped = db.execute("DELETE FROM verdicts WHERE id <= ?",
+                                 (cursor.lastrowid - self.max_items,)).rowcount
+        if dropped:
+            ONLINE_EXAMPLES.inc(dropped, outcome="dropped")
+
+    def take(self, limit: int) -> List[Tuple]:
+        """Oldest entries (id, ts, label, title, text, subject, date), not removed yet."""
+        with self._connect() as db:
+            return db.execute("SELECT id, ts, label, title, text, subject, date FROM verdicts "
+                              "ORDER BY id LIMIT ?", (limit,)).fetchall()
+
+    def ack(self, last_id: int) -> None:
+        with self._connect() as db:
+            db.execute("DELETE FROM verdicts WHERE id <= ?", (last_id,))
+
+    def stats(self) -> Dict[str, float]:
+        with self._connect() as db:
+            depth, oldest = db.execute("SELECT COUNT(*), MIN(ts) FROM verdicts").fetchone()
+        return {"depth": depth, "oldest_age_s": time.time() - oldest if oldest else 0.0}
+
+
+# ===============================================================
+# 2️⃣ Snapshots & holdout
+# ===============================================================
+def _paths(directory: str) -> Dict[str, str]:
+    return {
+        "current": os.path.join(directory, "current.json"),
+        "holdout": os.path.join(directory, "holdout.npz"),
+        "replay": os.path.join(directory, "replay.npz"),
+        "queue": os.path.join(directory, "verdicts.sqlite"),
+        "lock": os.path.join(directory, "leader.lock"),
+    }
+
+
+def read_current(directory: str = ONLINE_DIR) -> Dict[str, Any]:
+    try:
+        with open(_paths(directory)["current"], encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def publish_snapshot(model: SGDClassifier, info: Dict[str, Any], directory: str = ONLINE_DIR) -> Dict[str, Any]:
+    """Writes the model and then points current.json at it (both via atomic renames)."""
+    version = int(read_current(directory).get("version", 0)) + 1
+    name = f"sgd-{version:06d}.pkl"
+    tmp = os.path.join(directory, name + ".tmp")
+    joblib.dump(model, tmp)
+    os.replace(tmp, os.path.join(directory, name))
+    current = dict(info, version=version, model=name, published=time.time())
+    tmp = _paths(directory)["current"] + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    os.replace(tmp, _paths(directory)["current"])
+    snapshots = sorted(n for n in os.listdir(directory) if n.startswith("sgd-") and n.endswith(".pkl"))
+    for old in snapshots[:-ONLINE_KEEP_SNAPSHOTS]:
+        os.remove(os.path.join(directory, old))
+    return current
+
+
+def from_linear_model(base: Any, X_sample: np.ndarray, y_sample: np.ndarray) -> SGDClassifier:
+    """SGDClassifier starting from a fitted linear classifier's coefficients."""
+    sgd = SGDClassifier(loss="log_loss", alpha=ONLINE_ALPHA, learning_rate="constant",
+                        eta0=ONLINE_ETA0, random_state=0)
+    sample = np.asarray(X_sample[:1], dtype=np.float64)
+    sgd.partial_fit(sample, y_sample[:1], classes=np.asarray(base.classes_))  # allocates state
+    sgd.coef_ = np.array(base.coef_, dtype=np.float64, copy=True)
+    sgd.intercept_ = np.array(base.intercept_, dtype=np.float64, copy=True)
+    return sgd
+
+
+def init_online_model(base_model_path: str = "src/models/logisticRegressor.pkl", limit: int = 2000,
+                      replay: int = 2000, directory: str = ONLINE_DIR) -> Dict[str, Any]:
+    """Embeds the fixed holdout and the replay sample, and publishes the first SGD snapshot."""
+    from src.embeddings.embed_model import encode_texts
+    from src.embeddings.quantize_encoder import held_out_split
+
+    os.makedirs(directory, exist_ok=True)
+    texts, labels = held_out_split(limit)
+    X_hold = encode_texts(texts)
+    np.savez_compressed(_paths(directory)["holdout"], X=X_hold, y=labels)
+    replay_texts, replay_labels = held_out_split(replay, split="train")
+    np.savez_compressed(_paths(directory)["replay"], X=encode_texts(replay_texts), y=replay_labels)
+    base = joblib.load(base_model_path)
+    model = from_linear_model(base, X_hold, labels)
+    accuracy = accuracy_score(labels, model.predict(X_hold))
+    current = publish_snapshot(model, {"holdout_accuracy": accuracy, "baseline_accuracy": accuracy,
+                                       "examples": 0, "base": base_model_path}, directory)
+    print(f"✅ Holdout: {len(labels)} articles, replay: {len(replay_labels)}; initial snapshot v{current['version']} "
+          f"(holdout accuracy {accuracy:.4f}, base {base_model_path})")
+    return current
+
+
+# ===============================================================
+# 3️⃣ Background learner
+# ===============================================================
+class OnlineLearner:
+    def __init__(self, directory: str = ONLINE_DIR):
+        self.directory = directory
+        self.paths = _paths(directory)
+        self.queue: Optional[VerdictQueue] = None
+        self.agent = None
+        self.model: Optional[SGDClassifier] = None
+        self.current: Dict[str, Any] = {}
+        self.holdout: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.replay: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._rng = np.random.default_rng()
+        self.is_leader = False
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_in: Optional[int] = None  # pid
+        self._start_lock = threading.Lock()
+
+    def attach(self, agent) -> bool:
+        """Serves the latest snapshot through `agent` and routes its verdicts to the queue."""
+        if not (os.path.exists(self.paths["current"]) and os.path.exists(self.paths["holdout"])):
+            print(f"⚠️ Online learning disabled: no snapshot/holdout in {self.directory} "
+                  f"(run `python -m utils.online_learning init`)")
+            return False
+        self.agent = agent
+        self.queue = VerdictQueue(self.paths["queue"])
+        with np.load(self.paths["holdout"]) as data:
+            self.holdout = (data["X"], data["y"])
+        if os.path.exists(self.paths["replay"]):
+            with np.load(self.paths["replay"]) as data:
+                self.replay = (data["X"].astype(np.float64), data["y"])
+        self._reload()
+        agent.model = self.model
+        agent.verdict_sink = self.submit
+        return True
+
+    def start(self, agent) -> bool:
+        """attach() plus the background update loop."""
+        if not self.attach(agent):
+            return False
+        self._thread = threading.Thread(target=self._run, name="online-learner", daemon=True)
+        self._thread.start()
+        print(f"🧠 Online learning on: snapshot v{self.current.get('version')} in pid {os.getpid()}")
+        return True
+
+    def ensure_started(self, agent) -> None:
+        """
+        start() once per process. Called from the first request rather than
+        at import, so a pre-fork parent (serve_prefork.py) never trains or
+        holds the leader lock; each forked worker starts its own loop.
+        """
+        if self._started_in == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_in == os.getpid():
+                return
+            if self._lock_file is not None:  # inherited across fork: not ours
+                self._lock_file.close()
+                self._lock_file, self.is_leader = None, False
+            self._stop = threading.Event()
+            self._started_in = os.getpid()
+            self.start(agent)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    def submit(self, news_item: Any, verification: Any) -> None:
+        """Called from decide_final_result; never raises into the request."""
+        label = verdict_label(verification)
+        if label is None:
+            ONLINE_EXAMPLES.inc(outcome="not_confident")
+            return
+        try:
+            self.queue.put(news_item, label)
+            ONLINE_EXAMPLES.inc(outcome="queued")
+        except sqlite3.Error as e:
+            ONLINE_EXAMPLES.inc(outcome="queue_error")
+            print(f"⚠️ Could not queue verified verdict: {e}")
+
+    def _try_lead(self) -> bool:
+        """Only one process trains; the others just reload published snapshots."""
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        self._lock_file = open(self.paths["lock"], "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+        print(f"🎓 pid {os.getpid()} trains online updates")
+        return True
+
+    def _reload(self) -> None:
+        current = read_current(self.directory)
+        if not current or current.get("version") == self.current.get("version"):
+            return
+        self.model = joblib.load(os.path.join(self.directory, current["model"]))
+        self.current = current
+        self.agent.model = self.model  # single reference swap: in-flight requests keep the old model
+
+    def _run(self) -> None:
+        while not self._stop.wait(ONLINE_POLL_SECONDS):
+            try:
+                self._reload()
+                # Followers retry, so another process takes over if the leader exits
+                self.is_leader = self.is_leader or self._try_lead()
+                if self.is_leader:
+                    self.update_once()
+            except Exception as e:  # keep serving whatever happens here
+                print(f"❌ Online learner error: {type(e).__name__}: {e}")
+
+    def _with_replay(self, X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Appends replay examples, half of each class, so a batch never holds one label only."""
+        if self.replay is None or ONLINE_REPLAY_RATIO <= 0:
+            return X, y
+        X_replay, y_replay = self.replay
+        per_class = max(1, int(round(len(y) * ONLINE_REPLAY_RATIO / 2)))
+        picks = []
+        for label in np.unique(y_replay):
+            idx = np.flatnonzero(y_replay == label)
+            picks.append(self._rng.choice(idx, size=min(per_class, len(idx)), replace=False))
+        picks = np.concatenate(picks)
+        return np.vstack([X, X_replay[picks]]), np.concatenate([y, y_replay[picks]])
+
+    def update_once(self, force: bool = False) -> Optional[str]:
+        """Trains on one queued batch if due; returns 'accepted', 'rejected', 'skipped' or None."""
+        stats = self.queue.stats()
+        due = stats["depth"] >= ONLINE_MIN_BATCH or (
+            stats["depth"] and stats["oldest_age_s"] >= ONLINE_PUBLISH_INTERVAL)
+        if not (due or (force and stats["depth"])):
+            return None
+        rows = self.queue.take(ONLINE_MAX_BATCH)
+        import pandas as pd
+        from src.embeddings.embed_model import preprocess_and_embed
+
+        df = pd.DataFrame([r[3:] for r in rows], columns=["title", "text", "subject", "date"])
+        X = preprocess_and_embed(df, text_column="text").astype(np.float64)  # dtype of the coefficients
+        y = np.array([r[2] for r in rows])
+        X, y = self._with_replay(X, y)
+        if len(np.unique(y)) < 2:
+            self.queue.ack(rows[-1][0])
+            ONLINE_UPDATES.inc(outcome="skipped")
+            print(f"⏭️ Online update skipped: {len(rows)} example(s) of a single class and no replay set "
+                  f"(re-run `python -m utils.online_learning init`)")
+            return "skipped"
+
+        candidate = copy.deepcopy(self.model)
+        candidate.partial_fit(X, y)
+        X_hold, y_hold = self.holdout
+        before = float(self.current.get("holdout_accuracy", accuracy_score(y_hold, self.model.predict(X_hold))))
+        after = float(accuracy_score(y_hold, candidate.predict(X_hold)))
+        self.queue.ack(rows[-1][0])
+
+        # Compared with the served model and never below the initial snapshot, so
+        # a series of small tolerated drops cannot add up
+        floor = max(before, float(self.current.get("baseline_accuracy", before))) - ONLINE_MAX_ACCURACY_DROP
+        if after < floor:
+            ONLINE_UPDATES.inc(outcome="rejected")
+            print(f"🛑 Online update rejected: holdout accuracy {before:.4f} → {after:.4f} "
+                  f"({len(rows)} example(s) dropped)")
+            return "rejected"
+
+        published = publish_snapshot(candidate, {
+            "holdout_accuracy": after,
+            "baseline_accuracy": self.current.get("baseline_accuracy", before),
+            "examples": int(self.current.get("examples", 0)) + len(rows),
+            "base": self.current.get("base"),
+        }, self.directory)
+        ONLINE_UPDATES.inc(outcome="accepted")
+        print(f"📦 Online snapshot v{published['version']} published: {len(rows)} example(s), "
+              f"holdout accuracy {before:.4f} → {after:.4f}")
+        self._reload()
+        return "accepted"
+
+
+online_learner = OnlineLearner()
+
+
+def _queue_depth():
+    return online_learner.queue.stats()["depth"] if online_learner.queue else 0
+
+
+register_gauge("online_queue_depth", "Verified verdicts waiting for training.", _queue_depth)
+register_gauge("online_model_version", "Online snapshot served.", lambda: online_learner.current.get("version", 0))
+register_gauge("online_holdout_accuracy", "Holdout accuracy of the served snapshot.",
+               lambda: online_learner.current.get("holdout_accuracy", 0.0))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Online learning from verified verdicts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    init = sub.add_parser("init", help="Embed the holdout and publish the initial snapshot.")
+    init.add_argument("--model-path", default="src/models/logisticRegressor.pkl")
+    init.add_argument("--limit", type=int, default=2000, help="Held-out articles (0 = whole test split).")
+    init.add_argument("--replay", type=int, default=2000, help="Replay articles from the training split.")
+    sub.add_parser("status", help="Show the served snapshot and the queue.")
+    update = sub.add_parser("update", help="Run one update now on whatever is queued.")
+    update.add_argument("--force", action="store_true", help="Ignore ONLINE_MIN_BATCH / interval.")
+    args = parser.parse_args()
+
+    if args.command == "init":
+        init_online_model(args.model_path, args.limit, args.replay)
+    elif args.command == "status":
+        current = read_current()
+        queue = VerdictQueue(_paths(ONLINE_DIR)["queue"])
+        print(json.dumps({"current": current, "queue": queue.stats()}, indent=2))
+    else:
+        class _Holder:  # no serving agent in the CLI
+            model = None
+        if not online_learner.attach(_Holder()):
+            sys.exit(1)
+        if not online_learner._try_lead():
+            sys.exit("Another process is training (leader lock held).")
+        print(f"Result: {online_learner.update_once(force=args.force)}")
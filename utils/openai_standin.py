@@ -0,0 +1,256 @@
+# utils/openai_standin.py
+"""
+Local OpenAI-compatible Stand-in Server
+---------------------------------------
+
+Lets `app.py` (/generate_news, /predict_news) run without an API key, for
+throughput testing and offline development. It implements the two
+OpenAI routes the agents use through `ChatOpenAI`:
+
+    POST /v1/chat/completions  -> plain completion (news generation)
+    POST /v1/responses         -> Responses API, used by ChatOpenAI when a
+                                  built-in tool such as {"type": "web_search"}
+                                  is passed (web verification)
+
+Responses are canned (first `match` substring found in the prompt, from a
+JSON list of {"match": ..., "content": ...}) or randomly synthesized in
+the format each caller parses: "Title: ... / Body: ..." for generation and
+{"verdict": 0|1, "url": ...} for verification. Token usage is estimated
+and returned like the real API.
+
+Latency is sampled per route from a distribution
+(fixed:MS | uniform:LO,HI | normal:MEAN,STD | lognormal:MEDIAN,SIGMA), and
+a fraction of calls can be answered with 429 to exercise rate limiting.
+
+Usage:
+    python -m utils.openai_standin --port 8600 --web-search-latency lognormal:1500,0.4
+    export OPENAI_BASE_URL=http://127.0.0.1:8600/v1
+    export OPENAI_API_KEY=sk-local
+    python app.py
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, jsonify, request
+
+from utils.load_testing import parse_latency
+
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+_TOPICS = ["the Senate", "the central bank", "a coastal city", "the health ministry",
+           "a tech company", "the election commission", "the energy regulator", "a border town"]
+_EVENTS = ["approves new budget", "announces investigation", "reports record growth",
+           "faces protests", "delays key vote", "unveils reform plan", "denies allegations"]
+
+
+def count_tokens(text: str) -> int:
+    """Rough token estimate (words and punctuation)."""
+    return len(_TOKEN.findall(text or ""))
+
+
+def _text_of(content: Any) -> str:
+    """Flattens OpenAI message content (string or list of parts)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+        )
+    return ""
+
+
+# ===============================================================
+# 1️⃣ Response synthesis
+# ===============================================================
+class Responder:
+    """Canned-or-random content for the prompts used in this repo."""
+
+    def __init__(self, canned: Optional[List[Dict[str, str]]] = None, true_rate: float = 0.5,
+                 seed: Optional[int] = None):
+        self.canned = canned or []
+        self.true_rate = true_rate
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def reply(self, prompt: str, web_search: bool) -> str:
+        for entry in self.canned:
+            if entry.get("match", "") in prompt:
+                return entry["content"]
+        with self._lock:
+            if web_search or '"verdict"' in prompt:
+                credible = self.rng.random() < self.true_rate
+                url = f"https://news.example.com/{self.rng.randint(1000, 9999)}" if credible else "Not found"
+                return json.dumps({"verdict": int(credible), "url": url})
+            if "Title:" in prompt and "Body:" in prompt:
+                topic, event = self.rng.choice(_TOPICS), self.rng.choice(_EVENTS)
+                return (
+                    f"Title: {topic.capitalize()} {event}\n"
+                    f"Body: Officials said on {self.rng.choice(['Monday', 'Tuesday', 'Friday'])} that "
+                    f"{topic} {event}. The decision affects about {self.rng.randint(2, 900)} thousand people. "
+                    f"Critics called for more transparency."
+                )
+        return "OK"
+
+
+# ===============================================================
+# 2️⃣ Flask app factory
+# ===============================================================
+def create_app(responder: Optional[Responder] = None, completion_latency: str = "fixed:0",
+               web_search_latency: str = "fixed:0", rate_limit_rate: float = 0.0,
+               seed: Optional[int] = None) -> Flask:
+    """
+    Creates the stand-in.
+
+    Args:
+        completion_latency: Latency spec for /v1/chat/completions and tool-less /v1/responses.
+        web_search_latency: Latency spec for calls carrying a web_search tool.
+        rate_limit_rate: Fraction of calls answered with 429.
+    """
+    app = Flask(__name__)
+    responder = responder or Responder(seed=seed)
+    samplers = {"completion": parse_latency(completion_latency), "web_search": parse_latency(web_search_latency)}
+    rng = random.Random(seed)
+    stats = {"requests": 0, "rate_limited": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    lock = threading.Lock()
+
+    def delay_or_limit(kind: str):
+        with lock:
+            stats["requests"] += 1
+            limited = rng.random() < rate_limit_rate
+            delay_ms = samplers[kind](rng) if samplers[kind] else 0.0
+            if limited:
+                stats["rate_limited"] += 1
+        if limited:
+            return jsonify({"error": {"message": "Rate limit reached (stand-in)", "type": "requests",
+                                      "code": "rate_limit_exceeded"}}), 429, {"Retry-After": "1"}
+        time.sleep(delay_ms / 1000.0)
+        return None
+
+    def account(prompt: str, content: str):
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(content)
+        with lock:
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+        return prompt_tokens, completion_tokens
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def chat_completions():
+        data = request.get_json(force=True)
+        prompt = "\n".join(_text_of(m.get("content")) for m in data.get("messages", []))
+        web_search = any(t.get("type") == "web_search" for t in data.get("tools") or [])
+        limited = delay_or_limit("web_search" if web_search else "completion")
+        if limited:
+            return limited
+        content = responder.reply(prompt, web_search)
+        prompt_tokens, completion_tokens = account(prompt, content)
+        return jsonify({
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": data.get("model", "stand-in"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    @app.route("/v1/responses", methods=["POST"])
+    def responses():
+        data = request.get_json(force=True)
+        items = data.get("input", [])
+        if isinstance(items, str):
+            prompt = items
+        else:
+            prompt = "\n".join(_text_of(item.get("content")) for item in items if isinstance(item, dict))
+        prompt = "\n".join(filter(None, [data.get("instructions") or "", prompt]))
+        tools = data.get("tools") or []
+        web_search = any(str(t.get("type", "")).startswith("web_search") for t in tools)
+        limited = delay_or_limit("web_search" if web_search else "completion")
+        if limited:
+            return limited
+        content = responder.reply(prompt, web_search)
+        prompt_tokens, completion_tokens = account(prompt, content)
+        output = []
+        if web_search:
+            output.append({"type": "web_search_call", "id": f"ws_{uuid.uuid4().hex[:24]}",
+                           "status": "completed", "action": {"type": "search", "query": prompt[:80]}})
+        output.append({
+            "type": "message", "id": f"msg_{uuid.uuid4().hex[:24]}", "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": content, "annotations": []}],
+        })
+        return jsonify({
+            "id": f"resp_{uuid.uuid4().hex[:24]}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": data.get("model", "stand-in"),
+            "status": "completed",
+            "output": output,
+            "parallel_tool_calls": True,
+            "tool_choice": data.get("tool_choice", "auto"),
+            "tools": tools,
+            "temperature": data.get("temperature"),
+            "top_p": data.get("top_p"),
+            "error": None,
+            "incomplete_details": None,
+            "instructions": data.get("instructions"),
+            "metadata": {},
+            "usage": {
+                "input_tokens": prompt_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": completion_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    @app.route("/v1/models", methods=["GET"])
+    def models():
+        return jsonify({"object": "list", "data": [
+            {"id": name, "object": "model", "created": 0, "owned_by": "stand-in"}
+            for name in ("gpt-4.1-mini", "gpt-3.5-turbo")
+        ]})
+
+    @app.route("/stats", methods=["GET"])
+    def get_stats():
+        with lock:
+            return jsonify(dict(stats))
+
+    return app
+
+
+# ===============================================================
+# Run server
+# ===============================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in.")
+    parser.add_argument("--port", type=int, default=int(os.getenv("OPENAI_STANDIN_PORT", "8600")))
+    parser.add_argument("--completion-latency", default="lognormal:600,0.3")
+    parser.add_argument("--web-search-latency", default="lognormal:2000,0.4")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered 429.")
+    parser.add_argument("--true-rate", type=float, default=0.5, help="Share of 'credible' verdicts.")
+    parser.add_argument("--canned", default="", help='JSON file: [{"match": "...", "content": "..."}]')
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    canned = None
+    if args.canned:
+        with open(args.canned, encoding="utf-8") as f:
+            canned = json.load(f)
+    app = create_app(Responder(canned, args.true_rate, args.seed), args.completion_latency,
+                     args.web_search_latency, args.rate_limit_rate, args.seed)
+    print(f"🤖 OpenAI stand-in running on http://127.0.0.1:{args.port}/v1")
+    app.run(host="0.0.0.0", port=args.port, threaded=True)
@@ -5,12 +5,15 @@ from langchain.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
 import random
 from dotenv import load_dotenv
 from utils.data_validation import NewsItem  # Pydantic model
+from utils.llm_gateway import llm_gateway, PRIORITY_LOW
 import os
 
 load_dotenv()
 
-# Initialize LangChain OpenAI chat model
-chat = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0.7)
+# Initialize LangChain OpenAI chat model (OPENAI_BASE_URL selects a compatible server).
+# Calls go through utils/llm_gateway.py, which owns retries and concurrency.
+chat = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0.7, base_url=os.getenv("OPENAI_BASE_URL") or None,
+                  max_retries=0)
 
 def generate_single_news_structured_llm() -> NewsItem:
     """
@@ -42,7 +45,7 @@ Body: <2-4 complete sentences for the article body>
     formatted_prompt = prompt.format_messages(text=human_prompt)
 
     # Generate text
-    response = chat.invoke(formatted_prompt)
+    response = llm_gateway.invoke(chat, formatted_prompt, route="generate_news", priority=PRIORITY_LOW)
     text = response.content.strip()
 
     # Parse title and body